@@ -20,6 +20,7 @@ from .types import (
 )
 from .router import IntentRouter
 from .react_agent import ReActAgent
+from .llm_cache import LLMResponseCache
 
 __all__ = [
     "IntentType",
@@ -31,4 +32,5 @@ __all__ = [
     "ThoughtStep",
     "IntentRouter",
     "ReActAgent",
+    "LLMResponseCache",
 ]
@@ -0,0 +1,290 @@
+"""
+Prompt/response cache for agent LLM calls.
+
+Two tiers are consulted before a provider call:
+
+1. Exact: SHA-256 of the serialized messages, stored in Redis (or an
+   in-process dict when no Redis client is given) with a TTL.
+2. Semantic: cosine similarity between the embedding of the final user turn
+   and the turns of recent cached calls. Only used when an embedder is
+   supplied, and only against calls of the same user whose earlier messages
+   are identical, so a paraphrased question can hit but a shared follow-up
+   turn (e.g. "Please continue") never crosses conversations.
+
+Entries are scoped by (provider, model, system prompt hash) so responses of
+one model or prompt version are never served for another.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Async function embedding a text into a dense vector
+Embedder = Callable[[str], Awaitable[Sequence[float]]]
+
+# Default lifetime of a cached response, in seconds
+DEFAULT_CACHE_TTL = 60 * 60
+
+# Minimum cosine similarity for a semantic hit
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+# Maximum entries kept per in-memory tier
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def cache_scope(provider: str, model: str, system_prompt: str) -> str:
+    """
+    Build the cache scope for a provider, model and system prompt.
+
+    Args:
+        provider: LLM provider name
+        model: Model name
+        system_prompt: System prompt content
+
+    Returns:
+        Scope string used as key prefix
+    """
+    system_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+    return f"{provider}:{model}:{system_hash}"
+
+
+def messages_cache_key(scope: str, messages: List[Dict[str, str]], structured: bool) -> str:
+    """
+    Build the exact-match cache key for a chat request.
+
+    Args:
+        scope: Scope from cache_scope
+        messages: Chat messages sent to the LLM
+        structured: Whether the output is constrained to the step schema
+
+    Returns:
+        Redis key of the form ``llm:<scope>:<sha256>``
+    """
+    payload = json.dumps([structured, messages], sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"llm:{scope}:{digest}"
+
+
+def _semantic_key(
+    scope: str,
+    messages: List[Dict[str, str]],
+    structured: bool,
+    user_id: Optional[str],
+) -> Tuple[str, bool, Optional[str], str]:
+    """Key of the semantic index holding calls that differ only in the last turn."""
+    payload = json.dumps(messages[:-1], sort_keys=True, ensure_ascii=False)
+    history = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return scope, structured, user_id, history
+
+
+class _SemanticIndex:
+    """Bounded FIFO of normalized embeddings with their responses."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._vectors: Optional[np.ndarray] = None
+        self._responses: List[Tuple[float, str]] = []
+
+    def search(self, vector: np.ndarray, now: float) -> Tuple[float, Optional[str]]:
+        """Return (similarity, response) of the nearest unexpired entry."""
+        if self._vectors is None or not self._responses:
+            return 0.0, None
+        if self._vectors.shape[1] != vector.shape[0]:
+            return 0.0, None
+        scores = self._vectors @ vector
+        expired = np.fromiter((expires <= now for expires, _ in self._responses), dtype=bool)
+        scores[expired] = -1.0
+        best = int(np.argmax(scores))
+        return float(scores[best]), self._responses[best][1]
+
+    def add(self, vector: np.ndarray, response: str, expires_at: float) -> None:
+        """Append an entry, evicting the oldest when full."""
+        if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+            self._vectors = vector[None, :]
+            self._responses = [(expires_at, response)]
+            return
+        self._vectors = np.vstack([self._vectors, vector[None, :]])[-self.max_entries:]
+        self._responses.append((expires_at, response))
+        del self._responses[:-self.max_entries]
+
+
+class LLMResponseCache:
+    """
+    Exact + semantic cache of LLM responses.
+
+    Example:
+        >>> cache = LLMResponseCache(redis_client=redis.asyncio.from_url(url))
+        >>> scope = cache_scope("openai", "gpt-4o-mini", system_prompt)
+        >>> cached = await cache.get(scope, messages)
+        >>> if cached is None:
+        ...     await cache.set(scope, messages, await call_llm(messages))
+    """
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        embedder: Optional[Embedder] = None,
+        ttl: int = DEFAULT_CACHE_TTL,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            redis_client: Async Redis client (``redis.asyncio``) for the exact
+                tier; an in-process dict is used when omitted
+            embedder: Async embedding function enabling the semantic tier
+            ttl: Lifetime of cached responses in seconds
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            max_entries: Maximum in-memory entries (exact dict, number of
+                semantic indexes and entries per semantic index)
+        """
+        self.redis = redis_client
+        self.embedder = embedder
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max(1, max_entries)
+        self.metrics: Dict[str, Dict[str, int]] = {
+            layer: {"hit": 0, "miss": 0} for layer in ("exact", "semantic")
+        }
+        # key -> (expires_at, response); used when no Redis client is given
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # (scope, structured, user, history hash) -> semantic index, LRU-bounded
+        self._semantic: "OrderedDict[Tuple[str, bool, Optional[str], str], _SemanticIndex]" = OrderedDict()
+
+    async def get(
+        self,
+        scope: str,
+        messages: List[Dict[str, str]],
+        structured: bool = True,
+        user_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Look up a cached response for the messages.
+
+        Args:
+            scope: Scope from cache_scope
+            messages: Chat messages about to be sent
+            structured: Whether the output is constrained to the step schema
+            user_id: Owner of the conversation; semantic hits never cross users
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        key = messages_cache_key(scope, messages, structured)
+        cached = await self._get_exact(key)
+        if cached is not None:
+            self.metrics["exact"]["hit"] += 1
+            return cached
+        self.metrics["exact"]["miss"] += 1
+
+        vector = await self._embed_last_turn(messages)
+        if vector is None:
+            return None
+        index = self._semantic.get(_semantic_key(scope, messages, structured, user_id))
+        if index is not None:
+            score, response = index.search(vector, time.monotonic())
+            if response is not None and score >= self.similarity_threshold:
+                self.metrics["semantic"]["hit"] += 1
+                logger.debug(f"Semantic LLM cache hit (similarity {score:.3f})")
+                return response
+        self.metrics["semantic"]["miss"] += 1
+        return None
+
+    async def set(
+        self,
+        scope: str,
+        messages: List[Dict[str, str]],
+        response: str,
+        structured: bool = True,
+        user_id: Optional[str] = None,
+    ) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            scope: Scope from cache_scope
+            messages: Chat messages that produced the response
+            response: The LLM response
+            structured: Whether the output is constrained to the step schema
+            user_id: Owner of the conversation
+        """
+        key = messages_cache_key(scope, messages, structured)
+        await self._set_exact(key, response)
+
+        vector = await self._embed_last_turn(messages)
+        if vector is None:
+            return
+        index_key = _semantic_key(scope, messages, structured, user_id)
+        index = self._semantic.get(index_key)
+        if index is None:
+            index = self._semantic[index_key] = _SemanticIndex(self.max_entries)
+            if len(self._semantic) > self.max_entries:
+                self._semantic.popitem(last=False)
+        else:
+            self._semantic.move_to_end(index_key)
+        index.add(vector, response, time.monotonic() + self.ttl)
+
+    async def _get_exact(self, key: str) -> Optional[str]:
+        """Read the exact tier; Redis errors count as misses."""
+        if self.redis is not None:
+            try:
+                value = await self.redis.get(key)
+            except Exception as e:
+                logger.warning(f"LLM cache read failed: {e}")
+                return None
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            return value
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    async def _set_exact(self, key: str, response: str) -> None:
+        """Write the exact tier; Redis errors are logged and ignored."""
+        if self.redis is not None:
+            try:
+                await self.redis.setex(key, self.ttl, response)
+            except Exception as e:
+                logger.warning(f"LLM cache write failed: {e}")
+            return
+        self._local[key] = (time.monotonic() + self.ttl, response)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _embed_last_turn(self, messages: List[Dict[str, str]]) -> Optional[np.ndarray]:
+        """Embed the final user turn as a unit vector, if enabled."""
+        if self.embedder is None:
+            return None
+        text = next(
+            (m["content"] for m in reversed(messages) if m.get("role") == "user"),
+            "",
+        )
+        if not text:
+            return None
+        try:
+            embedding = await self.embedder(text)
+        except Exception as e:
+            logger.warning(f"LLM cache embedding failed: {e}")
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if vector.ndim != 1 or norm == 0.0:
+            return None
+        return vector / norm
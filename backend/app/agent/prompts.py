@@ -7,41 +7,46 @@ OPTIMIZATION STRATEGY:
 - Prefix Caching: Static content first (Role + Tools), Dynamic content last (Date)
 - Time Anchor: Inject current_date to prevent temporal hallucinations
 - Loop Prevention: Explicit "stop after 2-3 attempts" instructions
-- Few-Shot Examples: Improve classification accuracy on edge cases
+- Local Intent Patterns: Clear-cut queries skip the LLM classifier entirely
 """
 
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from .types import ToolSchema
+
 
 # ReAct Agent System Prompt
 # STRATEGY: Static content first (Role + Tools), Dynamic content last (Date + History)
-REACT_AGENT_SYSTEM_PROMPT = """# Role
+#
+# The system prompt only depends on the tool set, so it renders to the same
+# bytes for every request of a session. Everything that changes per call
+# (the current date, the question) arrives in the user turn, which lets the
+# provider's prefix cache (OpenAI / Gemini implicit caching) reuse the prefill
+# of the whole system block - even across a day boundary.
+REACT_AGENT_STATIC_PREFIX = """# Role
 You are Prism, an expert autonomous research agent. You answer complex user questions by strategically using tools to gather information.
 
 # Tools Available
 {tools_description}
 
-# Interaction Format (STRICT JSON ONLY)
-You must output your response as a **SINGLE VALID JSON OBJECT**. 
-**DO NOT** wrap the JSON in markdown code blocks (like ```json ... ```). 
-**DO NOT** include any text before or after the JSON.
-
-JSON Structure:
-{{
-    "thought": "Step-by-step reasoning. 1. Analyze user intent. 2. Check if info is already in context. 3. Decide next tool or final answer.",
-    "action": "tool_name" (or null if ready to answer),
-    "action_input": {{"param": "value"}} (or null if no action),
-    "final_answer": "Comprehensive answer with citations" (or null if using a tool)
-}}
+# Interaction Format
+Each reply is a single JSON object constrained to the response schema:
+`thought`, then either `actions` (tool calls) or `final_answer`.
 
 # Critical Guidelines
 
 1. **Multi-Step Reasoning (Decomposition)**:
    - If the user asks to **compare** two entities (e.g., "Tesla vs SpaceX"), you MUST search for them **separately**.
    - **Bad**: Search for "Tesla and SpaceX expenses".
-   - **Good**: Search for "Tesla expenses", then in the next step search for "SpaceX expenses".
+   - **Good**: Search for "Tesla expenses" and "SpaceX expenses" as two separate actions.
    - Do not assume one search will yield all necessary data.
+   - Independent actions can be listed together in `actions`: they run in parallel and their observations are returned in the same order.
 
 2. **Data Freshness**:
-   - Current Date: {current_date}.
+   - Check the Current Date provided in the user context.
    - If searching for "current" status, check the date of the retrieved documents.
 
 3. **Citation Rules**:
@@ -53,26 +58,176 @@ JSON Structure:
    - If a search tool returns no relevant results twice, STOP searching. Admit you cannot find the info.
    - Do not repeat the exact same search query.
 
-# Operational Context
-**Current Date**: {current_date}
+5. **Background Tasks**:
+   - Use `dispatch_async` for slow tools whose result you do not need right away; each one returns a task id.
+   - Keep reasoning with other tools, then list the task ids in `await` to collect their results before answering.
+   - Tasks that are not awaited before the final answer are cancelled.
 """
 
+# Dynamic context wrapper prepended to the user turn (Time Anchor).
+REACT_AGENT_USER_CONTEXT = "<context><current_date>{current_date}</current_date></context>\n"
+
+# Full system template kept for backwards compatibility. It no longer embeds
+# the date: the current date now arrives via the user-context wrapper above.
+REACT_AGENT_SYSTEM_PROMPT = REACT_AGENT_STATIC_PREFIX
+
+
+def _split_template(template: str, field: str) -> Tuple[str, ...]:
+    """
+    Split a single-field format template into the literals around the field.
+
+    Done once at import, so rendering is a plain ``str.join`` instead of
+    ``str.format`` re-parsing the template on every call; a field used N
+    times yields N + 1 literals, rendered with ``value.join(parts)``.
+    Escaped braces are unescaped to match what ``str.format`` would produce.
+    """
+    unescape = lambda part: part.replace("{{", "{").replace("}}", "}")
+    return tuple(unescape(part) for part in template.split("{" + field + "}"))
+
+
+_REACT_PREFIX_HEAD, _REACT_PREFIX_TAIL = _split_template(REACT_AGENT_STATIC_PREFIX, "tools_description")
+_REACT_CONTEXT_HEAD, _REACT_CONTEXT_TAIL = _split_template(REACT_AGENT_USER_CONTEXT, "current_date")
+
+
+@lru_cache(maxsize=32)
+def render_react_static_prefix(tools_description: str) -> str:
+    """
+    Render the static part of the ReAct system prompt.
+
+    Memoized per tool description, so interpolation runs once per tool set
+    and every request sees a byte-identical prefix.
+    """
+    return "".join((_REACT_PREFIX_HEAD, tools_description, _REACT_PREFIX_TAIL))
+
+
+@lru_cache(maxsize=32)
+def prompt_cache_key(system_prompt: str) -> str:
+    """
+    Get the provider prompt-cache routing key for a system prompt.
+
+    Requests sharing the key are routed to the same cache shard (OpenAI
+    ``prompt_cache_key``), which raises the hit rate of the static prefix.
+    """
+    return hashlib.md5(system_prompt.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=32)
+def _render_tools_description(
+    registry_snapshot_hash: str,
+    schemas: Tuple[ToolSchema, ...],
+) -> str:
+    """
+    Render the tools description block of the ReAct system prompt.
 
+    Memoized per tool registry snapshot. Parameter specs are serialized with
+    sorted keys and compact separators so the output is byte-stable.
+
+    Args:
+        registry_snapshot_hash: Content hash of the tool registry
+        schemas: Tool schemas in registration order
+
+    Returns:
+        Rendered tools description
+    """
+    if not schemas:
+        return "No tools available."
+
+    descriptions = []
+    for schema in schemas:
+        params_str = (
+            json.dumps(schema.parameters, sort_keys=True, separators=(",", ":"))
+            if schema.parameters
+            else "{}"
+        )
+        descriptions.append(
+            f"- {schema.name}: {schema.description}\n"
+            f"  Parameters: {params_str}\n"
+            f"  Required: {schema.required}"
+        )
+
+    return "\n".join(descriptions)
+
+
+@lru_cache(maxsize=32)
+def _render_openai_tools(
+    registry_snapshot_hash: str,
+    schemas: Tuple[ToolSchema, ...],
+) -> Tuple[Dict[str, Any], ...]:
+    """
+    Render tool schemas as OpenAI function-calling specs.
+
+    Memoized per tool registry snapshot, like the tools description, so the
+    ``tools`` payload is byte-stable and part of the cacheable prefix.
+
+    Args:
+        registry_snapshot_hash: Content hash of the tool registry
+        schemas: Tool schemas in registration order
+
+    Returns:
+        One ``{"type": "function", ...}`` spec per tool
+    """
+    specs = []
+    for schema in schemas:
+        parameters = dict(schema.parameters) if schema.parameters else {"type": "object", "properties": {}}
+        if schema.required:
+            parameters["required"] = list(schema.required)
+        specs.append({
+            "type": "function",
+            "function": {
+                "name": schema.name,
+                "description": schema.description,
+                "parameters": parameters,
+            },
+        })
+    return tuple(specs)
+
+
+def build_react_messages(
+    tools_description: str,
+    current_date: str,
+    user_query: str,
+) -> List[Dict[str, str]]:
+    """
+    Build the initial messages for the ReAct agent.
+
+    The system content is the memoized static prefix and is byte-identical
+    for a given tool set. The date is carried by a ``<context>`` wrapper at
+    the start of the trailing user message. OpenAI and Gemini cache prompt
+    prefixes implicitly, so contents stay plain strings (no provider-specific
+    cache markers).
+
+    Args:
+        tools_description: Rendered description of the available tools
+        current_date: Current date in YYYY-MM-DD format
+        user_query: User turn content (question plus request context)
+
+    Returns:
+        List with the system message followed by the user message
+    """
+    user_content = "".join((_REACT_CONTEXT_HEAD, current_date, _REACT_CONTEXT_TAIL, user_query))
+    return [
+        {"role": "system", "content": render_react_static_prefix(tools_description)},
+        {"role": "user", "content": user_content},
+    ]
 
-INTENT_CLASSIFICATION_USER_TEMPLATE = "Classify this query: {query}"
 
 
 """
 Intent Classification Prompts for the Agentic RAG system.
 
 OPTIMIZATION STRATEGY:
-- Few-Shot Learning: Provides concrete examples to guide the model.
 - Complex Reasoning Trap: Explicitly catches "compare" and "list all" queries to force the Agent into multi-step mode.
 - Strict JSON: Aggressive instructions to prevent Markdown formatting errors.
+- Prefix Caching: The system block is sent verbatim (never formatted), so it
+  stays byte-identical on every router call; only the user message carries
+  the query.
+- Local First: Clear-cut queries (the shapes the few-shot examples used to
+  teach) are classified by the router's local patterns without an LLM call,
+  so the LLM only sees ambiguous queries and the examples are no longer sent.
 """
 
-# System Prompt for the Router/Classifier
-INTENT_CLASSIFICATION_SYSTEM_PROMPT = """You are the Intent Classifier for the Prism AI system.
+# Static: role, intent categories and output format
+INTENT_STATIC_BLOCK = """You are the Intent Classifier for the Prism AI system.
 Your job is to categorize user queries into specific execution paths.
 
 # Intent Categories
@@ -94,32 +249,69 @@ Your job is to categorize user queries into specific execution paths.
    - **Hybrid**: Requests clearly requiring BOTH internal documents and external web info.
    - **Multi-step**: Questions that logically require more than one search to answer fully.
 
-# Few-Shot Examples (Follow these patterns)
+# Output Format (STRICT JSON ONLY)
+You must return the **RAW JSON OBJECT** directly.
+- **DO NOT** wrap it in markdown code blocks (e.g., ```json ... ```).
+- **DO NOT** include any introductory text like "Here is the JSON".
+- **DO NOT** add trailing comments.
+
+Response Structure:
+{
+    "intent": "CATEGORY_NAME",
+    "confidence": <float 0.0-1.0>,
+    "reasoning": "Brief explanation"
+}
+"""
+
+# Few-shot examples, no longer part of the system prompt (see "Local First"
+# above). Kept for backwards compatibility and as the reference set for the
+# router's local patterns.
+INTENT_FEWSHOT_BLOCK = """# Few-Shot Examples (Follow these patterns)
 User: "Hello, who are you?"
-Result: {{"intent": "DIRECT_ANSWER", "confidence": 1.0, "reasoning": "Greeting/Identity"}}
+Result: {"intent": "DIRECT_ANSWER", "confidence": 1.0, "reasoning": "Greeting/Identity"}
 
 User: "What is Vaibhav Taneja's exercise price in the 10-K?"
-Result: {{"intent": "DOCUMENT_QA", "confidence": 0.98, "reasoning": "Specific fact retrieval from document"}}
+Result: {"intent": "DOCUMENT_QA", "confidence": 0.98, "reasoning": "Specific fact retrieval from document"}
 
 User: "What is the current stock price of Tesla?"
-Result: {{"intent": "WEB_SEARCH", "confidence": 0.95, "reasoning": "Real-time market data request"}}
+Result: {"intent": "WEB_SEARCH", "confidence": 0.95, "reasoning": "Real-time market data request"}
 
 User: "Compare Tesla's 2024 expenses with SpaceX's expenses."
-Result: {{"intent": "COMPLEX_REASONING", "confidence": 0.98, "reasoning": "Comparison task requiring separate retrievals for Tesla and SpaceX"}}
+Result: {"intent": "COMPLEX_REASONING", "confidence": 0.98, "reasoning": "Comparison task requiring separate retrievals for Tesla and SpaceX"}
 
 User: "List all accomplishments achieved by Tesla in 2024."
-Result: {{"intent": "COMPLEX_REASONING", "confidence": 0.90, "reasoning": "Aggregation task requiring synthesis of multiple points"}}
+Result: {"intent": "COMPLEX_REASONING", "confidence": 0.90, "reasoning": "Aggregation task requiring synthesis of multiple points"}
+"""
 
-# Output Format (STRICT JSON ONLY)
-You must return the **RAW JSON OBJECT** directly.
-- **DO NOT** wrap it in markdown code blocks (e.g., ```json ... ```).
-- **DO NOT** include any introductory text like "Here is the JSON".
-- **DO NOT** add trailing comments.
+# Dynamic: the only per-query content, sent as the user message
+INTENT_DYNAMIC_USER = "Classify this query: {query}"
+
+# System Prompt for the Router/Classifier
+INTENT_CLASSIFICATION_SYSTEM_PROMPT = INTENT_STATIC_BLOCK
+
+# Kept for backwards compatibility
+INTENT_CLASSIFICATION_USER_TEMPLATE = INTENT_DYNAMIC_USER
+
+_INTENT_USER_HEAD, _INTENT_USER_TAIL = _split_template(INTENT_DYNAMIC_USER, "query")
+
+
+def render_intent_user(query: str) -> str:
+    """Render the router's user message (equivalent to INTENT_DYNAMIC_USER.format)."""
+    return "".join((_INTENT_USER_HEAD, query, _INTENT_USER_TAIL))
+
+
+# Batched router request: the queries of one classify_batch call in one user
+# message, answered with one classification object per query
+INTENT_BATCH_USER_HEAD = """Classify each of the following {count} independent queries on its own.
+Return a JSON object {{"classifications": [...]}} containing exactly {count} objects
+with the response structure above, in the same order as the queries.
 
-Response Structure:
-{{
-    "intent": "CATEGORY_NAME",
-    "confidence": <float 0.0-1.0>,
-    "reasoning": "Brief explanation"
-}}
 """
+
+_INTENT_BATCH_HEAD_PARTS = _split_template(INTENT_BATCH_USER_HEAD, "count")
+
+
+def render_intent_batch_user(queries: List[str]) -> str:
+    """Render the router's user message for a batch of queries."""
+    numbered = "\n".join(f"[{i + 1}] {query}" for i, query in enumerate(queries))
+    return str(len(queries)).join(_INTENT_BATCH_HEAD_PARTS) + numbered
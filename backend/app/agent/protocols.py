@@ -5,7 +5,7 @@ This module defines the interfaces (Protocols) that components must implement,
 enabling loose coupling and easier testing.
 """
 
-from typing import Any, AsyncIterator, Dict, List, Optional, Protocol, runtime_checkable
+from typing import Any, AsyncIterator, ContextManager, Dict, List, Optional, Protocol, Tuple, runtime_checkable
 
 from .types import (
     AgentResponse,
@@ -36,6 +36,34 @@ class IntentRouter(Protocol):
         """
         ...
 
+    async def aclassify(self, query: str, context: Optional[Dict[str, Any]] = None) -> IntentClassification:
+        """Classify user intent without blocking the event loop.
+
+        Args:
+            query: The user's input query
+            context: Optional context information
+
+        Returns:
+            IntentClassification with intent type, confidence, and reasoning
+        """
+        ...
+
+    async def classify_batch(
+        self,
+        queries: List[str],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> List[IntentClassification]:
+        """Classify several queries concurrently.
+
+        Args:
+            queries: The user queries to classify
+            context: Optional context information shared by all queries
+
+        Returns:
+            One IntentClassification per query, in input order
+        """
+        ...
+
 
 @runtime_checkable
 class ToolRegistryProtocol(Protocol):
@@ -49,6 +77,22 @@ class ToolRegistryProtocol(Protocol):
         """
         ...
 
+    def unregister(self, name: str) -> bool:
+        """Remove a tool from the registry.
+
+        Args:
+            name: The unique name of the tool
+
+        Returns:
+            True if the tool was registered, False otherwise
+        """
+        ...
+
+    @property
+    def version(self) -> int:
+        """Counter incremented on every registration change."""
+        ...
+
     def get(self, name: str) -> Optional[Tool]:
         """Get a tool by name.
 
@@ -65,7 +109,18 @@ class ToolRegistryProtocol(Protocol):
         """List all registered tool schemas.
 
         Returns:
-            List of all registered tool schemas
+            List of all registered tool schemas, in registration order
+        """
+        ...
+
+    def content_hash(self) -> str:
+        """Get a stable hash of the registered tool schemas.
+
+        Used as the cache key for the rendered tools description, so it must
+        only change when a tool's name, description or parameters change.
+
+        Returns:
+            Hex digest identifying the current tool set
         """
         ...
 
@@ -84,6 +139,58 @@ class ToolRegistryProtocol(Protocol):
         """
         ...
 
+    async def ainvoke(self, name: str, **kwargs: Any) -> Any:
+        """Invoke a tool by name without blocking the event loop.
+
+        Args:
+            name: The name of the tool to invoke
+            **kwargs: Parameters to pass to the tool
+
+        Returns:
+            The result of the tool invocation
+
+        Raises:
+            ValueError: If the tool is not found
+        """
+        ...
+
+    async def ainvoke_detached(self, name: str, **kwargs: Any) -> str:
+        """Start a tool invocation in the background.
+
+        Args:
+            name: The name of the tool to invoke
+            **kwargs: Parameters to pass to the tool
+
+        Returns:
+            The task_id of the background invocation
+
+        Raises:
+            ValueError: If the tool is not found
+        """
+        ...
+
+    async def poll(self, task_id: str) -> Optional[Any]:
+        """Get the result of a background invocation if it has finished.
+
+        Args:
+            task_id: ID returned by ainvoke_detached
+
+        Returns:
+            The tool result, or None if the task is still running
+        """
+        ...
+
+    async def await_any(self, task_ids: List[str]) -> Tuple[str, Any]:
+        """Wait until one of the given background invocations finishes.
+
+        Args:
+            task_ids: IDs returned by ainvoke_detached
+
+        Returns:
+            Tuple of (task_id, result) for the first finished task
+        """
+        ...
+
 
 @runtime_checkable
 class AgentProtocol(Protocol):
@@ -127,6 +234,24 @@ class AgentProtocol(Protocol):
         """
         ...
 
+    async def stream_bytes(
+        self,
+        query: str,
+        user_id: str,
+        include_metadata: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """Stream agent execution events as pre-encoded SSE frames.
+
+        Args:
+            query: The user's question
+            user_id: ID of the user making the request
+            include_metadata: Include event metadata in every frame
+
+        Yields:
+            UTF-8 encoded ``data:`` frames, ending with a done frame
+        """
+        ...
+
 
 @runtime_checkable
 class RetrieverProtocol(Protocol):
@@ -138,6 +263,7 @@ class RetrieverProtocol(Protocol):
         document_id: str,
         user_id: str,
         k: int = 10,
+        quantization: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Perform search to retrieve relevant chunks.
 
@@ -146,18 +272,42 @@ class RetrieverProtocol(Protocol):
             document_id: ID of the document to search
             user_id: ID of the user making the request
             k: Number of results to return
+            quantization: Vector search mode ("fp32", "int8" or "binary"),
+                None for the implementation's default
 
         Returns:
             List of retrieval results with chunk text and metadata
         """
         ...
 
+    def search_batch(
+        self,
+        queries: List[str],
+        document_id: str,
+        user_id: str,
+        k: int = 10,
+        quantization: Optional[str] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Perform search for several queries at once.
+
+        Args:
+            queries: The search queries
+            document_id: ID of the document to search
+            user_id: ID of the user making the request
+            k: Number of results to return per query
+            quantization: Vector search mode, None for the implementation's default
+
+        Returns:
+            One list of retrieval results per query, in input order
+        """
+        ...
+
 
 @runtime_checkable
 class TracerProtocol(Protocol):
     """Protocol for execution tracing implementations."""
 
-    def start_span(self, name: str, inputs: Dict[str, Any]) -> str:
+    def start_span(self, name: str, inputs: Dict[str, Any]) -> Any:
         """Start a new trace span.
 
         Args:
@@ -165,19 +315,31 @@ class TracerProtocol(Protocol):
             inputs: Input data for this span
 
         Returns:
-            Unique span_id for this span
+            Handle for the span; ``str(handle)`` is its unique span_id
         """
         ...
 
-    def end_span(self, span_id: str, outputs: Dict[str, Any]) -> None:
+    def end_span(self, span_id: Any, outputs: Dict[str, Any]) -> None:
         """End a trace span with outputs.
 
         Args:
-            span_id: The ID of the span to end
+            span_id: The span handle (or its ID) to end
             outputs: Output data from this span
         """
         ...
 
+    def trace_span(self, name: str, **inputs: Any) -> ContextManager[Any]:
+        """Trace a block of code as a span nested under the current span.
+
+        Args:
+            name: Name of the span
+            **inputs: Input data for this span
+
+        Returns:
+            Context manager yielding the span handle
+        """
+        ...
+
     def get_trace(self) -> Dict[str, Any]:
         """Get the complete execution trace.
 
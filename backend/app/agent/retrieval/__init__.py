@@ -8,10 +8,12 @@ Contains:
 - Index manager for dual-store transactions
 - Hybrid retriever combining vector and BM25 search
 - RRF (Reciprocal Rank Fusion) algorithm
+- Int8/binary embedding quantization for candidate search
 """
 
 from .tokenizer import (
     tokenize,
+    tokenize_document,
     is_chinese_text,
 )
 from .bm25_service import (
@@ -30,6 +32,12 @@ from .index_manager import (
     DeleteResult,
     VectorStoreProtocol,
 )
+from .quantization import (
+    Quantization,
+    QuantizedIndex,
+    quantize_int8,
+    quantize_binary,
+)
 from .hybrid_retriever import (
     HybridRetriever,
     RetrievalResult,
@@ -37,6 +45,7 @@ from .hybrid_retriever import (
 
 __all__ = [
     "tokenize",
+    "tokenize_document",
     "is_chinese_text",
     "BM25Service",
     "BM25SearchResult",
@@ -48,6 +57,10 @@ __all__ = [
     "IndexResult",
     "DeleteResult",
     "VectorStoreProtocol",
+    "Quantization",
+    "QuantizedIndex",
+    "quantize_int8",
+    "quantize_binary",
     "HybridRetriever",
     "RetrievalResult",
 ]
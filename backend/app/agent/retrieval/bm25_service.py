@@ -5,19 +5,61 @@ This module provides BM25 indexing and search functionality using the rank_bm25
 It uses the unified tokenizer from tokenizer.py to ensure consistent tokenization
 across both indexing and querying.
 
+Queries are scored from structure-of-arrays postings (chunk positions and
+precomputed BM25 weights per term) instead of BM25Okapi.get_scores, which
+loops over every chunk in Python for each query term. The postings are built
+directly from the tokenized corpus, with IDF and per-chunk length
+normalization computed once; scores are identical to BM25Okapi's, which is
+only built when a caller asks for it.
+
 CRITICAL: This service MUST use the tokenize() function from tokenizer.py
 for both index building and query processing to ensure consistency.
+(Index building uses tokenize_document(), which yields the same tokens.)
 """
 
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+import math
+from array import array
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 from rank_bm25 import BM25Okapi
 
-from .tokenizer import tokenize
+from .tokenizer import tokenize, tokenize_document
 
 
-@dataclass
+# BM25Okapi defaults
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_EPSILON = 0.25
+
+# Smallest index for which search() tries MaxScore pruning; below it, the
+# vectorized full scoring is faster than the pruning bookkeeping
+MAX_SCORE_MIN_CHUNKS = 20_000
+
+
+def _set_slots_state(obj: Any, state: Any) -> None:
+    """
+    Restore a pickled slots dataclass.
+    
+    Accepts the (None, slots) state of slots instances as well as the plain
+    __dict__ state of instances pickled before the class had slots. Fields
+    added since the instance was pickled get their defaults.
+    """
+    if isinstance(state, tuple):
+        state = state[1]
+    for f in fields(obj):
+        if f.name in state:
+            continue
+        if f.default is not MISSING:
+            object.__setattr__(obj, f.name, f.default)
+        elif f.default_factory is not MISSING:
+            object.__setattr__(obj, f.name, f.default_factory())
+    for name, value in state.items():
+        object.__setattr__(obj, name, value)
+
+
+@dataclass(slots=True)
 class BM25SearchResult:
     """Result from a BM25 search query."""
     chunk_id: str
@@ -26,19 +68,123 @@ class BM25SearchResult:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ChunkData:
     """Data structure for a document chunk to be indexed."""
     chunk_id: str
     text: str
     metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    __setstate__ = _set_slots_state
+
+
+@dataclass
+class _PostingLists:
+    """BM25 postings in structure-of-arrays (CSR) layout, grouped by term."""
+    vocabulary: Dict[str, int]  # term -> row
+    offsets: np.ndarray  # postings of row r are [offsets[r], offsets[r + 1])
+    ids: np.ndarray  # chunk positions (int32)
+    weights: np.ndarray  # BM25 weight of the term in the chunk
+    max_weights: np.ndarray  # term row -> highest weight of the term in any chunk
+    
+    def span(self, term: str) -> Optional[slice]:
+        """Get the slice of a term's postings, or None for unknown terms."""
+        row = self.vocabulary.get(term)
+        if row is None:
+            return None
+        return slice(self.offsets[row], self.offsets[row + 1])
+
+
+def _encode_corpus(
+    tokenized_corpus: Iterable[List[str]],
+) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Encode a tokenized corpus as term ids.
+    
+    Terms are numbered in order of first appearance, as BM25Okapi orders
+    its document frequencies.
+    
+    Returns:
+        (vocabulary, token ids of all chunks concatenated (int32), chunk lengths)
+    """
+    vocabulary: Dict[str, int] = {}
+    token_ids = array("i")
+    lengths = array("q")
+    for tokens in tokenized_corpus:
+        token_ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+        lengths.append(len(tokens))
+    return (
+        vocabulary,
+        np.frombuffer(token_ids, dtype=np.int32) if token_ids else np.zeros(0, dtype=np.int32),
+        np.frombuffer(lengths, dtype=np.int64) if lengths else np.zeros(0, dtype=np.int64),
+    )
+
+
+def _build_postings(
+    tokenized_corpus: Iterable[List[str]],
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+    epsilon: float = BM25_EPSILON,
+) -> _PostingLists:
+    """Build BM25 postings from a tokenized corpus."""
+    vocabulary, token_ids, doc_len = _encode_corpus(tokenized_corpus)
+    return _postings_from_ids(vocabulary, token_ids, doc_len, k1, b, epsilon)
+
+
+def _postings_from_ids(
+    vocabulary: Dict[str, int],
+    token_ids: np.ndarray,
+    doc_len: np.ndarray,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+    epsilon: float = BM25_EPSILON,
+) -> _PostingLists:
+    """
+    Build BM25 postings from a corpus encoded by _encode_corpus().
+    
+    Term frequencies are counted for all (term, chunk) pairs at once, which
+    yields the postings already grouped by term and in chunk order. IDF
+    (with BM25Okapi's epsilon floor for negative values) and the per-chunk
+    length normalization k1 * (1 - b + b * len / avgdl) are computed once,
+    with the same expressions and summation order as BM25Okapi, so the
+    weights match its scores exactly.
+    """
+    chunk_count = len(doc_len)
+    term_rows = token_ids.astype(np.int64)
+    chunk_ids = np.repeat(np.arange(chunk_count, dtype=np.int64), doc_len)
+    
+    # Unique (term, chunk) keys sort by term, then chunk: CSR order
+    keys, term_freqs = np.unique(term_rows * chunk_count + chunk_ids, return_counts=True)
+    rows = keys // chunk_count
+    ids = (keys % chunk_count).astype(np.int32)
+    doc_freqs = np.bincount(rows, minlength=len(vocabulary))
+    offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    np.cumsum(doc_freqs, out=offsets[1:])
+    
+    idf = [math.log(chunk_count - freq + 0.5) - math.log(freq + 0.5) for freq in doc_freqs.tolist()]
+    idf_sum = 0.0
+    for value in idf:
+        idf_sum += value
+    idf_values = np.array(idf, dtype=float)
+    if len(idf):
+        idf_values[idf_values < 0] = epsilon * (idf_sum / len(idf))
+    
+    # avgdl is 0 only if no chunk has tokens, and then there are no weights
+    avgdl = int(doc_len.sum()) / chunk_count or 1.0
+    length_norm = k1 * (1 - b + b * doc_len / avgdl)
+    term_freqs = term_freqs.astype(float)
+    weights = idf_values[rows] * (term_freqs * (k1 + 1) / (term_freqs + length_norm[ids]))
+    
+    max_weights = np.maximum.reduceat(weights, offsets[:-1]) if len(weights) else np.zeros(0)
+    
+    return _PostingLists(vocabulary, offsets, ids, weights, max_weights)
 
 
 class BM25Service:
     """
     BM25 index service for keyword-based search.
     
-    Uses rank_bm25's BM25Okapi implementation with the unified tokenizer
+    Uses rank_bm25's BM25Okapi statistics with the unified tokenizer
     to ensure consistent tokenization between indexing and querying.
     
     Example:
@@ -57,12 +203,19 @@ class BM25Service:
         """Initialize the BM25 service."""
         self._index: Optional[BM25Okapi] = None
         self._chunks: List[ChunkData] = []
+        # Corpus as int32 term ids (rows of the postings vocabulary), chunks
+        # concatenated; chunk i holds [_token_offsets[i], _token_offsets[i + 1])
+        self._token_ids: Optional[np.ndarray] = None
+        self._token_offsets: Optional[np.ndarray] = None
+        # Token strings, decoded from the ids only when asked for
         self._tokenized_corpus: List[List[str]] = []
+        # Scoring postings; the BM25Okapi object is only built for get_index()
+        self._postings: Optional[_PostingLists] = None
     
     @property
     def is_indexed(self) -> bool:
         """Check if an index has been built."""
-        return self._index is not None
+        return self._postings is not None
     
     @property
     def chunk_count(self) -> int:
@@ -84,15 +237,18 @@ class BM25Service:
         if not chunks:
             raise ValueError("Cannot build index from empty chunks list")
         
+        self.clear()
         self._chunks = chunks
         
-        # Tokenize all chunks using the unified tokenizer
-        self._tokenized_corpus = [
-            tokenize(chunk.text) for chunk in chunks
-        ]
+        # Tokenize all chunks using the unified tokenizer, keeping each token
+        # as an int32 term id rather than a str
+        vocabulary, token_ids, doc_len = _encode_corpus(tokenize_document([chunk.text for chunk in chunks]))
+        self._token_ids = token_ids
+        self._token_offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum(doc_len, out=self._token_offsets[1:])
         
-        # Build the BM25 index
-        self._index = BM25Okapi(self._tokenized_corpus)
+        # Build the BM25 postings
+        self._postings = _postings_from_ids(vocabulary, token_ids, doc_len)
     
     def search(
         self,
@@ -129,30 +285,219 @@ class BM25Service:
         if not query_tokens:
             return []
         
-        # Get BM25 scores for all documents
-        scores = self._index.get_scores(query_tokens)
+        if len(query_tokens) == 1 and score_threshold >= 0:
+            # Single term: the scores are that term's posting weights, and
+            # chunks outside its postings score 0, which never passes the threshold
+            postings = self._get_postings()
+            span = postings.span(query_tokens[0])
+            if span is None:
+                return []
+            return self._build_results(postings.weights[span], k, score_threshold, postings.ids[span])
+        
+        # Get BM25 scores (skipping chunks that cannot reach the top k), then select the top k
+        scores = self._score_top_k(query_tokens, k)
+        return self._build_results(scores, k, score_threshold)
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        k: int = 10,
+        score_threshold: float = 0.0,
+    ) -> List[List[BM25SearchResult]]:
+        """
+        Search the BM25 index for several queries at once.
+        
+        All queries are tokenized up front and their postings stacked into
+        one flat (chunk position, weight) array, with positions offset by
+        ``query row * chunk_count``; a single ``np.bincount`` then yields the
+        (queries x chunks) score matrix. Per query, postings are summed in
+        term order, so scores are identical to ``search``.
         
-        # Create (index, score) pairs and sort by score descending
-        scored_indices: List[Tuple[int, float]] = [
-            (i, score) for i, score in enumerate(scores)
-            if score > score_threshold
+        Args:
+            queries: Search query strings
+            k: Maximum number of results to return per query
+            score_threshold: Minimum score threshold for results
+            
+        Returns:
+            One list of BM25SearchResult objects per query, in input order
+            
+        Raises:
+            RuntimeError: If no index has been built
+        """
+        if not self.is_indexed:
+            raise RuntimeError("No index has been built. Call build_index() first.")
+        
+        tokenized_queries = [
+            tokenize(query) if query and query.strip() else []
+            for query in queries
+        ]
+        
+        postings = self._get_postings()
+        chunk_count = len(self._chunks)
+        
+        # Repeated terms count once per occurrence, as in search()
+        flat_ids: List[np.ndarray] = []
+        flat_weights: List[np.ndarray] = []
+        for row, tokens in enumerate(tokenized_queries):
+            for span in map(postings.span, tokens):
+                if span is not None:
+                    flat_ids.append(postings.ids[span] + row * chunk_count)
+                    flat_weights.append(postings.weights[span])
+        
+        if not flat_ids:
+            return [[] for _ in queries]
+        
+        scores = np.bincount(
+            np.concatenate(flat_ids),
+            weights=np.concatenate(flat_weights),
+            minlength=len(queries) * chunk_count,
+        ).reshape(len(queries), chunk_count)
+        
+        return [
+            self._build_results(row_scores, k, score_threshold) if tokens else []
+            for row_scores, tokens in zip(scores, tokenized_queries)
         ]
-        scored_indices.sort(key=lambda x: x[1], reverse=True)
+    
+    def _score(self, query_tokens: List[str]) -> np.ndarray:
+        """
+        Compute the BM25 score of every chunk for a tokenized query.
+        
+        Equivalent to ``BM25Okapi.get_scores``: repeated query terms count
+        once per occurrence and unknown terms contribute nothing. The
+        postings of all query terms are summed by a single ``np.bincount``,
+        which adds them in term order and so matches BM25Okapi exactly.
+        """
+        postings = self._get_postings()
+        spans = [span for span in map(postings.span, query_tokens) if span is not None]
+        if not spans:
+            return np.zeros(len(self._chunks))
+        if len(spans) == 1:
+            ids, weights = postings.ids[spans[0]], postings.weights[spans[0]]
+        else:
+            ids = np.concatenate([postings.ids[span] for span in spans])
+            weights = np.concatenate([postings.weights[span] for span in spans])
+        return np.bincount(ids, weights=weights, minlength=len(self._chunks))
+    
+    def _score_top_k(self, query_tokens: List[str], k: int) -> np.ndarray:
+        """
+        Compute BM25 scores exactly for the chunks that can reach the top k.
         
-        # Take top k results
-        top_results = scored_indices[:k]
+        MaxScore pruning: terms are accumulated in decreasing order of their
+        highest weight. After each term, the k-th best partial score is a
+        lower bound of the final k-th score, and a chunk whose partial score
+        plus the highest weights of the remaining terms stays below it can
+        never reach the top k. Once such chunks exist, only the remaining
+        candidates are scored (in query term order, matching ``_score``);
+        all other chunks get ``-inf``. Without pruning this is ``_score``.
+        
+        Pruning is only tried on indexes of at least ``MAX_SCORE_MIN_CHUNKS``
+        chunks, and only while the postings left to skip clearly outweigh
+        those already accumulated.
+        """
+        chunk_count = len(self._chunks)
+        if chunk_count < MAX_SCORE_MIN_CHUNKS or not 0 < k < chunk_count:
+            return self._score(query_tokens)
+        postings = self._get_postings()
+        spans = [span for span in map(postings.span, query_tokens) if span is not None]
+        if len(spans) < 2:
+            return self._score(query_tokens)
+        
+        rows = np.array([postings.vocabulary[token] for token in query_tokens if token in postings.vocabulary])
+        bounds = postings.max_weights[rows]
+        if bounds.min() < 0:
+            # Negative IDF weights make partial scores no lower bound
+            return self._score(query_tokens)
+        
+        order = np.argsort(-bounds, kind="stable")
+        # remaining[i] / tail_postings[i]: bounds / posting counts of the terms after the i-th one
+        remaining = np.cumsum(bounds[order][::-1])[::-1] - bounds[order]
+        lengths = (postings.offsets[rows + 1] - postings.offsets[rows])[order]
+        tail_postings = np.cumsum(lengths[::-1])[::-1] - lengths
+        
+        partial = np.zeros(chunk_count)
+        touched: List[np.ndarray] = []
+        candidates = None
+        for position, term in enumerate(order[:-1]):
+            # Give up once pruning costs more than the postings it could skip
+            if tail_postings[position] <= 4 * lengths[:position + 1].sum():
+                break
+            span = spans[term]
+            partial[postings.ids[span]] += postings.weights[span]
+            touched.append(postings.ids[span])
+            # Chunks outside every accumulated posting only reach remaining[position]
+            scored = np.unique(np.concatenate(touched)) if len(touched) > 1 else touched[0]
+            if len(scored) < k:
+                continue
+            scored_partial = partial[scored]
+            kth_score = np.partition(scored_partial, len(scored) - k)[len(scored) - k]
+            # Small slack so rounding in the partial sums never drops a tie
+            threshold = kth_score * (1 - 1e-9)
+            if remaining[position] >= threshold:
+                continue
+            candidates = scored[scored_partial + remaining[position] >= threshold]
+            break
+        
+        if candidates is None:
+            return self._score(query_tokens)
+        
+        candidate_scores = np.zeros(len(candidates))
+        for span in spans:
+            ids = postings.ids[span]
+            hits = np.minimum(np.searchsorted(ids, candidates), len(ids) - 1)
+            found = ids[hits] == candidates
+            candidate_scores[found] += postings.weights[span][hits[found]]
+        
+        scores = np.full(chunk_count, -np.inf)
+        scores[candidates] = candidate_scores
+        return scores
+    
+    def _get_postings(self) -> "_PostingLists":
+        """Get the postings of the current index."""
+        return self._postings
+    
+    def _build_results(
+        self,
+        scores: np.ndarray,
+        k: int,
+        score_threshold: float,
+        positions: Optional[np.ndarray] = None,
+    ) -> List[BM25SearchResult]:
+        """
+        Select the top k chunks from a score vector.
+        
+        Only the k best candidates are selected (partial partition) and
+        sorted, and result objects are built for those alone. Ties keep
+        chunk order, as a stable full sort would.
+        
+        Args:
+            scores: Score of every chunk, or of the chunks at positions
+            k: Maximum number of results
+            score_threshold: Minimum score (exclusive)
+            positions: Ascending chunk positions of sparse scores
+        """
+        if k <= 0:
+            return []
+        
+        candidates = np.flatnonzero(scores > score_threshold)
+        if len(candidates) > k:
+            # Partial selection of the k best, keeping the earliest chunks on ties
+            candidate_scores = scores[candidates]
+            kth_score = -np.partition(-candidate_scores, k - 1)[k - 1]
+            above = candidates[candidate_scores > kth_score]
+            ties = candidates[candidate_scores == kth_score][: k - len(above)]
+            candidates = np.concatenate([above, ties])
+        # Sort by score descending, then by chunk position
+        order = np.lexsort((candidates, -scores[candidates]))
         
-        # Build result objects
         results = []
-        for idx, score in top_results:
-            chunk = self._chunks[idx]
+        for idx in candidates[order]:
+            chunk = self._chunks[idx if positions is None else positions[idx]]
             results.append(BM25SearchResult(
                 chunk_id=chunk.chunk_id,
                 text=chunk.text,
-                score=score,
+                score=float(scores[idx]),
                 metadata=chunk.metadata,
             ))
-        
         return results
     
     def get_top_n(
@@ -176,33 +521,89 @@ class BM25Service:
         """
         Get the underlying BM25Okapi index object.
         
-        Useful for serialization/persistence operations.
+        Searching does not use it, so it is built on first access.
         
         Returns:
             The BM25Okapi index or None if not built
         """
+        if self._index is None and self._postings is not None:
+            self._index = BM25Okapi(self.get_tokenized_corpus(), k1=BM25_K1, b=BM25_B, epsilon=BM25_EPSILON)
         return self._index
     
-    def get_chunks(self) -> List[ChunkData]:
+    def get_postings(self) -> Optional["_PostingLists"]:
+        """
+        Get the scoring postings of the index.
+        
+        Returns:
+            The postings, or None if no index has been built
+        """
+        if not self.is_indexed:
+            return None
+        return self._get_postings()
+    
+    def restore(
+        self,
+        chunks: List[ChunkData],
+        postings: "_PostingLists",
+        tokenized_corpus: Optional[List[List[str]]] = None,
+    ) -> None:
+        """
+        Restore an index from persisted postings.
+        
+        Searching needs only the postings, so the tokenized corpus is
+        re-derived only if something asks for it and was not given.
+        
+        Args:
+            chunks: The indexed chunks, in index order
+            postings: Postings saved from an index over the same chunks
+            tokenized_corpus: The chunks' tokens, if at hand
+        """
+        self.clear()
+        self._chunks = chunks
+        self._postings = postings
+        self._tokenized_corpus = tokenized_corpus or []
+    
+    def get_chunks(self, copy: bool = False) -> List[ChunkData]:
         """
         Get the list of indexed chunks.
         
+        Args:
+            copy: Return a copy; by default the service's own list is
+                returned, which callers must not mutate
+        
         Returns:
             List of ChunkData objects
         """
-        return self._chunks.copy()
+        return self._chunks.copy() if copy else self._chunks
     
-    def get_tokenized_corpus(self) -> List[List[str]]:
+    def get_tokenized_corpus(self, copy: bool = False) -> List[List[str]]:
         """
         Get the tokenized corpus used for indexing.
         
+        Args:
+            copy: Return a copy; by default the service's own list is
+                returned, which callers must not mutate
+        
         Returns:
             List of token lists for each chunk
         """
-        return self._tokenized_corpus.copy()
+        if not self._tokenized_corpus and self._chunks:
+            if self._token_ids is not None:
+                # Decode the term ids (vocabulary order is row order)
+                terms = list(self._postings.vocabulary)
+                tokens = [terms[token_id] for token_id in self._token_ids.tolist()]
+                bounds = self._token_offsets.tolist()
+                self._tokenized_corpus = [tokens[start:end] for start, end in zip(bounds, bounds[1:])]
+            else:
+                # Restored from postings: re-derive with the same tokenizer
+                self._tokenized_corpus = tokenize_document([chunk.text for chunk in self._chunks])
+        return self._tokenized_corpus.copy() if copy else self._tokenized_corpus
     
     def clear(self) -> None:
         """Clear the index and all stored data."""
         self._index = None
         self._chunks = []
+        self._token_ids = None
+        self._token_offsets = None
         self._tokenized_corpus = []
+        self._postings = None
@@ -1,27 +1,76 @@
 """
 BM25 Index Persistence Store.
 
-This module provides save/load functionality for BM25 indexes using Pickle serialization.
+This module provides save/load functionality for BM25 indexes.
 Storage path: backend/app/storage/bm25_indexes/{document_id}.pkl
 
+The index file starts with a format version byte. Version 2 holds the chunks
+as JSON (orjson when available); files written before it are plain pickles
+(whose first byte is the pickle PROTO opcode) and still load. The .pkl name
+is kept so existing stores stay readable.
+
+The scoring postings are saved next to it in a flat binary file
+({document_id}.postings) that is memory-mapped on load: the arrays are
+NumPy views of the mapping, so loading neither decodes a tokenized corpus
+nor rebuilds the postings.
+
 Requirements: 6.2 - THE Agentic_RAG_System SHALL support keyword-based search using BM25 algorithm.
 """
 
+import json
+import logging
+import mmap
+import os
 import pickle
+import struct
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+from .bm25_service import BM25Service, ChunkData, _PostingLists, _build_postings, _set_slots_state
+from .tokenizer import tokenize_document
 
-from rank_bm25 import BM25Okapi
 
-from .bm25_service import BM25Service, ChunkData
+logger = logging.getLogger(__name__)
 
 
 # Default storage directory for BM25 indexes
 DEFAULT_STORAGE_PATH = Path(__file__).parent.parent.parent / "storage" / "bm25_indexes"
 
+# First byte of an index file. Version 1 files are pickles, which start with
+# the PROTO opcode instead of a version byte.
+INDEX_FORMAT_VERSION = 2
+_PICKLE_PROTO = 0x80
 
-@dataclass
+# Background writer of save_async(): flush at least this often (seconds), or
+# as soon as this many indexes are pending
+ASYNC_FLUSH_INTERVAL = 1.0
+ASYNC_FLUSH_BATCH_SIZE = 32
+
+# Threads used by load_many(); file reads release the GIL, so several
+# indexes load concurrently
+MAX_LOAD_WORKERS = 8
+
+# Postings file layout: header, then offsets (int64), weights (float64),
+# max weights (float64), chunk positions (int32) and the NUL-separated
+# vocabulary in row order. All numbers are little-endian.
+POSTINGS_MAGIC = b"BM25POST"
+POSTINGS_VERSION = 1
+# magic, version, postings token, chunk count, term count, posting count, vocabulary bytes
+_POSTINGS_HEADER = struct.Struct("<8sI16sQQQQ")
+
+
+@dataclass(slots=True)
 class BM25IndexData:
     """
     Serializable data structure for BM25 index persistence.
@@ -30,14 +79,56 @@ class BM25IndexData:
     """
     document_id: str
     chunks: List[ChunkData]
+    # Empty when the postings file holds the index; re-derived on demand
     tokenized_corpus: List[List[str]]
+    # Identifies the postings file written together with this data
+    postings_token: Optional[str] = None
+    
+    __setstate__ = _set_slots_state
+
+
+def _encode_index_data(index_data: BM25IndexData) -> bytes:
+    """Serialize index data to the current index file format."""
+    payload = {
+        "document_id": index_data.document_id,
+        "chunks": [[chunk.chunk_id, chunk.text, chunk.metadata] for chunk in index_data.chunks],
+        "tokenized_corpus": index_data.tokenized_corpus,
+        "postings_token": index_data.postings_token,
+    }
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return bytes([INDEX_FORMAT_VERSION]) + body
+
+
+def _decode_index_data(raw: bytes) -> BM25IndexData:
+    """Deserialize index data from any supported index file format."""
+    if not raw:
+        raise ValueError("Empty BM25 index file")
+    if raw[0] == _PICKLE_PROTO:
+        return pickle.loads(raw)
+    if raw[0] != INDEX_FORMAT_VERSION:
+        raise ValueError(f"Unknown BM25 index format: {raw[0]}")
+    
+    body = memoryview(raw)[1:]
+    payload = orjson.loads(body) if orjson is not None else json.loads(bytes(body))
+    return BM25IndexData(
+        document_id=payload["document_id"],
+        chunks=[
+            ChunkData(chunk_id=chunk_id, text=text, metadata=metadata)
+            for chunk_id, text, metadata in payload["chunks"]
+        ],
+        tokenized_corpus=payload["tokenized_corpus"],
+        postings_token=payload["postings_token"],
+    )
 
 
 class BM25IndexStore:
     """
     Persistence store for BM25 indexes.
     
-    Handles saving and loading BM25 indexes to/from disk using Pickle serialization.
+    Handles saving and loading BM25 indexes to/from disk.
     Each document's index is stored in a separate file named {document_id}.pkl.
     
     Example:
@@ -60,6 +151,14 @@ class BM25IndexStore:
         """
         self._storage_path = storage_path or DEFAULT_STORAGE_PATH
         self._ensure_storage_dir()
+        
+        # save_async() state: document_id -> service, written by a daemon thread
+        self._pending: Dict[str, BM25Service] = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
     
     @property
     def storage_path(self) -> Path:
@@ -82,12 +181,17 @@ class BM25IndexStore:
         """
         return self._storage_path / f"{document_id}.pkl"
     
+    def _get_postings_path(self, document_id: str) -> Path:
+        """Get the file path for a document's postings."""
+        return self._storage_path / f"{document_id}.postings"
+    
     def save(self, document_id: str, service: BM25Service) -> None:
         """
         Save a BM25 index to disk.
         
-        Serializes the index data (chunks and tokenized corpus) to a Pickle file.
-        The BM25Okapi index is rebuilt on load from the tokenized corpus.
+        Writes the postings file first, then the chunks to the index file;
+        it carries the token of its postings file, so a reader never
+        pairs new chunks with stale postings.
         
         Args:
             document_id: Unique identifier for the document
@@ -100,22 +204,31 @@ class BM25IndexStore:
         if not service.is_indexed:
             raise ValueError("Cannot save: BM25Service has no built index")
         
+        postings_token = uuid.uuid4().hex
+        self._write_postings(document_id, postings_token, service)
+        
         index_data = BM25IndexData(
             document_id=document_id,
             chunks=service.get_chunks(),
-            tokenized_corpus=service.get_tokenized_corpus(),
+            tokenized_corpus=[],
+            postings_token=postings_token,
         )
         
+        # Replace the file atomically: searches load it concurrently and cache
+        # what they read under its signature
         index_path = self._get_index_path(document_id)
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
         
-        with open(index_path, "wb") as f:
-            pickle.dump(index_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(tmp_path, "wb") as f:
+            f.write(_encode_index_data(index_data))
+        os.replace(tmp_path, index_path)
     
     def load(self, document_id: str) -> Optional[BM25Service]:
         """
         Load a BM25 index from disk.
         
-        Deserializes the index data and rebuilds the BM25Service instance.
+        Memory-maps the postings file when it matches the index data;
+        otherwise (older files) rebuilds the index from the tokenized corpus.
         
         Args:
             document_id: Unique identifier for the document
@@ -125,7 +238,8 @@ class BM25IndexStore:
             
         Raises:
             IOError: If the file exists but cannot be read
-            pickle.UnpicklingError: If the file is corrupted
+            ValueError: If the file is corrupted or of an unknown format
+            pickle.UnpicklingError: If a version 1 (pickle) file is corrupted
         """
         index_path = self._get_index_path(document_id)
         
@@ -133,16 +247,226 @@ class BM25IndexStore:
             return None
         
         with open(index_path, "rb") as f:
-            index_data: BM25IndexData = pickle.load(f)
+            index_data = _decode_index_data(f.read())
         
-        # Rebuild the BM25Service from the stored data
         service = BM25Service()
-        service._chunks = index_data.chunks
-        service._tokenized_corpus = index_data.tokenized_corpus
-        service._index = BM25Okapi(index_data.tokenized_corpus)
+        postings = None
+        if index_data.postings_token:
+            postings = self._read_postings(document_id, index_data.postings_token, len(index_data.chunks))
+        if postings is not None:
+            service.restore(index_data.chunks, postings)
+            return service
+        
+        # Rebuild the postings from the stored data
+        tokenized_corpus = index_data.tokenized_corpus or tokenize_document(
+            [chunk.text for chunk in index_data.chunks]
+        )
+        service.restore(index_data.chunks, _build_postings(tokenized_corpus), tokenized_corpus)
         
         return service
     
+    def load_many(self, document_ids: List[str]) -> Dict[str, Optional[BM25Service]]:
+        """
+        Load the BM25 indexes of several documents concurrently.
+        
+        Args:
+            document_ids: Unique identifiers of the documents
+            
+        Returns:
+            Mapping of document_id to its loaded BM25Service, or None if not found
+            
+        Raises:
+            IOError: If a file exists but cannot be read
+            ValueError: If a file is corrupted or of an unknown format
+            pickle.UnpicklingError: If a version 1 (pickle) file is corrupted
+        """
+        unique_ids = list(dict.fromkeys(document_ids))
+        if len(unique_ids) <= 1:
+            return {document_id: self.load(document_id) for document_id in unique_ids}
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(unique_ids))) as executor:
+            return dict(zip(unique_ids, executor.map(self.load, unique_ids)))
+    
+    def save_async(self, document_id: str, service: BM25Service) -> None:
+        """
+        Queue a BM25 index to be saved by a background writer.
+        
+        For bulk ingestion: pending indexes are written in batches, at least
+        every ASYNC_FLUSH_INTERVAL seconds or once ASYNC_FLUSH_BATCH_SIZE are
+        pending, with one directory sync per batch. A document queued again
+        before the write is only written once, with its latest index. The
+        index becomes visible to load() when it is written; call flush() to
+        wait for that.
+        
+        Args:
+            document_id: Unique identifier for the document
+            service: BM25Service instance with a built index
+            
+        Raises:
+            ValueError: If the service has no built index
+            RuntimeError: If the store has been closed
+        """
+        if not service.is_indexed:
+            raise ValueError("Cannot save: BM25Service has no built index")
+        
+        with self._pending_lock:
+            if self._closed:
+                raise RuntimeError("BM25IndexStore is closed")
+            self._pending[document_id] = service
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop,
+                    name="bm25-index-writer",
+                    daemon=True,
+                )
+                self._writer.start()
+            if len(self._pending) >= ASYNC_FLUSH_BATCH_SIZE:
+                self._wake.set()
+    
+    def flush(self) -> None:
+        """Write all indexes queued by save_async() now."""
+        self._write_pending()
+    
+    def close(self) -> None:
+        """Write the queued indexes and stop the background writer."""
+        with self._pending_lock:
+            self._closed = True
+            writer = self._writer
+        self._wake.set()
+        if writer is not None:
+            writer.join()
+        self._write_pending()
+    
+    def _write_loop(self) -> None:
+        """Background writer of save_async()."""
+        while not self._closed:
+            self._wake.wait(ASYNC_FLUSH_INTERVAL)
+            self._wake.clear()
+            self._write_pending()
+    
+    def _write_pending(self) -> None:
+        """Write the pending indexes, then sync the storage directory once."""
+        with self._write_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            
+            for document_id, service in batch.items():
+                try:
+                    self.save(document_id, service)
+                except Exception as e:
+                    logger.error(f"Failed to save BM25 index for document {document_id}: {e}")
+            self._sync_storage_dir()
+    
+    def _sync_storage_dir(self) -> None:
+        """Persist the directory entries of renamed files (POSIX only)."""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self._storage_path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def _write_postings(self, document_id: str, postings_token: str, service: BM25Service) -> None:
+        """Write a service's postings to the document's postings file."""
+        postings = service.get_postings()
+        vocabulary = "\x00".join(postings.vocabulary).encode("utf-8")
+        header = _POSTINGS_HEADER.pack(
+            POSTINGS_MAGIC,
+            POSTINGS_VERSION,
+            uuid.UUID(postings_token).bytes,
+            service.chunk_count,
+            len(postings.vocabulary),
+            len(postings.ids),
+            len(vocabulary),
+        )
+        
+        # Write to a temporary file and rename, so readers never see a partial file
+        postings_path = self._get_postings_path(document_id)
+        tmp_path = postings_path.with_name(postings_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for array, dtype in (
+                (postings.offsets, "<i8"),
+                (postings.weights, "<f8"),
+                (postings.max_weights, "<f8"),
+                (postings.ids, "<i4"),
+            ):
+                f.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+            f.write(vocabulary)
+        os.replace(tmp_path, postings_path)
+    
+    def _read_postings(
+        self,
+        document_id: str,
+        postings_token: str,
+        chunk_count: int,
+    ) -> Optional[_PostingLists]:
+        """
+        Memory-map a document's postings file.
+        
+        Returns:
+            Postings whose arrays are read-only views of the mapping, or None
+            if the file is missing or does not belong to the index data
+        """
+        try:
+            with open(self._get_postings_path(document_id), "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        
+        try:
+            magic, version, token, chunks, terms, count, vocabulary_bytes = _POSTINGS_HEADER.unpack_from(buffer)
+            if (
+                magic != POSTINGS_MAGIC
+                or version != POSTINGS_VERSION
+                or token != uuid.UUID(postings_token).bytes
+                or chunks != chunk_count
+            ):
+                logger.warning(f"Ignoring stale BM25 postings for document {document_id}")
+                return None
+            
+            offset = _POSTINGS_HEADER.size
+            arrays = []
+            for dtype, length in (("<i8", terms + 1), ("<f8", count), ("<f8", terms), ("<i4", count)):
+                arrays.append(np.frombuffer(buffer, dtype=dtype, count=length, offset=offset))
+                offset += arrays[-1].nbytes
+            vocabulary = buffer[offset:offset + vocabulary_bytes].decode("utf-8").split("\x00") if terms else []
+        except (struct.error, ValueError) as e:
+            logger.warning(f"Unreadable BM25 postings for document {document_id}: {e}")
+            return None
+        
+        offsets, weights, max_weights, ids = arrays
+        return _PostingLists(
+            vocabulary=dict(zip(vocabulary, range(terms))),
+            offsets=offsets,
+            ids=ids,
+            weights=weights,
+            max_weights=max_weights,
+        )
+    
+    def signature(self, document_id: str) -> Optional[Tuple[int, int]]:
+        """
+        Get a cheap change signature for a document's stored index.
+        
+        The signature is the index file's (mtime_ns, size); it changes
+        whenever the index is saved again, which makes it usable as a cache
+        key for loaded indexes without reading the file.
+        
+        Args:
+            document_id: Unique identifier for the document
+            
+        Returns:
+            (mtime_ns, size) tuple, or None if no index is stored
+        """
+        try:
+            stat = self._get_index_path(document_id).stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
     def exists(self, document_id: str) -> bool:
         """
         Check if an index exists for a document.
@@ -165,7 +489,11 @@ class BM25IndexStore:
         Returns:
             True if the index was deleted, False if it didn't exist
         """
+        with self._pending_lock:
+            self._pending.pop(document_id, None)
+        
         index_path = self._get_index_path(document_id)
+        self._get_postings_path(document_id).unlink(missing_ok=True)
         
         if index_path.exists():
             index_path.unlink()
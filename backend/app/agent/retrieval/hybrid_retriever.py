@@ -5,6 +5,7 @@ This module implements hybrid retrieval using:
 - Vector-based semantic search via ChromaDB
 - Keyword-based search via BM25
 - Reciprocal Rank Fusion (RRF) for result combination
+- Optional int8/binary quantized candidate search with float32 re-ranking
 
 Requirements:
 - 6.1: THE Agentic_RAG_System SHALL support vector-based semantic search using embeddings.
@@ -15,20 +16,54 @@ Requirements:
        vector and keyword search results with a default of 0.7:0.3.
 """
 
+import asyncio
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from operator import attrgetter
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import chromadb
+import numpy as np
 
 from .bm25_service import BM25Service, BM25SearchResult
 from .bm25_store import BM25IndexStore
+from .quantization import QUANTIZATION_MODES, Quantization, QuantizedIndex
 
 
 logger = logging.getLogger(__name__)
 
+_FUSED_SCORE = attrgetter("fused_score")
 
-@dataclass
+
+@lru_cache(maxsize=64)
+def _rank_scores(weight: float, rrf_k: int, count: int) -> Tuple[float, ...]:
+    """
+    Get the weighted RRF scores of ranks 1..count.
+    
+    Evaluated as weight * (1 / (k + rank)) so the values match the scalar
+    formula bit for bit. Cached, since a retriever fuses lists of the same
+    few lengths with fixed weights.
+    """
+    ranks = np.arange(1, count + 1, dtype=np.float64)
+    return tuple((weight * (1.0 / (rrf_k + ranks))).tolist())
+
+
+def _distance_scores(distances: Any) -> List[float]:
+    """
+    Convert a column of L2 distances to similarity scores, 1 / (1 + distance).
+    
+    Computed in float64, so the scores equal the scalar expression.
+    """
+    return (1.0 / (1.0 + np.asarray(distances, dtype=np.float64))).tolist()
+
+
+@dataclass(slots=True)
 class RetrievalResult:
     """
     Result from hybrid retrieval.
@@ -72,6 +107,15 @@ class HybridRetriever:
     # Default RRF constant - controls impact of lower-ranked documents
     DEFAULT_RRF_K = 60
     
+    # Default number of loaded BM25 indexes kept in memory
+    DEFAULT_BM25_CACHE_SIZE = 512
+    
+    # Quantized candidates re-ranked with exact float32 distances
+    DEFAULT_RERANK_CANDIDATES = 100
+    
+    # Threads running vector searches while the caller runs the BM25 search
+    DEFAULT_SEARCH_WORKERS = 8
+    
     def __init__(
         self,
         chroma_client: chromadb.Client,
@@ -80,6 +124,10 @@ class HybridRetriever:
         bm25_weight: float = 0.3,
         rrf_k: int = DEFAULT_RRF_K,
         collection_name: str = "documents",
+        bm25_cache_size: int = DEFAULT_BM25_CACHE_SIZE,
+        quantization: Quantization = "fp32",
+        rerank_candidates: int = DEFAULT_RERANK_CANDIDATES,
+        search_workers: int = DEFAULT_SEARCH_WORKERS,
     ) -> None:
         """
         Initialize the hybrid retriever.
@@ -91,7 +139,20 @@ class HybridRetriever:
             bm25_weight: Weight for BM25 search results (default 0.3)
             rrf_k: RRF constant k (default 60)
             collection_name: Name of the ChromaDB collection
+            bm25_cache_size: Maximum number of loaded BM25 indexes kept in memory
+            quantization: Default vector search mode - "fp32" queries ChromaDB
+                directly, "int8"/"binary" scan an in-memory quantized copy of
+                the document's embeddings and re-rank with float32
+            rerank_candidates: Number of quantized candidates re-ranked with float32
+            search_workers: Threads running vector searches concurrently with
+                the BM25 search of the same query
+        
+        Raises:
+            ValueError: If quantization is not a supported mode
         """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization mode: {quantization}")
+        
         self._chroma = chroma_client
         self._bm25_store = bm25_store or BM25IndexStore()
         self._vector_weight = vector_weight
@@ -99,6 +160,24 @@ class HybridRetriever:
         self._rrf_k = rrf_k
         self._collection_name = collection_name
         
+        # LRU cache of loaded BM25 indexes: document_id -> (store signature, service)
+        self._bm25_cache: "OrderedDict[str, Tuple[Tuple[int, int], BM25Service]]" = OrderedDict()
+        self._bm25_cache_size = max(1, bm25_cache_size)
+        self._bm25_cache_lock = threading.Lock()
+        
+        # Quantized embeddings: (document_id, user_id, mode) -> (store signature, index).
+        # Validated with the BM25 signature, since IndexManager writes both stores together.
+        self._quantization = quantization
+        self._rerank_candidates = max(1, rerank_candidates)
+        self._quantized_cache: "OrderedDict[Tuple[str, str, str], Tuple[Tuple[int, int], QuantizedIndex]]" = OrderedDict()
+        
+        # Vector and BM25 searches are independent: the vector search (ChromaDB
+        # call) runs on this pool while the calling thread does the BM25 search
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, search_workers),
+            thread_name_prefix="hybrid-retriever",
+        )
+        
         # Get or create the collection
         self._collection = self._chroma.get_or_create_collection(collection_name)
     
@@ -131,6 +210,31 @@ class HybridRetriever:
         """Get the RRF k constant."""
         return self._rrf_k
     
+    @property
+    def quantization(self) -> str:
+        """Get the default vector search mode."""
+        return self._quantization
+    
+    def invalidate(self, document_id: Optional[str] = None) -> None:
+        """
+        Drop cached BM25 indexes and quantized embeddings.
+        
+        Cached indexes are also revalidated against the store on every
+        search, so this is only needed to release memory early (e.g. when a
+        document is deleted or re-indexed).
+        
+        Args:
+            document_id: Document to drop, or None to clear the whole cache
+        """
+        with self._bm25_cache_lock:
+            if document_id is None:
+                self._bm25_cache.clear()
+                self._quantized_cache.clear()
+            else:
+                self._bm25_cache.pop(document_id, None)
+                for key in [key for key in self._quantized_cache if key[0] == document_id]:
+                    del self._quantized_cache[key]
+    
     def search(
         self,
         query: str,
@@ -138,43 +242,189 @@ class HybridRetriever:
         user_id: str,
         query_embedding: List[float],
         k: int = 10,
+        quantization: Optional[Quantization] = None,
+        timeout: Optional[float] = None,
     ) -> List[RetrievalResult]:
         """
         Perform hybrid search combining vector and BM25 results.
         
+        The vector and BM25 searches run concurrently.
+        
         Args:
             query: The search query string
             document_id: ID of the document to search within
             user_id: ID of the user who owns the document
             query_embedding: Pre-computed embedding for the query
             k: Maximum number of results to return
+            quantization: Vector search mode, defaults to the retriever's mode
+            timeout: Seconds to wait for the vector search of a document
+                with a BM25 index; when exceeded, only the BM25 results are used
             
         Returns:
             List of RetrievalResult objects sorted by fused score (descending)
         """
-        # Perform vector search
-        vector_results = self._vector_search(
+        # Without a BM25 index there is nothing to fuse: fetch only k vector results
+        if not self._bm25_store.exists(document_id):
+            self._log_vector_only(document_id)
+            return self._vector_search(
+                query_embedding=query_embedding,
+                document_id=document_id,
+                user_id=user_id,
+                k=k,
+                quantization=quantization,
+            )
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        # Start the vector search
+        vector_future = self._executor.submit(
+            self._vector_search,
             query_embedding=query_embedding,
             document_id=document_id,
             user_id=user_id,
             k=k * 2,  # Fetch more for better fusion
+            quantization=quantization,
         )
         
-        # Perform BM25 search
+        # Perform BM25 search meanwhile
         bm25_results = self._bm25_search(
             query=query,
             document_id=document_id,
             k=k * 2,
         )
         
+        vector_results = self._wait_vector_search(vector_future, deadline, document_id, [])
+        
+        return self._fuse(vector_results, bm25_results, document_id, k)
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        document_id: str,
+        user_id: str,
+        query_embeddings: List[List[float]],
+        k: int = 10,
+        quantization: Optional[Quantization] = None,
+        timeout: Optional[float] = None,
+    ) -> List[List[RetrievalResult]]:
+        """
+        Perform hybrid search for several queries at once.
+        
+        Useful when a question is decomposed into sub-queries: the vector
+        side issues a single ChromaDB query for all embeddings and the BM25
+        side scores all queries with one matrix product.
+        
+        Args:
+            queries: The search query strings
+            document_id: ID of the document to search within
+            user_id: ID of the user who owns the document
+            query_embeddings: Pre-computed embeddings, one per query
+            k: Maximum number of results to return per query
+            quantization: Vector search mode, defaults to the retriever's mode
+            timeout: Seconds to wait for the vector search of a document
+                with a BM25 index; when exceeded, only the BM25 results are used
+            
+        Returns:
+            One list of RetrievalResult objects per query, in input order
+            
+        Raises:
+            ValueError: If queries and query_embeddings differ in length
+        """
+        if len(queries) != len(query_embeddings):
+            raise ValueError("queries and query_embeddings must have the same length")
+        if not queries:
+            return []
+        
+        # Without a BM25 index there is nothing to fuse: fetch only k vector results
+        if not self._bm25_store.exists(document_id):
+            self._log_vector_only(document_id)
+            return self._vector_search_batch(
+                query_embeddings=query_embeddings,
+                document_id=document_id,
+                user_id=user_id,
+                k=k,
+                quantization=quantization,
+            )
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        vector_future = self._executor.submit(
+            self._vector_search_batch,
+            query_embeddings=query_embeddings,
+            document_id=document_id,
+            user_id=user_id,
+            k=k * 2,  # Fetch more for better fusion
+            quantization=quantization,
+        )
+        bm25_batches = self._bm25_search_batch(
+            queries=queries,
+            document_id=document_id,
+            k=k * 2,
+        )
+        vector_batches = self._wait_vector_search(
+            vector_future, deadline, document_id, [[] for _ in queries]
+        )
+        
+        return [
+            self._fuse(vector_results, bm25_results, document_id, k)
+            for vector_results, bm25_results in zip(vector_batches, bm25_batches)
+        ]
+    
+    async def asearch(self, *args: Any, **kwargs: Any) -> List[RetrievalResult]:
+        """
+        Async variant of search() for use from request handlers.
+        
+        Runs the search on a worker thread. The BM25 and vector kernels
+        (bincount, take, partition) are NumPy calls that release the GIL, so
+        searches of concurrent requests overlap instead of blocking the
+        event loop one after another.
+        """
+        return await asyncio.to_thread(self.search, *args, **kwargs)
+    
+    async def asearch_batch(self, *args: Any, **kwargs: Any) -> List[List[RetrievalResult]]:
+        """Async variant of search_batch(); see asearch()."""
+        return await asyncio.to_thread(self.search_batch, *args, **kwargs)
+    
+    def _wait_vector_search(
+        self,
+        future: "Future[Any]",
+        deadline: Optional[float],
+        document_id: str,
+        default: Any,
+    ) -> Any:
+        """Get a vector search result, or the default once the deadline has passed."""
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning(
+                "Vector search timed out, using BM25 results only",
+                extra={"document_id": document_id},
+            )
+            return default
+    
+    @staticmethod
+    def _log_vector_only(document_id: str) -> None:
+        """Log a fall back to vector-only search (Requirement 6.5)."""
+        logger.info(
+            "BM25 returned no results, falling back to vector-only search",
+            extra={"document_id": document_id},
+        )
+    
+    def _fuse(
+        self,
+        vector_results: List[RetrievalResult],
+        bm25_results: List[RetrievalResult],
+        document_id: str,
+        k: int,
+    ) -> List[RetrievalResult]:
+        """Fuse the results of one query, falling back to vector-only results."""
         # If BM25 returns no results, fall back to vector-only
         # Requirement 6.5: IF keyword search returns no results, THEN THE
         # Agentic_RAG_System SHALL fall back to vector-only search.
         if not bm25_results:
-            logger.info(
-                "BM25 returned no results, falling back to vector-only search",
-                extra={"document_id": document_id},
-            )
+            self._log_vector_only(document_id)
             return vector_results[:k]
         
         # Fuse results using RRF
@@ -188,6 +438,7 @@ class HybridRetriever:
         document_id: str,
         user_id: str,
         k: int,
+        quantization: Optional[Quantization] = None,
     ) -> List[RetrievalResult]:
         """
         Perform vector search using ChromaDB.
@@ -197,13 +448,43 @@ class HybridRetriever:
             document_id: ID of the document to search within
             user_id: ID of the user who owns the document
             k: Maximum number of results
+            quantization: Vector search mode, defaults to the retriever's mode
             
         Returns:
             List of RetrievalResult objects with vector_score populated
         """
+        return self._vector_search_batch([query_embedding], document_id, user_id, k, quantization)[0]
+    
+    def _vector_search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        document_id: str,
+        user_id: str,
+        k: int,
+        quantization: Optional[Quantization] = None,
+    ) -> List[List[RetrievalResult]]:
+        """
+        Perform vector search for several query embeddings in one ChromaDB call.
+        
+        Args:
+            query_embeddings: The query embedding vectors
+            document_id: ID of the document to search within
+            user_id: ID of the user who owns the document
+            k: Maximum number of results per query
+            quantization: Vector search mode, defaults to the retriever's mode
+            
+        Returns:
+            One list of RetrievalResult objects per embedding
+        """
+        mode = quantization or self._quantization
+        if mode != "fp32":
+            index = self._get_quantized_index(document_id, user_id, mode)
+            if index is not None:
+                return self._quantized_vector_search_batch(index, query_embeddings, document_id, k)
+        
         try:
             results = self._collection.query(
-                query_embeddings=[query_embedding],
+                query_embeddings=query_embeddings,
                 where={
                     "$and": [
                         {"user_id": {"$eq": user_id}},
@@ -215,30 +496,171 @@ class HybridRetriever:
             )
         except Exception as e:
             logger.error(f"Vector search failed: {e}", extra={"document_id": document_id})
-            return []
-        
-        retrieval_results: List[RetrievalResult] = []
+            return [[] for _ in query_embeddings]
         
-        if not results["ids"] or not results["ids"][0]:
-            return retrieval_results
+        batches: List[List[RetrievalResult]] = []
         
-        for idx in range(len(results["ids"][0])):
-            # ChromaDB returns distances, convert to similarity score
-            # Lower distance = higher similarity
-            distance = results["distances"][0][idx]
-            # Convert distance to a score (1 / (1 + distance))
-            vector_score = 1.0 / (1.0 + distance)
+        for query_idx in range(len(query_embeddings)):
+            retrieval_results: List[RetrievalResult] = []
+            batches.append(retrieval_results)
             
-            retrieval_results.append(RetrievalResult(
-                chunk_id=results["ids"][0][idx],
-                text=results["documents"][0][idx],
-                metadata=results["metadatas"][0][idx] if results["metadatas"] else {},
-                vector_score=vector_score,
-                bm25_score=None,
-                fused_score=vector_score,  # Initial score before fusion
-            ))
+            if not results["ids"] or query_idx >= len(results["ids"]) or not results["ids"][query_idx]:
+                continue
+            
+            ids = results["ids"][query_idx]
+            metadatas = results["metadatas"][query_idx] if results["metadatas"] else [{} for _ in ids]
+            # ChromaDB returns distances, convert to similarity scores (1 / (1 + distance))
+            # for the whole column at once. Lower distance = higher similarity
+            scores = _distance_scores(results["distances"][query_idx])
+            
+            retrieval_results.extend(
+                RetrievalResult(
+                    chunk_id=chunk_id,
+                    text=text,
+                    metadata=metadata,
+                    vector_score=vector_score,
+                    bm25_score=None,
+                    fused_score=vector_score,  # Initial score before fusion
+                )
+                for chunk_id, text, metadata, vector_score in zip(
+                    ids, results["documents"][query_idx], metadatas, scores
+                )
+            )
         
-        return retrieval_results
+        return batches
+    
+    def _quantized_vector_search_batch(
+        self,
+        index: QuantizedIndex,
+        query_embeddings: List[List[float]],
+        document_id: str,
+        k: int,
+    ) -> List[List[RetrievalResult]]:
+        """
+        Perform vector search against a quantized index.
+    
+        One scan of the quantized codes selects up to ``rerank_candidates``
+        rows for every query; their float32 embeddings are then fetched in one
+        ChromaDB call for the whole batch and re-ranked by exact squared L2
+        distance, matching ChromaDB's scores.
+    
+        Args:
+            index: Quantized embeddings of the document
+            query_embeddings: The query embedding vectors
+            document_id: ID of the document being searched
+            k: Maximum number of results per query
+    
+        Returns:
+            One list of RetrievalResult objects per embedding
+        """
+        n_candidates = max(k, self._rerank_candidates)
+        candidate_rows = index.candidates_batch(query_embeddings, n_candidates)
+    
+        row_ids = sorted({int(row) for rows in candidate_rows for row in rows})
+        if not row_ids:
+            return [[] for _ in query_embeddings]
+    
+        try:
+            fetched = self._collection.get(
+                ids=[index.chunk_ids[row] for row in row_ids],
+                include=["embeddings"],
+            )
+        except Exception as e:
+            logger.error(f"Vector re-rank failed: {e}", extra={"document_id": document_id})
+            return [[] for _ in query_embeddings]
+    
+        full_precision = dict(zip(fetched["ids"], fetched["embeddings"]))
+        batches: List[List[RetrievalResult]] = []
+    
+        for embedding, rows in zip(query_embeddings, candidate_rows):
+            rows = [int(row) for row in rows if index.chunk_ids[row] in full_precision]
+            if not rows:
+                batches.append([])
+                continue
+    
+            matrix = np.asarray([full_precision[index.chunk_ids[row]] for row in rows], dtype=np.float32)
+            distances = ((matrix - np.asarray(embedding, dtype=np.float32)) ** 2).sum(axis=1)
+            order = np.argsort(distances, kind="stable")[:k]
+    
+            retrieval_results: List[RetrievalResult] = []
+            for position, vector_score in zip(order.tolist(), _distance_scores(distances[order])):
+                row = rows[position]
+                retrieval_results.append(RetrievalResult(
+                    chunk_id=index.chunk_ids[row],
+                    text=index.texts[row],
+                    metadata=index.metadatas[row],
+                    vector_score=vector_score,
+                    bm25_score=None,
+                    fused_score=vector_score,  # Initial score before fusion
+                ))
+            batches.append(retrieval_results)
+    
+        return batches
+    
+    def _get_quantized_index(
+        self,
+        document_id: str,
+        user_id: str,
+        mode: str,
+    ) -> Optional[QuantizedIndex]:
+        """
+        Get the quantized embeddings of a document, building them when needed.
+    
+        Cached entries share the BM25 store signature as their version, so a
+        re-indexed document is re-quantized on its next search. Documents
+        without a BM25 index are not cached and fall back to ChromaDB.
+    
+        Args:
+            document_id: ID of the document
+            user_id: ID of the user who owns the document
+            mode: "int8" or "binary"
+    
+        Returns:
+            QuantizedIndex for the document, or None to use ChromaDB directly
+        """
+        signature = self._bm25_store.signature(document_id)
+        if signature is None:
+            return None
+    
+        key = (document_id, user_id, mode)
+        with self._bm25_cache_lock:
+            cached = self._quantized_cache.get(key)
+            if cached is not None and cached[0] == signature:
+                self._quantized_cache.move_to_end(key)
+                return cached[1]
+    
+        try:
+            stored = self._collection.get(
+                where={
+                    "$and": [
+                        {"user_id": {"$eq": user_id}},
+                        {"document_id": {"$eq": document_id}},
+                    ]
+                },
+                include=["embeddings", "documents", "metadatas"],
+            )
+        except Exception as e:
+            logger.error(f"Loading embeddings failed: {e}", extra={"document_id": document_id})
+            return None
+    
+        if not stored["ids"]:
+            return None
+    
+        index = QuantizedIndex.build(
+            mode,
+            stored["ids"],
+            stored["documents"],
+            stored["metadatas"] or [{} for _ in stored["ids"]],
+            np.asarray(stored["embeddings"], dtype=np.float32),
+        )
+    
+        with self._bm25_cache_lock:
+            self._quantized_cache[key] = (signature, index)
+            self._quantized_cache.move_to_end(key)
+            while len(self._quantized_cache) > self._bm25_cache_size:
+                self._quantized_cache.popitem(last=False)
+    
+        return index
     
     def _bm25_search(
         self,
@@ -257,8 +679,8 @@ class HybridRetriever:
         Returns:
             List of RetrievalResult objects with bm25_score populated
         """
-        # Load the BM25 index for this document
-        bm25_service = self._bm25_store.load(document_id)
+        # Load the BM25 index for this document (cached across queries)
+        bm25_service = self._get_bm25_service(document_id)
         
         if bm25_service is None:
             logger.warning(
@@ -273,6 +695,44 @@ class HybridRetriever:
             logger.error(f"BM25 search failed: {e}", extra={"document_id": document_id})
             return []
         
+        return self._to_retrieval_results(bm25_results)
+    
+    def _bm25_search_batch(
+        self,
+        queries: List[str],
+        document_id: str,
+        k: int,
+    ) -> List[List[RetrievalResult]]:
+        """
+        Perform BM25 keyword search for several queries at once.
+        
+        Args:
+            queries: The search query strings
+            document_id: ID of the document to search within
+            k: Maximum number of results per query
+            
+        Returns:
+            One list of RetrievalResult objects per query
+        """
+        bm25_service = self._get_bm25_service(document_id)
+        
+        if bm25_service is None:
+            logger.warning(
+                f"No BM25 index found for document {document_id}",
+                extra={"document_id": document_id},
+            )
+            return [[] for _ in queries]
+        
+        try:
+            bm25_batches = bm25_service.search_batch(queries, k=k)
+        except Exception as e:
+            logger.error(f"BM25 search failed: {e}", extra={"document_id": document_id})
+            return [[] for _ in queries]
+        
+        return [self._to_retrieval_results(bm25_results) for bm25_results in bm25_batches]
+    
+    def _to_retrieval_results(self, bm25_results: List[BM25SearchResult]) -> List[RetrievalResult]:
+        """Convert BM25 search results to RetrievalResult objects."""
         retrieval_results: List[RetrievalResult] = []
         
         for result in bm25_results:
@@ -287,6 +747,43 @@ class HybridRetriever:
         
         return retrieval_results
     
+    def _get_bm25_service(self, document_id: str) -> Optional[BM25Service]:
+        """
+        Get the BM25 index for a document, loading it only when needed.
+        
+        Loaded indexes are kept in an LRU cache keyed by document_id and
+        validated against the store's file signature, so a re-indexed
+        document is reloaded on its next search.
+        
+        Args:
+            document_id: ID of the document
+            
+        Returns:
+            BM25Service for the document, or None if no index is stored
+        """
+        signature = self._bm25_store.signature(document_id)
+        if signature is None:
+            self.invalidate(document_id)
+            return None
+        
+        with self._bm25_cache_lock:
+            cached = self._bm25_cache.get(document_id)
+            if cached is not None and cached[0] == signature:
+                self._bm25_cache.move_to_end(document_id)
+                return cached[1]
+        
+        bm25_service = self._bm25_store.load(document_id)
+        if bm25_service is None:
+            return None
+        
+        with self._bm25_cache_lock:
+            self._bm25_cache[document_id] = (signature, bm25_service)
+            self._bm25_cache.move_to_end(document_id)
+            while len(self._bm25_cache) > self._bm25_cache_size:
+                self._bm25_cache.popitem(last=False)
+        
+        return bm25_service
+    
     def _rrf_fusion(
         self,
         vector_results: List[RetrievalResult],
@@ -312,14 +809,16 @@ class HybridRetriever:
         Returns:
             List of RetrievalResult objects sorted by fused score (descending)
         """
-        # Build a map of chunk_id -> RetrievalResult for merging
+        # RRF contribution of each rank, computed for the whole list at once
+        vector_rrf = _rank_scores(self._vector_weight, self._rrf_k, len(vector_results))
+        bm25_rrf = _rank_scores(self._bm25_weight, self._rrf_k, len(bm25_results))
+        
+        # Merge both lists into chunk_id -> RetrievalResult in a single pass
         result_map: Dict[str, RetrievalResult] = {}
         
-        # Process vector results and assign RRF scores
-        for rank, result in enumerate(vector_results, start=1):
-            rrf_score = self._vector_weight * (1.0 / (self._rrf_k + rank))
-            
-            if result.chunk_id not in result_map:
+        for result, rrf_score in zip(vector_results, vector_rrf):
+            fused = result_map.get(result.chunk_id)
+            if fused is None:
                 result_map[result.chunk_id] = RetrievalResult(
                     chunk_id=result.chunk_id,
                     text=result.text,
@@ -329,14 +828,12 @@ class HybridRetriever:
                     fused_score=rrf_score,
                 )
             else:
-                result_map[result.chunk_id].vector_score = result.vector_score
-                result_map[result.chunk_id].fused_score += rrf_score
+                fused.vector_score = result.vector_score
+                fused.fused_score += rrf_score
         
-        # Process BM25 results and add/update RRF scores
-        for rank, result in enumerate(bm25_results, start=1):
-            rrf_score = self._bm25_weight * (1.0 / (self._rrf_k + rank))
-            
-            if result.chunk_id not in result_map:
+        for result, rrf_score in zip(bm25_results, bm25_rrf):
+            fused = result_map.get(result.chunk_id)
+            if fused is None:
                 result_map[result.chunk_id] = RetrievalResult(
                     chunk_id=result.chunk_id,
                     text=result.text,
@@ -346,14 +843,8 @@ class HybridRetriever:
                     fused_score=rrf_score,
                 )
             else:
-                result_map[result.chunk_id].bm25_score = result.bm25_score
-                result_map[result.chunk_id].fused_score += rrf_score
+                fused.bm25_score = result.bm25_score
+                fused.fused_score += rrf_score
         
         # Sort by fused score descending
-        fused_results = sorted(
-            result_map.values(),
-            key=lambda r: r.fused_score,
-            reverse=True,
-        )
-        
-        return fused_results
+        return sorted(result_map.values(), key=_FUSED_SCORE, reverse=True)
@@ -9,12 +9,36 @@ Requirements: 6.2 - THE Agentic_RAG_System SHALL support keyword-based search us
 """
 
 import logging
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Protocol
+from typing import Any, Callable, Dict, List, Optional, Protocol, Set, Union
 
-from .bm25_service import BM25Service, ChunkData
+import numpy as np
+
+from .bm25_service import BM25Service, ChunkData, _PostingLists, _build_postings
 from .bm25_store import BM25IndexStore
+from .tokenizer import tokenize_document
+
+
+# Chunks per vector store add() when indexing several documents at once;
+# ChromaDB inserts are fastest in batches of a few hundred rows
+VECTOR_ADD_BATCH_SIZE = 200
+
+# Threads used by index_documents(); vector store adds mostly wait on I/O,
+# so several documents' adds and BM25 builds overlap
+MAX_INDEX_WORKERS = 8
+
+
+def _build_bm25_postings(texts: List[str]) -> _PostingLists:
+    """
+    Tokenize chunk texts and build their BM25 postings.
+    
+    Module-level so it can run in a worker process: only the texts go in
+    and only the postings arrays come back.
+    """
+    return _build_postings(tokenize_document(texts))
 
 
 class VectorStoreProtocol(Protocol):
@@ -23,30 +47,43 @@ class VectorStoreProtocol(Protocol):
     def add(
         self,
         documents: List[str],
-        embeddings: List[List[float]],
+        embeddings: Union[np.ndarray, List[List[float]]],
         metadatas: List[Dict[str, Any]],
         ids: List[str],
     ) -> None:
         """Add documents to the vector store."""
         ...
     
-    def delete(self, where: Dict[str, Any]) -> None:
-        """Delete documents from the vector store."""
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Delete documents from the vector store by ID or metadata filter."""
         ...
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexDocumentRequest:
     """Request data for indexing a document."""
     document_id: str
     user_id: str
     chunk_ids: List[str]
     texts: List[str]
-    embeddings: List[List[float]]
+    # One float32 row per chunk; lists of floats are converted on creation
+    embeddings: np.ndarray
     metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    # False lets indexing add user_id/document_id to the metadata dicts in
+    # place instead of copying them; only for callers that hand them over
+    copy_metadata: bool = True
+    
+    def __post_init__(self) -> None:
+        # A packed array is 4 bytes per dimension, against a boxed Python
+        # float each, and is handed to the vector store without conversion
+        self.embeddings = np.asarray(self.embeddings, dtype=np.float32)
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexResult:
     """Result of an indexing operation."""
     success: bool
@@ -56,7 +93,7 @@ class IndexResult:
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DeleteResult:
     """Result of a delete operation."""
     success: bool
@@ -92,6 +129,7 @@ class IndexManager:
         vector_collection: VectorStoreProtocol,
         bm25_store: Optional[BM25IndexStore] = None,
         logger: Optional[logging.Logger] = None,
+        executor: Optional[Executor] = None,
     ) -> None:
         """
         Initialize the IndexManager.
@@ -100,9 +138,16 @@ class IndexManager:
             vector_collection: ChromaDB collection or compatible vector store
             bm25_store: BM25 index store for keyword search
             logger: Optional logger instance
+            executor: Optional executor (typically a ProcessPoolExecutor) that
+                tokenizes and builds BM25 indexes; tokenization holds the GIL,
+                so a process pool lets several documents build in parallel.
+                Indexes are built on the calling thread when omitted.
         """
         self._vector_collection = vector_collection
         self._bm25_store = bm25_store or BM25IndexStore()
+        self._executor = executor
+        # Saves write through fixed temporary file names
+        self._bm25_save_lock = threading.Lock()
         self._logger = logger or logging.getLogger("app.agent.retrieval.index_manager")
     
     def index_document(self, request: IndexDocumentRequest) -> IndexResult:
@@ -140,13 +185,14 @@ class IndexManager:
         try:
             self._index_vector_store(request, metadatas)
             result.vector_indexed = True
-            self._logger.info(
-                "Indexed document in vector store",
-                extra={
-                    "document_id": request.document_id,
-                    "chunk_count": len(request.texts),
-                },
-            )
+            if self._logger.isEnabledFor(logging.INFO):
+                self._logger.info(
+                    "Indexed document in vector store",
+                    extra={
+                        "document_id": request.document_id,
+                        "chunk_count": len(request.texts),
+                    },
+                )
         except Exception as e:
             result.error = f"Vector store indexing failed: {str(e)}"
             self._logger.error(
@@ -159,16 +205,172 @@ class IndexManager:
             return result
         
         # Step 2: Index in BM25 store
+        return self._index_bm25_or_rollback(request, metadatas, result)
+    
+    def index_documents(
+        self,
+        requests: List[IndexDocumentRequest],
+        max_workers: int = MAX_INDEX_WORKERS,
+    ) -> List[IndexResult]:
+        """
+        Index several documents concurrently, each as by index_document.
+        
+        One document's vector store add can wait on I/O while another's BM25
+        index is built; with an executor, the builds also run in parallel.
+        Each document keeps its own rollback.
+        
+        Args:
+            requests: Documents to index
+            max_workers: Maximum documents indexed at once
+            
+        Returns:
+            One IndexResult per request, in request order
+        """
+        if len(requests) <= 1 or max_workers <= 1:
+            return [self.index_document(request) for request in requests]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as pool:
+            return list(pool.map(self.index_document, requests))
+    
+    def index_documents_batched(
+        self,
+        requests: List[IndexDocumentRequest],
+        batch_size: int = VECTOR_ADD_BATCH_SIZE,
+    ) -> List[IndexResult]:
+        """
+        Index several documents, sending their chunks to the vector store in batches.
+        
+        Chunks from all requests are concatenated and added batch_size at a
+        time, so many small documents cost a few vector store transactions
+        instead of one each. Each document then gets the same guarantees as
+        index_document: if any of its chunks fail to reach the vector store,
+        or its BM25 index fails, its vector store entries are rolled back.
+        
+        Args:
+            requests: Documents to index
+            batch_size: Maximum chunks per vector store add
+            
+        Returns:
+            One IndexResult per request, in request order
+        """
+        results = [
+            IndexResult(success=False, document_id=request.document_id)
+            for request in requests
+        ]
+        metadatas_by_request: Dict[int, List[Dict[str, Any]]] = {}
+        
+        for i, request in enumerate(requests):
+            if not request.texts:
+                results[i].error = "No texts provided for indexing"
+                self._logger.warning(
+                    "Index request has no texts",
+                    extra={"document_id": request.document_id},
+                )
+                continue
+            if not len(request.chunk_ids) == len(request.texts) == len(request.embeddings):
+                # Chunks of all requests are concatenated below, so a mismatch
+                # would shift every later document's rows
+                results[i].error = (
+                    f"Mismatched chunk counts: {len(request.chunk_ids)} ids, "
+                    f"{len(request.texts)} texts, {len(request.embeddings)} embeddings"
+                )
+                self._logger.warning(
+                    "Index request has mismatched chunk counts",
+                    extra={"document_id": request.document_id},
+                )
+                continue
+            metadatas_by_request[i] = self._prepare_metadatas(request)
+        
+        # Step 1: Index in vector store, batching across document boundaries
+        owners: List[int] = []
+        texts: List[str] = []
+        embeddings: List[np.ndarray] = []
+        metadatas: List[Dict[str, Any]] = []
+        ids: List[str] = []
+        for i, request_metadatas in metadatas_by_request.items():
+            request = requests[i]
+            owners.extend([i] * len(request.texts))
+            texts.extend(request.texts)
+            embeddings.extend(request.embeddings)
+            metadatas.extend(request_metadatas)
+            ids.extend(request.chunk_ids)
+        
+        inserted: Set[int] = set()
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            batch_owners = set(owners[start:end])
+            try:
+                self._vector_collection.add(
+                    documents=texts[start:end],
+                    embeddings=np.stack(embeddings[start:end]),
+                    metadatas=metadatas[start:end],
+                    ids=ids[start:end],
+                )
+                inserted.update(batch_owners)
+            except Exception as e:
+                self._logger.error(
+                    "Failed to index batch in vector store",
+                    extra={
+                        "document_ids": [requests[i].document_id for i in batch_owners],
+                        "error": str(e),
+                    },
+                )
+                for i in batch_owners:
+                    results[i].error = results[i].error or f"Vector store indexing failed: {str(e)}"
+        
+        # Start every BM25 build before waiting on any, so an executor
+        # builds them in parallel
+        postings_futures: Dict[int, Future] = {}
+        if self._executor is not None:
+            for i in metadatas_by_request:
+                if not results[i].error:
+                    postings_futures[i] = self._executor.submit(
+                        _build_bm25_postings, requests[i].texts
+                    )
+        
+        # Step 2: Index in BM25 store, or roll back partially added documents
+        for i, request_metadatas in metadatas_by_request.items():
+            request = requests[i]
+            result = results[i]
+            if result.error:
+                if i in inserted:
+                    self._rollback_vector_store(request.document_id, request.chunk_ids)
+                continue
+            
+            result.vector_indexed = True
+            if self._logger.isEnabledFor(logging.INFO):
+                self._logger.info(
+                    "Indexed document in vector store",
+                    extra={
+                        "document_id": request.document_id,
+                        "chunk_count": len(request.texts),
+                    },
+                )
+            self._index_bm25_or_rollback(
+                request, request_metadatas, result, postings_futures.get(i)
+            )
+        
+        return results
+    
+    def _index_bm25_or_rollback(
+        self,
+        request: IndexDocumentRequest,
+        metadatas: List[Dict[str, Any]],
+        result: IndexResult,
+        postings_future: Optional[Future] = None,
+    ) -> IndexResult:
+        """Index a vector-indexed document in BM25, rolling back the vector store on failure."""
         try:
-            self._index_bm25_store(request, metadatas)
+            self._index_bm25_store(request, metadatas, postings_future)
             result.bm25_indexed = True
-            self._logger.info(
-                "Indexed document in BM25 store",
-                extra={
-                    "document_id": request.document_id,
-                    "chunk_count": len(request.texts),
-                },
-            )
+            if self._logger.isEnabledFor(logging.INFO):
+                self._logger.info(
+                    "Indexed document in BM25 store",
+                    extra={
+                        "document_id": request.document_id,
+                        "chunk_count": len(request.texts),
+                    },
+                )
         except Exception as e:
             # Rollback vector store on BM25 failure
             self._logger.error(
@@ -178,7 +380,7 @@ class IndexManager:
                     "error": str(e),
                 },
             )
-            self._rollback_vector_store(request.document_id, request.user_id)
+            self._rollback_vector_store(request.document_id, request.chunk_ids)
             result.vector_indexed = False
             result.error = f"BM25 indexing failed (vector store rolled back): {str(e)}"
             return result
@@ -211,10 +413,11 @@ class IndexManager:
         try:
             self._delete_from_vector_store(document_id, user_id)
             result.vector_deleted = True
-            self._logger.info(
-                "Deleted document from vector store",
-                extra={"document_id": document_id, "user_id": user_id},
-            )
+            if self._logger.isEnabledFor(logging.INFO):
+                self._logger.info(
+                    "Deleted document from vector store",
+                    extra={"document_id": document_id, "user_id": user_id},
+                )
         except Exception as e:
             errors.append(f"Vector store deletion failed: {str(e)}")
             self._logger.error(
@@ -231,15 +434,17 @@ class IndexManager:
             deleted = self._bm25_store.delete(document_id)
             result.bm25_deleted = deleted
             if deleted:
-                self._logger.info(
-                    "Deleted document from BM25 store",
-                    extra={"document_id": document_id},
-                )
+                if self._logger.isEnabledFor(logging.INFO):
+                    self._logger.info(
+                        "Deleted document from BM25 store",
+                        extra={"document_id": document_id},
+                    )
             else:
-                self._logger.debug(
-                    "No BM25 index found for document",
-                    extra={"document_id": document_id},
-                )
+                if self._logger.isEnabledFor(logging.DEBUG):
+                    self._logger.debug(
+                        "No BM25 index found for document",
+                        extra={"document_id": document_id},
+                    )
         except Exception as e:
             errors.append(f"BM25 store deletion failed: {str(e)}")
             self._logger.error(
@@ -267,20 +472,27 @@ class IndexManager:
         Prepare metadata dictionaries for each chunk.
         
         Ensures each metadata dict contains user_id and document_id.
+        The request's dicts are copied unless it sets copy_metadata=False.
         """
-        metadatas: List[Dict[str, Any]] = []
+        count = len(request.texts)
+        base = request.metadatas[:count]
+        user_id, document_id = request.user_id, request.document_id
         
-        for i, _ in enumerate(request.texts):
-            if i < len(request.metadatas):
-                metadata = dict(request.metadatas[i])
-            else:
-                metadata = {}
-            
-            metadata["user_id"] = request.user_id
-            metadata["document_id"] = request.document_id
-            metadatas.append(metadata)
+        if not request.copy_metadata:
+            for metadata in base:
+                metadata["user_id"] = user_id
+                metadata["document_id"] = document_id
+            base.extend(
+                {"user_id": user_id, "document_id": document_id}
+                for _ in range(count - len(base))
+            )
+            return base
         
-        return metadatas
+        base = base + [{}] * (count - len(base))
+        return [
+            {**metadata, "user_id": user_id, "document_id": document_id}
+            for metadata in base
+        ]
     
     def _index_vector_store(
         self,
@@ -299,8 +511,14 @@ class IndexManager:
         self,
         request: IndexDocumentRequest,
         metadatas: List[Dict[str, Any]],
+        postings_future: Optional[Future] = None,
     ) -> None:
-        """Build and persist BM25 index for the document."""
+        """
+        Build and persist BM25 index for the document.
+        
+        With an executor, the postings are built there (or taken from
+        postings_future, if already submitted) and the index is saved here.
+        """
         chunks = [
             ChunkData(
                 chunk_id=chunk_id,
@@ -314,24 +532,35 @@ class IndexManager:
             )
         ]
         
+        if postings_future is None and self._executor is not None:
+            postings_future = self._executor.submit(_build_bm25_postings, request.texts)
+        
         bm25_service = BM25Service()
-        bm25_service.build_index(chunks)
-        self._bm25_store.save(request.document_id, bm25_service)
+        if postings_future is not None:
+            bm25_service.restore(chunks, postings_future.result())
+        else:
+            bm25_service.build_index(chunks)
+        with self._bm25_save_lock:
+            self._bm25_store.save(request.document_id, bm25_service)
     
-    def _rollback_vector_store(self, document_id: str, user_id: str) -> None:
-        """Rollback vector store changes by deleting the document."""
+    def _rollback_vector_store(self, document_id: str, chunk_ids: List[str]) -> None:
+        """
+        Rollback vector store changes by deleting the chunks just added.
+        
+        Deleting by ID spares the store a metadata scan, and leaves alone
+        any chunks of the document that were indexed before this request.
+        """
         try:
-            self._delete_from_vector_store(document_id, user_id)
+            self._vector_collection.delete(ids=chunk_ids)
             self._logger.info(
                 "Successfully rolled back vector store",
-                extra={"document_id": document_id, "user_id": user_id},
+                extra={"document_id": document_id, "chunk_count": len(chunk_ids)},
             )
         except Exception as e:
             self._logger.error(
                 "Failed to rollback vector store - manual cleanup may be required",
                 extra={
                     "document_id": document_id,
-                    "user_id": user_id,
                     "error": str(e),
                 },
             )
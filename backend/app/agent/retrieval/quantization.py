@@ -0,0 +1,213 @@
+"""
+Embedding quantization for in-memory dense candidate search.
+
+Scanning float32 embeddings is memory-bandwidth bound. This module keeps a
+compact copy of a document's chunk embeddings:
+
+- int8: symmetric per-vector scalar quantization (4x smaller than float32)
+- binary: one sign bit per dimension (32x smaller), compared by Hamming distance
+
+Quantized scores are only used to pick candidates; callers re-rank the
+candidates with exact float32 distances to recover accuracy.
+
+int8 codes are scanned block by block: each block is widened to float32 in
+a reused buffer and multiplied with the float32 queries by BLAS, so a query
+reads one byte per dimension and never materializes a full-size temporary.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Sequence, Tuple
+
+import numpy as np
+
+
+Quantization = Literal["fp32", "int8", "binary"]
+
+QUANTIZATION_MODES: Tuple[str, ...] = ("fp32", "int8", "binary")
+
+# Largest magnitude of a symmetric int8 code
+INT8_MAX = 127
+
+# Rows of int8 codes widened to float32 per matrix product; the float32
+# block (256 x 768 x 4 bytes) stays in L2 cache
+SCAN_BLOCK_ROWS = 256
+
+# Popcount lookup table for packed binary codes
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 with one scale per vector.
+
+    Args:
+        embeddings: Float matrix of shape (n, dim)
+
+    Returns:
+        Tuple of (codes as int8 (n, dim), scales as float32 (n,))
+    """
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    scales = np.abs(embeddings).max(axis=1) / INT8_MAX
+    scales[scales == 0] = 1.0
+    codes = np.rint(embeddings / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Quantize embeddings to packed sign bits.
+
+    Args:
+        embeddings: Float matrix of shape (n, dim)
+
+    Returns:
+        uint8 matrix of shape (n, ceil(dim / 8))
+    """
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    return np.packbits(embeddings > 0, axis=1)
+
+
+def hamming_distances(codes: np.ndarray, query_code: np.ndarray) -> np.ndarray:
+    """
+    Compute Hamming distances between packed binary codes and one query code.
+
+    Args:
+        codes: Packed codes of shape (n, bytes)
+        query_code: Packed query code of shape (bytes,)
+
+    Returns:
+        int array of shape (n,)
+    """
+    return _POPCOUNT[np.bitwise_xor(codes, query_code)].sum(axis=1, dtype=np.int64)
+
+
+@dataclass
+class QuantizedIndex:
+    """
+    Quantized copy of one document's chunk embeddings.
+
+    Rows are aligned with chunk_ids, texts and metadatas.
+    """
+    mode: str
+    chunk_ids: List[str]
+    texts: List[str]
+    metadatas: List[Dict[str, Any]]
+    codes: np.ndarray
+    scales: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32))
+    norms: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32))
+
+    @classmethod
+    def build(
+        cls,
+        mode: str,
+        chunk_ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        embeddings: np.ndarray,
+    ) -> "QuantizedIndex":
+        """
+        Quantize a document's embeddings.
+
+        Args:
+            mode: "int8" or "binary"
+            chunk_ids: Chunk IDs, one per embedding row
+            texts: Chunk texts, one per embedding row
+            metadatas: Chunk metadata, one per embedding row
+            embeddings: Float matrix of shape (n, dim)
+
+        Returns:
+            QuantizedIndex for the embeddings
+
+        Raises:
+            ValueError: If mode is not a quantized mode
+        """
+        if mode == "int8":
+            codes, scales = quantize_int8(embeddings)
+            # Squared norms of the dequantized vectors, for approximate L2
+            norms = (codes.astype(np.float32) ** 2).sum(axis=1) * scales ** 2
+            return cls(mode, list(chunk_ids), list(texts), list(metadatas), codes, scales, norms)
+        if mode == "binary":
+            codes = quantize_binary(embeddings)
+            return cls(mode, list(chunk_ids), list(texts), list(metadatas), codes)
+        raise ValueError(f"Unsupported quantization mode: {mode}")
+
+    def __len__(self) -> int:
+        """Return the number of indexed chunks."""
+        return len(self.chunk_ids)
+
+    def candidates(self, query_embedding: Sequence[float], n: int) -> np.ndarray:
+        """
+        Select the rows closest to the query under the quantized metric.
+
+        Args:
+            query_embedding: Float query vector
+            n: Maximum number of candidates
+
+        Returns:
+            Row indices ordered from closest to farthest
+        """
+        return self.candidates_batch([query_embedding], n)[0]
+
+    def candidates_batch(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n: int,
+    ) -> List[np.ndarray]:
+        """
+        Select candidate rows for several queries in one scan of the codes.
+
+        Args:
+            query_embeddings: Float query vectors
+            n: Maximum number of candidates per query
+
+        Returns:
+            One array of row indices per query, ordered from closest to farthest
+        """
+        if n <= 0 or not self.chunk_ids or not len(query_embeddings):
+            return [np.empty(0, dtype=np.int64) for _ in query_embeddings]
+
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        if self.mode == "int8":
+            # Approximate squared L2 to the dequantized rows, minus |q|^2
+            distances = self.norms[:, None] - 2.0 * self.scales[:, None] * self._int8_dots(queries)
+        else:
+            query_codes = quantize_binary(queries)
+            distances = np.stack(
+                [hamming_distances(self.codes, code) for code in query_codes], axis=1
+            )
+
+        n = min(n, len(self.chunk_ids))
+        selected: List[np.ndarray] = []
+        for column in distances.T:
+            if n < len(self.chunk_ids):
+                rows = np.argpartition(column, n - 1)[:n]
+            else:
+                rows = np.arange(len(self.chunk_ids))
+            selected.append(rows[np.argsort(column[rows], kind="stable")])
+        return selected
+
+    def _int8_dots(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Compute codes @ queries.T in float32, one block of rows at a time.
+
+        Every int8 value is exactly representable in float32, so widening a
+        block of codes is lossless; the product itself rounds like any
+        float32 matmul.
+
+        Args:
+            queries: Float32 matrix of shape (m, dim)
+
+        Returns:
+            float32 matrix of shape (n, m)
+        """
+        count = len(self.codes)
+        rows = min(SCAN_BLOCK_ROWS, count)
+        block = np.empty((rows, self.codes.shape[1]), dtype=np.float32)
+        dots = np.empty((count, len(queries)), dtype=np.float32)
+        queries_t = np.ascontiguousarray(queries.T)
+        for start in range(0, count, rows):
+            codes = self.codes[start:start + rows]
+            widened = block[:len(codes)]
+            np.copyto(widened, codes, casting="unsafe")
+            np.matmul(widened, queries_t, out=dots[start:start + len(codes)])
+        return dots
@@ -8,11 +8,14 @@ CRITICAL: This tokenizer MUST be used for both indexing and querying
 to ensure consistent tokenization across the BM25 pipeline.
 """
 
+import os
 import re
 import string
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 import jieba
+import numpy as np
 
 
 # CJK Unicode ranges (characters only, not punctuation)
@@ -27,17 +30,84 @@ CJK_RANGES = [
     (0x2F800, 0x2FA1F),  # CJK Compatibility Ideographs Supplement
 ]
 
+# Lookup table for BMP code points: one index per character instead of a
+# scan over CJK_RANGES. Supplementary-plane ranges keep the tuple scan.
+_BMP_CJK = bytearray(0x10000)
+for _start, _end in CJK_RANGES:
+    if _end < 0x10000:
+        _BMP_CJK[_start:_end + 1] = b'\x01' * (_end - _start + 1)
+_SMP_RANGES = tuple((start, end) for start, end in CJK_RANGES if start >= 0x10000)
+del _start, _end
+
+# Code points that _calculate_cjk_ratio does not count: whitespace (every
+# str.isspace() code point lives in the BMP) and ASCII punctuation.
+_BMP_IGNORED_MASK = np.zeros(0x10000, dtype=np.bool_)
+_BMP_IGNORED_MASK[[ord(c) for c in string.punctuation]] = True
+_BMP_IGNORED_MASK[[cp for cp in range(0x3001) if chr(cp).isspace()]] = True
+
+# The same characters as a str.translate() deletion table. Below this
+# length, deleting them and counting what is left beats NumPy's per-call
+# overhead.
+_IGNORED_TABLE = str.maketrans('', '', ''.join(map(chr, np.flatnonzero(_BMP_IGNORED_MASK))))
+_SHORT_TEXT_LENGTH = 128
+
+# Class of each BMP code point for _calculate_cjk_ratio, so that one table
+# lookup per character feeds both counts
+_OTHER, _CJK, _IGNORED = 0, 1, 2
+_BMP_CLASS = np.frombuffer(_BMP_CJK, dtype=np.uint8).copy()
+_BMP_CLASS[_BMP_IGNORED_MASK] = _IGNORED
+
+# Characters that end a segment in mixed-language text. The Chinese ones
+# still count as characters for the CJK ratio; ASCII punctuation does not.
+_CHINESE_SEPARATORS = '，。！？、；：（）【】'
+_SEGMENT_SEPARATORS = string.punctuation + _CHINESE_SEPARATORS
+
+# One pass over text: a run of CJK characters, a run of anything that is
+# neither CJK nor a separator, or a run of Chinese separators. Whitespace
+# and ASCII punctuation match nothing, so the matched lengths add up to the
+# characters _calculate_cjk_ratio counts.
+_CJK_CLASS = ''.join(f'{chr(start)}-{chr(end)}' for start, end in CJK_RANGES)
+_SEGMENT_RE = re.compile(
+    f'([{_CJK_CLASS}]+)'
+    f'|([^\\s{re.escape(_SEGMENT_SEPARATORS)}{_CJK_CLASS}]+)'
+    f'|[{_CHINESE_SEPARATORS}]+'
+)
+_CJK_RUN_RE = re.compile(f'[{_CJK_CLASS}]+')
+
 # Chinese punctuation characters to filter out
 CHINESE_PUNCTUATION = set('，。！？、；：""''（）【】《》〈〉「」『』…—～·')
 
+# Characters a token may consist of entirely and still be dropped as
+# punctuation: English and Chinese punctuation plus all Unicode whitespace
+_PUNCTUATION_CHARS = ''.join(
+    sorted(set(string.punctuation) | CHINESE_PUNCTUATION)
+) + ''.join(chr(cp) for cp in range(0x3001) if chr(cp).isspace())
+
+# Word runs in non-CJK text
+_WORD_RE = re.compile(r'\w+')
+# Tokens of lowercased ASCII text; '_' separates segments, so it is not
+# part of a token here
+_ASCII_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
 # Threshold for determining if text is primarily Chinese
 CJK_RATIO_THRESHOLD = 0.3
 
+# jieba's default tokenizer, bound once; it is the one jieba.cut() and
+# jieba.load_userdict() use, so custom dictionaries still apply
+_JIEBA = jieba.dt
+
+# Results for up to this many distinct texts are memoized; texts longer than
+# TOKEN_CACHE_MAX_TEXT_LENGTH are always tokenized afresh
+TOKEN_CACHE_SIZE = 8192
+TOKEN_CACHE_MAX_TEXT_LENGTH = 4096
+
 
 def _is_cjk_char(char: str) -> bool:
     """Check if a character is a CJK character."""
     code_point = ord(char)
-    return any(start <= code_point <= end for start, end in CJK_RANGES)
+    if code_point < 0x10000:
+        return _BMP_CJK[code_point] == 1
+    return any(start <= code_point <= end for start, end in _SMP_RANGES)
 
 
 def _calculate_cjk_ratio(text: str) -> float:
@@ -45,13 +115,32 @@ def _calculate_cjk_ratio(text: str) -> float:
     if not text:
         return 0.0
     
+    if len(text) < _SHORT_TEXT_LENGTH:
+        # Count only actual characters (not whitespace or punctuation)
+        chars = text.translate(_IGNORED_TABLE)
+        if not chars:
+            return 0.0
+        cjk_count = len(chars) - len(_CJK_RUN_RE.sub('', chars))
+        return cjk_count / len(chars)
+    
+    code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    has_smp = int(code_points.max()) >= 0x10000
+    # Supplementary-plane code points are clamped to U+FFFF, a non-character
+    # of class _OTHER; their CJK ranges are counted separately below
+    classes = _BMP_CLASS[np.minimum(code_points, 0xFFFF) if has_smp else code_points]
+    
     # Count only actual characters (not whitespace or punctuation)
-    chars = [c for c in text if c.strip() and c not in string.punctuation]
-    if not chars:
+    valid_count = len(classes) - int(np.count_nonzero(classes == _IGNORED))
+    if not valid_count:
         return 0.0
     
-    cjk_count = sum(1 for c in chars if _is_cjk_char(c))
-    return cjk_count / len(chars)
+    cjk_count = int(np.count_nonzero(classes == _CJK))
+    if has_smp:
+        for start, end in _SMP_RANGES:
+            cjk_count += int(np.count_nonzero(
+                (code_points >= start) & (code_points <= end)
+            ))
+    return cjk_count / valid_count
 
 
 def is_chinese_text(text: str) -> bool:
@@ -67,14 +156,6 @@ def is_chinese_text(text: str) -> bool:
     return _calculate_cjk_ratio(text) >= CJK_RATIO_THRESHOLD
 
 
-def _is_punctuation(token: str) -> bool:
-    """Check if a token is purely punctuation (English or Chinese)."""
-    return all(
-        c in string.punctuation or c in CHINESE_PUNCTUATION or c.isspace()
-        for c in token
-    )
-
-
 def _tokenize_chinese(text: str) -> List[str]:
     """
     Tokenize Chinese text using jieba segmentation.
@@ -86,11 +167,12 @@ def _tokenize_chinese(text: str) -> List[str]:
         List of tokens (words/characters)
     """
     # Use jieba's cut function for word segmentation
-    tokens = jieba.cut(text, cut_all=False)
-    # Filter out empty tokens, whitespace, and punctuation
+    tokens = _JIEBA.cut(text, cut_all=False)
+    # Filter out empty tokens, whitespace, and punctuation; a token made only
+    # of those characters strips down to nothing
     return [
-        t.strip().lower() for t in tokens 
-        if t.strip() and not _is_punctuation(t)
+        t.strip().lower() for t in tokens
+        if t.strip(_PUNCTUATION_CHARS)
     ]
 
 
@@ -104,13 +186,19 @@ def _tokenize_english(text: str) -> List[str]:
     Returns:
         List of tokens (words)
     """
-    # Convert to lowercase
-    text = text.lower()
-    # Split on whitespace and punctuation
-    # This regex splits on any non-alphanumeric character
-    tokens = re.split(r'[^\w]+', text)
-    # Filter out empty tokens
-    return [t for t in tokens if t]
+    # Convert to lowercase, then keep the runs of word characters; this
+    # splits on whitespace and punctuation without producing empty tokens
+    return _WORD_RE.findall(text.lower())
+
+
+def warm_up() -> None:
+    """
+    Load jieba's dictionary now instead of on the first Chinese query.
+    
+    jieba builds its prefix dictionary lazily, which costs about a second;
+    calling this at startup keeps that out of request latency.
+    """
+    _JIEBA.initialize()
 
 
 def tokenize(text: str) -> List[str]:
@@ -137,70 +225,115 @@ def tokenize(text: str) -> List[str]:
     if not text or not text.strip():
         return []
     
-    # Detect language based on CJK ratio
-    if is_chinese_text(text):
-        return _tokenize_chinese(text)
-    else:
-        # For mixed text or English, use a hybrid approach
-        # Split into segments, tokenize each appropriately
-        return _tokenize_mixed(text)
+    # Repeated chunks and hot queries skip segmentation; long documents are
+    # unlikely to repeat and would crowd the cache out
+    if len(text) <= TOKEN_CACHE_MAX_TEXT_LENGTH:
+        return list(_tokenize_cached(text))
+    return _tokenize_text(text)
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _tokenize_cached(text: str) -> Tuple[str, ...]:
+    """Memoized tokenization; a tuple so cached results cannot be mutated."""
+    return tuple(_tokenize_text(text))
 
 
-def _tokenize_mixed(text: str) -> List[str]:
+def tokenize_document(texts: List[str]) -> List[List[str]]:
     """
-    Tokenize mixed Chinese/English text.
+    Tokenize all chunk texts of one document.
     
-    Handles text that contains both CJK and non-CJK characters
-    by processing each segment with the appropriate tokenizer.
+    Gives the same tokens as calling tokenize() on each text, but identical
+    texts are tokenized once and Chinese segments that recur across the
+    document (headers, boilerplate, table cells) are segmented by jieba
+    once. The memo lives only for this call.
     
     Args:
-        text: Mixed language text
+        texts: Chunk texts, in order
         
     Returns:
-        List of tokens from both languages
+        One token list per text
     """
-    tokens = []
-    current_segment = []
-    current_is_cjk = None
-    
-    for char in text:
-        char_is_cjk = _is_cjk_char(char)
-        
-        # Handle whitespace and punctuation
-        if char.isspace() or char in string.punctuation or char in '，。！？、；：""''（）【】':
-            # Flush current segment
-            if current_segment:
-                segment_text = ''.join(current_segment)
-                if current_is_cjk:
-                    tokens.extend(_tokenize_chinese(segment_text))
-                else:
-                    tokens.extend(_tokenize_english(segment_text))
-                current_segment = []
-                current_is_cjk = None
-            continue
-        
-        # Start new segment or continue current
-        if current_is_cjk is None:
-            current_is_cjk = char_is_cjk
-            current_segment.append(char)
-        elif char_is_cjk == current_is_cjk:
-            current_segment.append(char)
-        else:
-            # Language switch - flush current segment
-            segment_text = ''.join(current_segment)
-            if current_is_cjk:
-                tokens.extend(_tokenize_chinese(segment_text))
-            else:
-                tokens.extend(_tokenize_english(segment_text))
-            current_segment = [char]
-            current_is_cjk = char_is_cjk
-    
-    # Flush remaining segment
-    if current_segment:
-        segment_text = ''.join(current_segment)
-        if current_is_cjk:
-            tokens.extend(_tokenize_chinese(segment_text))
+    memo: Dict[str, List[str]] = {}
+    by_text: Dict[str, List[str]] = {}
+    tokenized = []
+    for text in texts:
+        tokens = by_text.get(text)
+        if tokens is None:
+            tokens = _tokenize_text(text, memo) if text and text.strip() else []
+            by_text[text] = tokens
         else:
-            tokens.extend(_tokenize_english(segment_text))
+            tokens = list(tokens)
+        tokenized.append(tokens)
+    return tokenized
+
+
+def _tokenize_text(text: str, memo: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """
+    Tokenize non-blank text, choosing the tokenizer by language.
+    
+    A single scan both measures the CJK ratio (as is_chinese_text does) and
+    collects the segments that mixed text is tokenized from. Chinese
+    segmentation results are reused from memo when one is given.
+    """
+    # ASCII text has no CJK characters and no segment separators beyond
+    # whitespace and punctuation (str.isascii() reads a cached flag)
+    if text.isascii():
+        return _ASCII_TOKEN_RE.findall(text.lower())
+    
+    segments: List[Tuple[bool, str]] = []
+    # Consecutive non-CJK segments are tokenized together: the separators
+    # between them are non-word characters, so a space stands in for them
+    words: List[str] = []
+    cjk_count = 0
+    char_count = 0
+    for match in _SEGMENT_RE.finditer(text):
+        cjk_segment, other_segment = match.groups()
+        length = match.end() - match.start()
+        char_count += length
+        if cjk_segment:
+            cjk_count += length
+            if words:
+                segments.append((False, ' '.join(words)))
+                words = []
+            segments.append((True, cjk_segment))
+        elif other_segment:
+            words.append(other_segment)
+    if words:
+        segments.append((False, ' '.join(words)))
     
+    # Detect language based on CJK ratio
+    if char_count and cjk_count / char_count >= CJK_RATIO_THRESHOLD:
+        return _segment_chinese(text, memo)
+    # For mixed text or English, use a hybrid approach:
+    # tokenize each segment appropriately
+    return _tokenize_segments(segments, memo)
+
+
+def _tokenize_segments(
+    segments: List[Tuple[bool, str]],
+    memo: Optional[Dict[str, List[str]]] = None,
+) -> List[str]:
+    """Tokenize (is_cjk, text) segments with the matching tokenizer."""
+    tokens = []
+    for is_cjk, segment in segments:
+        if is_cjk:
+            tokens.extend(_segment_chinese(segment, memo))
+        else:
+            tokens.extend(_tokenize_english(segment))
     return tokens
+
+
+def _segment_chinese(text: str, memo: Optional[Dict[str, List[str]]]) -> List[str]:
+    """_tokenize_chinese, reusing and recording results in memo when given."""
+    if memo is None:
+        return _tokenize_chinese(text)
+    tokens = memo.get(text)
+    if tokens is None:
+        tokens = memo[text] = _tokenize_chinese(text)
+    return tokens
+
+
+# Processes that never run the app lifespan (scripts, index-building worker
+# processes) can opt in to loading the dictionary on import
+if os.environ.get("BM25_EAGER_JIEBA") == "1":
+    warm_up()
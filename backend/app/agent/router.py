@@ -6,12 +6,24 @@ to determine the appropriate processing path (direct answer, document QA,
 web search, or complex reasoning).
 """
 
+import asyncio
+import hashlib
+import json
 import logging
 import re
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from openai import OpenAI
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
 
 try:
     from google import genai  # type: ignore
@@ -22,18 +34,107 @@ except ImportError:  # pragma: no cover
 
 from .types import IntentClassification, IntentType
 from ..core.config import get_settings
+from ..core.llm_clients import get_async_openai_client, get_gemini_client, get_openai_client
+
 from .prompts import (
     INTENT_CLASSIFICATION_SYSTEM_PROMPT,
-    INTENT_CLASSIFICATION_USER_TEMPLATE,
+    prompt_cache_key,
+    render_intent_batch_user,
+    render_intent_user,
 )
 
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so either parser's
+# errors are caught the same way
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Links in a query (routed past the LLM by IntentRouter._check_shortcuts)
+_URL_RE = re.compile(r"\bhttps?://|\bwww\.\w", re.IGNORECASE)
+
+# Tail shared by every greeting and small-talk pattern
+_PATTERN_SUFFIX = r"[\s!.,?！。，？]*$"
+
+
+def _pattern_body(pattern: str) -> str:
+    """Strip the ^ anchor and the shared tail of a pattern so it can join an alternation."""
+    return "(?:{})".format(pattern.removeprefix("^").removesuffix(_PATTERN_SUFFIX))
+
+
+@lru_cache(maxsize=None)
+def _compile_direct_answer_pattern(
+    greeting_patterns: Tuple[str, ...],
+    small_talk_patterns: Tuple[str, ...],
+) -> "re.Pattern[str]":
+    """
+    Compile greeting and small-talk patterns into one regex.
+    
+    Both kinds are one alternation, so a query is matched in a single pass;
+    the group that matched tells which kind it was (greetings take
+    precedence). The anchors and the shared punctuation tail are dropped from
+    each pattern: the tail is matched once after the alternation and the
+    regex is applied with fullmatch.
+    """
+    return re.compile(
+        r"(?:(?P<greeting>{})|(?P<small_talk>{}))[\s!.,?！。，？]*".format(
+            "|".join(_pattern_body(p) for p in greeting_patterns),
+            "|".join(_pattern_body(p) for p in small_talk_patterns),
+        ),
+        re.IGNORECASE,
+    )
+
+
+@lru_cache(maxsize=None)
+def _compile_intent_patterns(
+    patterns: Tuple[Tuple[IntentType, str], ...],
+) -> Tuple[Tuple[IntentType, "re.Pattern[str]"], ...]:
+    """Compile local intent patterns, in order."""
+    return tuple((intent, re.compile(p, re.IGNORECASE)) for intent, p in patterns)
+
+
+# JSON Schemas of classification responses, sent to the provider for
+# constrained decoding (no markdown fences or unknown intents)
+INTENT_JSON_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": [intent.name for intent in IntentType]},
+        "confidence": {"type": "number"},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["intent", "confidence", "reasoning"],
+    "additionalProperties": False,
+}
+INTENT_BATCH_JSON_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "classifications": {"type": "array", "items": INTENT_JSON_SCHEMA},
+    },
+    "required": ["classifications"],
+    "additionalProperties": False,
+}
+
+# Intent names an LLM response may use
+_LLM_INTENTS: Dict[str, IntentType] = {
+    "DIRECT_ANSWER": IntentType.DIRECT_ANSWER,
+    "DOCUMENT_QA": IntentType.DOCUMENT_QA,
+    "WEB_SEARCH": IntentType.WEB_SEARCH,
+    "COMPLEX_REASONING": IntentType.COMPLEX_REASONING,
+    "COMPLEX": IntentType.COMPLEX_REASONING,
+}
+
 
 class IntentRouter:
     """
     Router that classifies user intent to determine processing path.
     
-    Uses a combination of pattern matching for common greetings/small-talk
-    and LLM-based classification for ambiguous cases.
+    Classification runs in stages, cheapest first:
+    1. Pattern matching for common greetings/small-talk
+    2. Structural shortcuts: very long queries (pasted documents) and queries
+       with code blocks or URLs
+    3. A local classifier for clear-cut queries (built-in intent patterns,
+       or a pluggable model such as a distilled embedding classifier)
+    4. LLM-based classification for ambiguous cases
+    
+    The local stage only answers when its confidence reaches the confidence
+    threshold, so the LLM round-trip is skipped without lowering the bar.
     
     Fallback mechanism: If DIRECT_ANSWER confidence < 0.8,
     automatically escalate to DOCUMENT_QA to avoid false negatives.
@@ -86,13 +187,94 @@ class IntentRouter:
         r"^帮助[\s!.,?！。，？]*$",
     ]
     
+    # Results of the greeting/small-talk patterns, shared by every match
+    _GREETING_RESULT = IntentClassification(
+        intent=IntentType.DIRECT_ANSWER,
+        confidence=0.95,
+        reasoning="Matched greeting pattern",
+    )
+    _SMALL_TALK_RESULT = IntentClassification(
+        intent=IntentType.DIRECT_ANSWER,
+        confidence=0.95,
+        reasoning="Matched small-talk pattern",
+    )
+    
+    # Single-word greetings and small-talk, the bulk of pattern hits. Looked up
+    # (lowercased, trailing punctuation removed) before running the regex; each
+    # word also matches the patterns above.
+    GREETING_WORDS = frozenset({
+        "hi", "hello", "hey", "howdy", "greetings",
+        "你好", "您好", "嗨", "哈喽", "早上好", "下午好", "晚上好", "晚安", "你好吗", "最近怎么样", "在吗",
+    })
+    SMALL_TALK_WORDS = frozenset({
+        "thank", "thanks", "thx", "bye", "goodbye", "later",
+        "yes", "no", "ok", "okay", "sure", "alright", "please", "sorry", "help",
+        "谢谢", "感谢", "再见", "拜拜", "好", "好的", "是", "是的", "不", "不是", "你是谁", "你能做什么", "帮助",
+    })
+    
+    _MAX_WORD_LENGTH = max(map(len, GREETING_WORDS | SMALL_TALK_WORDS))
+    
+    # Trailing characters the patterns above allow after the phrase
+    _TRAILING_PUNCTUATION = " \t\n\r\f\v\u3000!.,?！。，？"
+    
+    # Local intent patterns for clear-cut queries, checked in order.
+    # Mirrors the intent categories of the LLM prompt, so these queries skip
+    # the LLM round-trip.
+    LOCAL_INTENT_PATTERNS: List[Tuple[IntentType, str]] = [
+        # Comparisons between named entities and "list all" aggregations
+        (IntentType.COMPLEX_REASONING, r"\b(vs\.?|versus)\s"),
+        (IntentType.COMPLEX_REASONING, r"\bcompare\b.+\b(with|and)\b"),
+        (IntentType.COMPLEX_REASONING, r"\bdifference\s+between\b.+\band\b"),
+        (IntentType.COMPLEX_REASONING, r"\blist\s+all\b"),
+        (IntentType.COMPLEX_REASONING, r"(对比|比较).+(和|与|跟)"),
+        (IntentType.COMPLEX_REASONING, r"列出所有"),
+        # Real-time data
+        (IntentType.WEB_SEARCH, r"\b(current|latest|today'?s?|real[- ]time)\s+(stock\s+)?(price|news|weather)\b"),
+        (IntentType.WEB_SEARCH, r"\b(stock\s+price|weather|news)\b.*\b(today|now|right\s+now)\b"),
+        (IntentType.WEB_SEARCH, r"(今天|最新|实时).*(股价|新闻|天气)"),
+        # Explicit references to the user's documents
+        (IntentType.DOCUMENT_QA, r"\b(this|my|uploaded|attached)\s+(document|file|report|paper|whitepaper|pdf)\b"),
+        (IntentType.DOCUMENT_QA, r"(这篇|这份|这个|上传的)(文档|文件|报告|白皮书|论文)"),
+    ]
+    
+    # Confidence assigned to a local intent pattern match
+    LOCAL_PATTERN_CONFIDENCE = 0.9
+    
+    # Queries at least this long (pasted text) skip the LLM as DOCUMENT_QA
+    DEFAULT_MAX_LLM_CHARS = 2000
+    
+    # Confidence assigned to a structural shortcut
+    SHORTCUT_CONFIDENCE = 0.9
+    
+    # Output token limit per classification. A schema-constrained answer is
+    # ~40 tokens; Gemini 2.5 models also spend thinking tokens from the limit.
+    OPENAI_CLASSIFICATION_MAX_TOKENS = 96
+    GEMINI_CLASSIFICATION_MAX_TOKENS = 200
+    
     # Confidence threshold for fallback mechanism
     CONFIDENCE_THRESHOLD = 0.8
     
+    # Default limit on concurrent LLM calls in classify_batch
+    DEFAULT_MAX_CONCURRENCY = 8
+    
+    # Queries of one classify_batch call classified by one batched LLM call
+    LLM_BATCH_MAX = 8
+    
+    # LLM classifications remembered per (query, context), least recently
+    # used first out
+    CLASSIFICATION_CACHE_SIZE = 1024
+    
+    # Minimum cosine similarity for a paraphrase to reuse a classification
+    DEFAULT_SEMANTIC_CACHE_THRESHOLD = 0.92
+    
     def __init__(
         self,
         openai_client: Optional[OpenAI] = None,
         confidence_threshold: float = 0.8,
+        local_classifier: Optional[Callable[[str], Optional[IntentClassification]]] = None,
+        query_embedder: Optional[Callable[[str], Sequence[float]]] = None,
+        semantic_cache_threshold: float = DEFAULT_SEMANTIC_CACHE_THRESHOLD,
+        async_openai_client: Optional[AsyncOpenAI] = None,
     ):
         """
         Initialize the IntentRouter.
@@ -100,26 +282,54 @@ class IntentRouter:
         Args:
             openai_client: Optional OpenAI client for LLM-based classification
             confidence_threshold: Threshold below which DIRECT_ANSWER escalates to DOCUMENT_QA
+                (also the minimum confidence for local classification)
+            local_classifier: Optional local model returning a classification
+                (or None) for a query; defaults to the built-in intent patterns
+            query_embedder: Optional function embedding a query; enables reuse of
+                LLM classifications for paraphrases of earlier queries
+            semantic_cache_threshold: Minimum cosine similarity for such reuse
+            async_openai_client: Optional async OpenAI client used by aclassify and
+                classify_batch; defaults to the shared one unless openai_client is given
         """
         self.settings = get_settings()
         self.confidence_threshold = confidence_threshold
+        self.local_classifier = local_classifier or self._check_intent_patterns
+        self.query_embedder = query_embedder
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self.max_llm_chars = getattr(self.settings, "router_max_llm_chars", self.DEFAULT_MAX_LLM_CHARS)
+        self.max_concurrency = max(
+            1, getattr(self.settings, "router_max_concurrency", self.DEFAULT_MAX_CONCURRENCY)
+        )
         self.logger = logging.getLogger("app.agent.router")
         
         # Initialize LLM client based on provider
         self.provider = (self.settings.llm_provider or "openai").lower()
         
+        # Clients are process-wide so their connection pools are reused
         if self.provider == "openai":
-            self.openai = openai_client or (OpenAI() if self.settings.openai_api_key else None)
+            self.openai = openai_client or get_openai_client()
+            # An injected sync client is not paired with the shared async one
+            self.aopenai = async_openai_client or (get_async_openai_client() if openai_client is None else None)
             self._gemini_client = None
         else:
             self.openai = None
-            self._gemini_client = None
-            if genai and self.settings.google_api_key:
-                self._gemini_client = genai.Client(api_key=self.settings.google_api_key)
+            self.aopenai = None
+            self._gemini_client = get_gemini_client()
+        
+        # Compiled once per process for each set of patterns
+        self._direct_answer_pattern = _compile_direct_answer_pattern(
+            tuple(self.GREETING_PATTERNS), tuple(self.SMALL_TALK_PATTERNS)
+        )
+        self._intent_patterns = _compile_intent_patterns(tuple(self.LOCAL_INTENT_PATTERNS))
         
-        # Compile regex patterns for efficiency
-        self._greeting_patterns = [re.compile(p, re.IGNORECASE) for p in self.GREETING_PATTERNS]
-        self._small_talk_patterns = [re.compile(p, re.IGNORECASE) for p in self.SMALL_TALK_PATTERNS]
+        # (lowercased query, context digest) -> LLM classification; shared by
+        # classify, aclassify and classify_batch, which run on worker threads
+        self._classification_cache: "OrderedDict[Tuple[str, Optional[bytes]], IntentClassification]" = OrderedDict()
+        self._classification_cache_lock = threading.Lock()
+        # Unit embeddings of context-free LLM-classified queries (oldest first)
+        # and their classifications; only filled when query_embedder is set
+        self._semantic_vectors: Optional[np.ndarray] = None
+        self._semantic_results: List[IntentClassification] = []
     
     def classify(
         self,
@@ -143,24 +353,104 @@ class IntentRouter:
         start_time = time.perf_counter()
         query_stripped = query.strip()
         
+        # Steps 1-2: patterns and local classifier
+        local_result = self._classify_without_llm(query_stripped, start_time)
+        if local_result is not None:
+            return local_result
+        
+        # Step 3: Use LLM for ambiguous cases
+        llm_result = self._classify_with_llm(query_stripped, context)
+        
+        # Step 4: Apply fallback mechanism
+        return self._finalize_llm_result(llm_result, start_time)
+    
+    async def aclassify(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> IntentClassification:
+        """
+        Classify user intent without blocking the event loop.
+        
+        Same stages as ``classify``, with LLM requests made through the async
+        SDK clients. Each call is classified by its own LLM request; queries
+        of different callers are never combined into one prompt.
+        
+        Args:
+            query: The user's input query
+            context: Optional context information
+        
+        Returns:
+            IntentClassification with intent type, confidence, and reasoning
+        """
+        start_time = time.perf_counter()
+        query_stripped = query.strip()
+        
+        local_result = self._classify_without_llm(query_stripped, start_time)
+        if local_result is not None:
+            return local_result
+        
+        cached = self._get_cached_classification(query_stripped, context)
+        if cached is not None:
+            llm_result = cached
+        else:
+            llm_result = (await self._aclassify_many_with_llm([query_stripped], context))[0]
+        return self._finalize_llm_result(llm_result, start_time)
+    
+    def _classify_without_llm(self, query: str, start_time: float) -> Optional[IntentClassification]:
+        """Run the pattern and local stages; None if the query needs the LLM."""
         # Step 1: Check for pattern-matched greetings/small-talk (high confidence)
-        pattern_result = self._check_patterns(query_stripped)
+        pattern_result = self._check_patterns(query)
         if pattern_result is not None:
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            self.logger.info(
-                "Intent classified via pattern matching",
-                extra={
-                    "intent": pattern_result.intent.value,
-                    "confidence": pattern_result.confidence,
-                    "duration_ms": round(duration_ms, 2),
-                },
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                self.logger.info(
+                    "Intent classified via pattern matching",
+                    extra={
+                        "intent": pattern_result.intent.value,
+                        "confidence": pattern_result.confidence,
+                        "duration_ms": round(duration_ms, 2),
+                    },
+                )
             return pattern_result
         
-        # Step 2: Use LLM for ambiguous cases
-        llm_result = self._classify_with_llm(query_stripped, context)
+        # Step 2: Structural shortcuts (long pastes, code, links)
+        shortcut_result = self._check_shortcuts(query)
+        if shortcut_result is not None:
+            if self.logger.isEnabledFor(logging.INFO):
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                self.logger.info(
+                    f"Intent classified by shortcut: {shortcut_result.intent.value}",
+                    extra={
+                        "intent": shortcut_result.intent.value,
+                        "confidence": shortcut_result.confidence,
+                        "duration_ms": round(duration_ms, 2),
+                    },
+                )
+            return shortcut_result
         
-        # Step 3: Apply fallback mechanism
+        # Step 3: Local classifier for clear-cut queries
+        local_result = self._classify_locally(query)
+        if local_result is not None:
+            if self.logger.isEnabledFor(logging.INFO):
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                self.logger.info(
+                    f"Intent classified locally: {local_result.intent.value} (conf={local_result.confidence:.2f})",
+                    extra={
+                        "intent": local_result.intent.value,
+                        "confidence": local_result.confidence,
+                        "duration_ms": round(duration_ms, 2),
+                    },
+                )
+            return local_result
+        return None
+    
+    def _finalize_llm_result(
+        self,
+        llm_result: IntentClassification,
+        start_time: float,
+    ) -> IntentClassification:
+        """Apply the low-confidence fallback to an LLM classification and log it."""
         if llm_result.intent == IntentType.DIRECT_ANSWER and llm_result.confidence < self.confidence_threshold:
             self.logger.info(
                 "Escalating DIRECT_ANSWER to DOCUMENT_QA due to low confidence",
@@ -175,17 +465,205 @@ class IntentRouter:
                 reasoning=f"Escalated from DIRECT_ANSWER (confidence {llm_result.confidence:.2f} < {self.confidence_threshold}): {llm_result.reasoning}",
             )
         
-        duration_ms = (time.perf_counter() - start_time) * 1000
-        self.logger.info(
-            f"Intent classified via LLM: {llm_result.intent.value} (conf={llm_result.confidence:.2f})",
-            extra={
-                "intent": llm_result.intent.value,
-                "confidence": llm_result.confidence,
-                "duration_ms": round(duration_ms, 2),
-            },
-        )
+        if self.logger.isEnabledFor(logging.INFO):
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            self.logger.info(
+                f"Intent classified via LLM: {llm_result.intent.value} (conf={llm_result.confidence:.2f})",
+                extra={
+                    "intent": llm_result.intent.value,
+                    "confidence": llm_result.confidence,
+                    "duration_ms": round(duration_ms, 2),
+                },
+            )
         return llm_result
     
+    async def classify_batch(
+        self,
+        queries: List[str],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> List[IntentClassification]:
+        """
+        Classify several queries concurrently.
+        
+        Queries that need the LLM are sent ``LLM_BATCH_MAX`` at a time in one
+        batched request each; the requests run in parallel (bounded by
+        ``max_concurrency`` to respect provider rate limits). All calls share
+        the same cached system prompt.
+        
+        Args:
+            queries: The user queries to classify
+            context: Optional context information shared by all queries
+        
+        Returns:
+            One IntentClassification per query, in input order
+        """
+        if not queries:
+            return []
+        
+        start_time = time.perf_counter()
+        stripped = [query.strip() for query in queries]
+        classifications: List[Optional[IntentClassification]] = [
+            self._classify_without_llm(query, start_time) for query in stripped
+        ]
+        ambiguous = [i for i, result in enumerate(classifications) if result is None]
+        chunks = [
+            ambiguous[i:i + self.LLM_BATCH_MAX]
+            for i in range(0, len(ambiguous), self.LLM_BATCH_MAX)
+        ]
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def classify_chunk(chunk: List[int]) -> List[IntentClassification]:
+            async with semaphore:
+                return await self._aclassify_many_with_llm([stripped[i] for i in chunk], context)
+        
+        chunk_results = await asyncio.gather(
+            *[classify_chunk(chunk) for chunk in chunks],
+            return_exceptions=True,
+        )
+        
+        for chunk, results in zip(chunks, chunk_results):
+            if isinstance(results, BaseException):
+                self.logger.error(f"Batch classification failed for queries: {results}")
+                results = [
+                    IntentClassification(
+                        intent=IntentType.DOCUMENT_QA,
+                        confidence=0.5,
+                        reasoning=f"Classification error, defaulting to document search: {str(results)}",
+                    )
+                    for _ in chunk
+                ]
+            for i, result in zip(chunk, results):
+                classifications[i] = self._finalize_llm_result(result, start_time)
+        return classifications  # type: ignore[return-value]
+    
+    async def _aclassify_many_with_llm(
+        self,
+        queries: List[str],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> List[IntentClassification]:
+        """
+        Classify several queries with a single LLM request.
+        
+        Queries found in the classification cache are answered from it; the
+        rest are sent to the LLM together.
+        
+        Args:
+            queries: Queries that need LLM classification
+            context: Optional context information shared by all queries
+        
+        Returns:
+            One IntentClassification per query, in input order
+        """
+        if context or self.query_embedder is None:
+            lookups = [self._lookup_classification(query, context) for query in queries]
+        else:
+            # The query embedder is a blocking call
+            lookups = await asyncio.to_thread(
+                lambda: [self._lookup_classification(query, context) for query in queries]
+            )
+        misses = [i for i, (result, _) in enumerate(lookups) if result is None]
+        results = [result for result, _ in lookups]
+        if misses:
+            fresh = await self._arequest_many_classifications(
+                [queries[i] for i in misses], [lookups[i][1] for i in misses], context
+            )
+            for i, result in zip(misses, fresh):
+                results[i] = result
+        return results  # type: ignore[return-value]
+    
+    async def _arequest_many_classifications(
+        self,
+        queries: List[str],
+        vectors: List[Optional[np.ndarray]],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> List[IntentClassification]:
+        """
+        Send queries missing from the cache to the LLM in one request.
+        
+        The queries are numbered in one user message and the model returns
+        one classification per query. Falls back to one request per query if
+        the batched response cannot be matched to the queries.
+        """
+        if len(queries) == 1 or not (self.openai or self.aopenai or (self.provider == "gemini" and self._gemini_client)):
+            return list(await asyncio.gather(*[
+                self._arequest_classification(query, context, vector)
+                for query, vector in zip(queries, vectors)
+            ]))
+        
+        user_prompt = render_intent_batch_user(queries)
+        if context:
+            user_prompt += f"\n\nContext: {context}"
+        
+        try:
+            content = await self._acomplete(INTENT_CLASSIFICATION_SYSTEM_PROMPT, user_prompt, len(queries))
+            results = self._parse_batch_response(content, len(queries))
+        except Exception as e:
+            self.logger.error(f"Batched LLM classification failed: {e}", exc_info=True)
+            results = None
+        
+        if results is None:
+            self.logger.warning(f"Falling back to per-query classification for {len(queries)} queries")
+            return list(await asyncio.gather(*[
+                self._arequest_classification(query, context, vector)
+                for query, vector in zip(queries, vectors)
+            ]))
+        for query, vector, result in zip(queries, vectors, results):
+            self._cache_classification(query, context, result, vector)
+        return results
+    
+    async def _arequest_classification(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        vector: Optional[np.ndarray] = None,
+    ) -> IntentClassification:
+        """Async counterpart of _request_classification."""
+        if not (self.openai or self.aopenai or (self.provider == "gemini" and self._gemini_client)):
+            # Returns the no-LLM default without any I/O
+            return self._request_classification(query, context, vector)
+        
+        user_prompt = render_intent_user(query)
+        if context:
+            user_prompt += f"\n\nContext: {context}"
+        
+        try:
+            result = self._parse_llm_response(await self._acomplete(INTENT_CLASSIFICATION_SYSTEM_PROMPT, user_prompt))
+        except Exception as e:
+            self.logger.error(f"LLM classification failed: {e}", exc_info=True)
+            return IntentClassification(
+                intent=IntentType.DOCUMENT_QA,
+                confidence=0.5,
+                reasoning=f"Classification error, defaulting to document search: {str(e)}",
+            )
+        
+        self._cache_classification(query, context, result, vector)
+        return result
+    
+    async def _acomplete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        count: int = 1,
+    ) -> str:
+        """Get the raw response of a classification request without blocking the event loop."""
+        if self.provider == "gemini" and self._gemini_client:
+            model_name = self.settings.gemini_model_flash
+            self.logger.info(f"Classifying intent with Gemini model: {model_name}")
+            response = await self._gemini_client.aio.models.generate_content(
+                model=model_name,
+                contents=user_prompt,
+                config=self._gemini_config(system_prompt, count),
+            )
+            return self._gemini_response_text(response)
+        if self.aopenai:
+            response = await self.aopenai.chat.completions.create(
+                **self._openai_request(system_prompt, user_prompt, count)
+            )
+            return response.choices[0].message.content or ""
+        # Only a sync client is available
+        return await asyncio.to_thread(self._complete_with_openai, system_prompt, user_prompt, count)
+    
     def _check_patterns(self, query: str) -> Optional[IntentClassification]:
         """
         Check if query matches known greeting or small-talk patterns.
@@ -196,26 +674,87 @@ class IntentRouter:
         Returns:
             IntentClassification if pattern matched, None otherwise
         """
-        # Check greeting patterns
-        for pattern in self._greeting_patterns:
-            if pattern.match(query):
-                return IntentClassification(
-                    intent=IntentType.DIRECT_ANSWER,
-                    confidence=0.95,
-                    reasoning=f"Matched greeting pattern: {query}",
-                )
+        # Lowercasing never shortens text, so longer queries cannot be one of
+        # the words and are not copied
+        word = query.rstrip(self._TRAILING_PUNCTUATION)
+        if len(word) <= self._MAX_WORD_LENGTH:
+            word = word.lower()
+            if word in self.GREETING_WORDS:
+                return self._GREETING_RESULT
+            if word in self.SMALL_TALK_WORDS:
+                return self._SMALL_TALK_RESULT
+        
+        match = self._direct_answer_pattern.fullmatch(query)
+        if match is None:
+            return None
+        return self._GREETING_RESULT if match.lastgroup == "greeting" else self._SMALL_TALK_RESULT
+    
+    def _check_shortcuts(self, query: str) -> Optional[IntentClassification]:
+        """
+        Classify queries whose shape alone decides the route.
+        
+        Very long queries are pasted documents or excerpts to be searched;
+        code blocks and links need more than a single lookup.
+        
+        Args:
+            query: The user's input query (stripped)
+        
+        Returns:
+            IntentClassification for a shortcut, None otherwise
+        """
+        if len(query) >= self.max_llm_chars:
+            return IntentClassification(
+                intent=IntentType.DOCUMENT_QA,
+                confidence=self.SHORTCUT_CONFIDENCE,
+                reasoning=f"Long query ({len(query)} chars), defaulting to document search",
+            )
+        if "```" in query or _URL_RE.search(query):
+            return IntentClassification(
+                intent=IntentType.COMPLEX_REASONING,
+                confidence=self.SHORTCUT_CONFIDENCE,
+                reasoning="Query contains a code block or URL",
+            )
+        return None
+    
+    def _classify_locally(self, query: str) -> Optional[IntentClassification]:
+        """
+        Run the local classifier and keep only confident results.
+        
+        Args:
+            query: The user's input query (stripped)
+        
+        Returns:
+            IntentClassification if the local classifier is confident enough,
+            None to fall back to the LLM
+        """
+        try:
+            result = self.local_classifier(query)
+        except Exception as e:
+            self.logger.warning(f"Local intent classifier failed: {e}")
+            return None
+        
+        if result is None or result.confidence < self.confidence_threshold:
+            return None
+        return result
+    
+    def _check_intent_patterns(self, query: str) -> Optional[IntentClassification]:
+        """
+        Check if query matches a local intent pattern.
+        
+        Args:
+            query: The user's input query (stripped)
         
-        # Check small-talk patterns
-        for pattern in self._small_talk_patterns:
-            if pattern.match(query):
+        Returns:
+            IntentClassification if a pattern matched, None otherwise
+        """
+        for intent, pattern in self._intent_patterns:
+            if pattern.search(query):
                 return IntentClassification(
-                    intent=IntentType.DIRECT_ANSWER,
-                    confidence=0.95,
-                    reasoning=f"Matched small-talk pattern: {query}",
+                    intent=intent,
+                    confidence=self.LOCAL_PATTERN_CONFIDENCE,
+                    reasoning=f"Matched local {intent.value} pattern",
                 )
-        
         return None
-
     
     def _classify_with_llm(
         self,
@@ -232,19 +771,33 @@ class IntentRouter:
         Returns:
             IntentClassification from LLM analysis
         """
+        cached, vector = self._lookup_classification(query, context)
+        if cached is not None:
+            return cached
+        return self._request_classification(query, context, vector)
+    
+    def _request_classification(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        vector: Optional[np.ndarray] = None,
+    ) -> IntentClassification:
+        """Classify a query missing from the cache with one LLM request."""
         # Build the classification prompt
+        # The system prompt is identical on every call; only the user
+        # message carries the query.
         system_prompt = INTENT_CLASSIFICATION_SYSTEM_PROMPT
 
-        user_prompt = INTENT_CLASSIFICATION_USER_TEMPLATE.format(query=query)
+        user_prompt = render_intent_user(query)
         
         if context:
             user_prompt += f"\n\nContext: {context}"
         
         try:
             if self.provider == "gemini" and self._gemini_client:
-                return self._classify_with_gemini(system_prompt, user_prompt)
+                result = self._classify_with_gemini(system_prompt, user_prompt)
             elif self.openai:
-                return self._classify_with_openai(system_prompt, user_prompt)
+                result = self._classify_with_openai(system_prompt, user_prompt)
             else:
                 # No LLM available, default to DOCUMENT_QA
                 self.logger.warning("No LLM client available, defaulting to DOCUMENT_QA")
@@ -261,6 +814,101 @@ class IntentRouter:
                 confidence=0.5,
                 reasoning=f"Classification error, defaulting to document search: {str(e)}",
             )
+        
+        # Only answers the LLM actually gave are remembered; errors retry
+        self._cache_classification(query, context, result, vector)
+        return result
+    
+    @staticmethod
+    def _classification_cache_key(
+        query: str,
+        context: Optional[Dict[str, Any]],
+    ) -> Tuple[str, Optional[bytes]]:
+        """Cache key of a query: its lowercased text and a digest of the context."""
+        digest = hashlib.blake2b(repr(context).encode("utf-8"), digest_size=16).digest() if context else None
+        return query.lower(), digest
+    
+    def _get_cached_classification(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]],
+    ) -> Optional[IntentClassification]:
+        """Look up a remembered LLM classification of the query."""
+        key = self._classification_cache_key(query, context)
+        with self._classification_cache_lock:
+            result = self._classification_cache.get(key)
+            if result is not None:
+                self._classification_cache.move_to_end(key)
+        return result
+    
+    def _lookup_classification(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]],
+    ) -> Tuple[Optional[IntentClassification], Optional[np.ndarray]]:
+        """
+        Look up a remembered classification of the query or of a paraphrase.
+        
+        Returns:
+            (classification or None, unit embedding of the query or None);
+            the embedding is passed on to _cache_classification on a miss
+        """
+        cached = self._get_cached_classification(query, context)
+        if cached is not None or context or self.query_embedder is None:
+            return cached, None
+        
+        vector = self._embed_query(query)
+        if vector is None:
+            return None, None
+        with self._classification_cache_lock:
+            vectors = self._semantic_vectors
+            if vectors is None or vectors.shape[1] != vector.shape[0]:
+                return None, vector
+            scores = vectors @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.semantic_cache_threshold:
+                return None, vector
+            result = self._semantic_results[best]
+        self.logger.debug(f"Semantic intent cache hit (similarity {scores[best]:.3f})")
+        return result, vector
+    
+    def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query as a unit vector; None if the embedder fails."""
+        try:
+            embedding = self.query_embedder(query)  # type: ignore[misc]
+        except Exception as e:
+            self.logger.warning(f"Intent cache embedding failed: {e}")
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if vector.ndim != 1 or norm == 0.0:
+            return None
+        return vector / norm
+    
+    def _cache_classification(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]],
+        result: IntentClassification,
+        vector: Optional[np.ndarray] = None,
+    ) -> None:
+        """Remember an LLM classification, evicting the least recently used."""
+        key = self._classification_cache_key(query, context)
+        with self._classification_cache_lock:
+            self._classification_cache[key] = result
+            self._classification_cache.move_to_end(key)
+            while len(self._classification_cache) > self.CLASSIFICATION_CACHE_SIZE:
+                self._classification_cache.popitem(last=False)
+            
+            if vector is None:
+                return
+            if self._semantic_vectors is None or self._semantic_vectors.shape[1] != vector.shape[0]:
+                self._semantic_vectors = vector[None, :]
+                self._semantic_results = [result]
+                return
+            self._semantic_vectors = np.vstack([self._semantic_vectors, vector[None, :]])[-self.CLASSIFICATION_CACHE_SIZE:]
+            self._semantic_results.append(result)
+            del self._semantic_results[:-self.CLASSIFICATION_CACHE_SIZE]
     
     def _classify_with_openai(
         self,
@@ -268,21 +916,46 @@ class IntentRouter:
         user_prompt: str,
     ) -> IntentClassification:
         """Classify using OpenAI API."""
-        import json
-        
+        return self._parse_llm_response(self._complete_with_openai(system_prompt, user_prompt))
+    
+    def _complete_with_openai(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        count: int = 1,
+    ) -> str:
+        """Get the raw JSON response of an OpenAI request for ``count`` classifications."""
         response = self.openai.chat.completions.create(
+            **self._openai_request(system_prompt, user_prompt, count)
+        )
+        
+        return response.choices[0].message.content or ""
+    
+    def _openai_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        count: int,
+    ) -> Dict[str, Any]:
+        """Arguments of an OpenAI request for ``count`` classifications (sync or async client)."""
+        return dict(
             model=self.settings.openai_model_mini,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            max_tokens=200,
+            max_tokens=self.OPENAI_CLASSIFICATION_MAX_TOKENS * count,
             temperature=0.1,
-            response_format={"type": "json_object"},
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "intent_classification" if count == 1 else "intent_classifications",
+                    "schema": INTENT_JSON_SCHEMA if count == 1 else INTENT_BATCH_JSON_SCHEMA,
+                    "strict": True,
+                },
+            },
+            prompt_cache_key=prompt_cache_key(system_prompt),
         )
-        
-        content = response.choices[0].message.content
-        return self._parse_llm_response(content)
     
     def _classify_with_gemini(
         self,
@@ -290,23 +963,40 @@ class IntentRouter:
         user_prompt: str,
     ) -> IntentClassification:
         """Classify using Gemini API."""
-        import json
-        
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
-        
+        return self._parse_llm_response(self._complete_with_gemini(system_prompt, user_prompt))
+    
+    def _complete_with_gemini(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        count: int = 1,
+    ) -> str:
+        """Get the raw response text of a Gemini request for ``count`` classifications."""
         model_name = self.settings.gemini_model_flash
         self.logger.info(f"Classifying intent with Gemini model: {model_name}")
 
         response = self._gemini_client.models.generate_content(
             model=model_name,
-            contents=full_prompt,
-            config=genai_types.GenerateContentConfig(
-                temperature=0.1,
-                max_output_tokens=200,
-            ),
+            contents=user_prompt,
+            config=self._gemini_config(system_prompt, count),
         )
-        
-        # Extract text from response
+        return self._gemini_response_text(response)
+    
+    @classmethod
+    def _gemini_config(cls, system_prompt: str, count: int) -> Any:
+        """Generation config of a Gemini request for ``count`` classifications."""
+        return genai_types.GenerateContentConfig(
+            # Passed as system instruction so the prefix is cacheable
+            system_instruction=system_prompt,
+            temperature=0.1,
+            max_output_tokens=cls.GEMINI_CLASSIFICATION_MAX_TOKENS * count,
+            response_mime_type="application/json",
+            response_json_schema=INTENT_JSON_SCHEMA if count == 1 else INTENT_BATCH_JSON_SCHEMA,
+        )
+    
+    @staticmethod
+    def _gemini_response_text(response: Any) -> str:
+        """Extract the text of a Gemini response."""
         content = ""
         if hasattr(response, "text") and response.text:
             content = response.text
@@ -317,42 +1007,13 @@ class IntentRouter:
                     if len(candidate.content.parts) > 0:
                         content = candidate.content.parts[0].text
         
-        return self._parse_llm_response(content)
+        return content
     
     def _parse_llm_response(self, content: str) -> IntentClassification:
         """Parse LLM response into IntentClassification."""
-        import json
-        
         try:
-            # Try to extract JSON from the response
-            # Handle cases where LLM wraps JSON in markdown code blocks
-            content = content.strip()
-            if content.startswith("```"):
-                # Remove markdown code block
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
-            
-            data = json.loads(content)
-            
-            intent_str = data.get("intent", "DOCUMENT_QA").upper()
-            intent_map = {
-                "DIRECT_ANSWER": IntentType.DIRECT_ANSWER,
-                "DOCUMENT_QA": IntentType.DOCUMENT_QA,
-                "WEB_SEARCH": IntentType.WEB_SEARCH,
-                "COMPLEX_REASONING": IntentType.COMPLEX_REASONING,
-                "COMPLEX": IntentType.COMPLEX_REASONING,
-            }
-            
-            intent = intent_map.get(intent_str, IntentType.DOCUMENT_QA)
-            confidence = float(data.get("confidence", 0.7))
-            reasoning = data.get("reasoning", "LLM classification")
-            
-            return IntentClassification(
-                intent=intent,
-                confidence=min(max(confidence, 0.0), 1.0),  # Clamp to [0, 1]
-                reasoning=reasoning,
-            )
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            return self._to_classification(self._load_json(content))
+        except (json.JSONDecodeError, KeyError, ValueError, AttributeError) as e:
             self.logger.warning(f"Failed to parse LLM response: {e}, content: {content[:200]}")
             return IntentClassification(
                 intent=IntentType.DOCUMENT_QA,
@@ -360,6 +1021,43 @@ class IntentRouter:
                 reasoning=f"Failed to parse LLM response, defaulting to document search",
             )
     
+    def _parse_batch_response(self, content: str, count: int) -> Optional[List[IntentClassification]]:
+        """Parse a batched response; None unless it has exactly ``count`` classifications."""
+        try:
+            data = self._load_json(content)
+            items = data.get("classifications") if isinstance(data, dict) else data
+            if not isinstance(items, list) or len(items) != count:
+                return None
+            return [self._to_classification(item) for item in items]
+        except (json.JSONDecodeError, KeyError, ValueError, AttributeError) as e:
+            self.logger.warning(f"Failed to parse batched LLM response: {e}, content: {content[:200]}")
+            return None
+    
+    @staticmethod
+    def _load_json(content: str) -> Any:
+        """Load JSON from an LLM response, tolerating markdown code blocks."""
+        # Handle cases where LLM wraps JSON in markdown code blocks
+        content = content.strip()
+        if content.startswith("```"):
+            # Remove markdown code block
+            lines = content.split("\n")
+            content = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+        return _json_loads(content)
+    
+    @staticmethod
+    def _to_classification(data: Dict[str, Any]) -> IntentClassification:
+        """Build an IntentClassification from one parsed classification object."""
+        intent_str = data.get("intent", "DOCUMENT_QA").upper()
+        intent = _LLM_INTENTS.get(intent_str, IntentType.DOCUMENT_QA)
+        confidence = float(data.get("confidence", 0.7))
+        reasoning = data.get("reasoning", "LLM classification")
+        
+        return IntentClassification(
+            intent=intent,
+            confidence=min(max(confidence, 0.0), 1.0),  # Clamp to [0, 1]
+            reasoning=reasoning,
+        )
+    
     def is_small_talk(self, query: str) -> bool:
         """
         Quick check if a query is small-talk/greeting.
@@ -373,16 +1071,4 @@ class IntentRouter:
         Returns:
             True if the query is detected as small-talk/greeting
         """
-        query_stripped = query.strip()
-        
-        # Check greeting patterns
-        for pattern in self._greeting_patterns:
-            if pattern.match(query_stripped):
-                return True
-        
-        # Check small-talk patterns
-        for pattern in self._small_talk_patterns:
-            if pattern.match(query_stripped):
-                return True
-        
-        return False
+        return self._check_patterns(query.strip()) is not None
@@ -0,0 +1,59 @@
+"""
+Server-Sent Events encoding for agent streams.
+
+Events are serialized straight to UTF-8 ``bytes`` frames, so the HTTP layer
+can write them without another encode step. orjson is used when available
+(C-accelerated, emits bytes directly); otherwise, or for values orjson
+rejects, the stdlib json module produces the same compact output.
+"""
+
+import json
+from typing import Any, Dict
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+from .types import AgentStreamEvent
+
+
+def dumps_bytes(data: Dict[str, Any]) -> bytes:
+    """Serialize data to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # Values orjson rejects (e.g. numpy scalars, integers beyond 64 bits)
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_sse_frame(data: Dict[str, Any]) -> bytes:
+    """Encode a JSON payload as a single SSE ``data:`` frame."""
+    return b"data: " + dumps_bytes(data) + b"\n\n"
+
+
+def encode_sse_event(event: AgentStreamEvent, include_metadata: bool = False) -> bytes:
+    """
+    Encode an agent stream event as an SSE frame.
+
+    Args:
+        event: The event to encode
+        include_metadata: Include event metadata (trace mode); metadata of
+            the final answer (e.g. latency) is always included
+
+    Returns:
+        The encoded SSE frame
+    """
+    event_data: Dict[str, Any] = {
+        "event_type": event.event_type,
+        "content": event.content,
+    }
+    if event.metadata and (include_metadata or event.event_type == "answer"):
+        event_data["metadata"] = event.metadata
+    return encode_sse_frame(event_data)
+
+
+# Terminal frame sent after the last event of a stream
+SSE_DONE_FRAME = encode_sse_frame({"event_type": "done"})
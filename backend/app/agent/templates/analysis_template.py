@@ -7,10 +7,15 @@ custom analysis workflows without modifying core code.
 
 from typing import Any, Dict, List
 
-import json
 import yaml
 from pydantic import BaseModel, Field
 
+# libyaml's C parser and emitter when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 
 class AnalysisTemplate(BaseModel):
     """
@@ -44,16 +49,18 @@ class AnalysisTemplate(BaseModel):
 
     def to_yaml(self) -> str:
         """Serialize the template to YAML string."""
-        return yaml.dump(self.model_dump(), allow_unicode=True, default_flow_style=False)
+        return yaml.dump(
+            self.model_dump(), Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False
+        )
 
     @classmethod
     def from_json(cls, json_str: str) -> "AnalysisTemplate":
         """Deserialize a template from JSON string."""
-        data = json.loads(json_str)
-        return cls.model_validate(data)
+        # Parsed and validated in one pass by pydantic-core
+        return cls.model_validate_json(json_str)
 
     @classmethod
     def from_yaml(cls, yaml_str: str) -> "AnalysisTemplate":
         """Deserialize a template from YAML string."""
-        data = yaml.safe_load(yaml_str)
+        data = yaml.load(yaml_str, Loader=_YamlLoader)
         return cls.model_validate(data)
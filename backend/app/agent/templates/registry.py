@@ -6,12 +6,21 @@ analysis templates from configuration files.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from .analysis_template import AnalysisTemplate
 
 
+# File suffixes load_from_directory picks up
+TEMPLATE_SUFFIXES = (".json", ".yaml", ".yml")
+
+# Maximum threads reading and parsing template files of a directory
+MAX_LOAD_WORKERS = 16
+
+
 class TemplateRegistry:
     """
     Registry for managing AnalysisTemplate instances.
@@ -89,10 +98,15 @@ class TemplateRegistry:
             FileNotFoundError: If the file does not exist
             ValueError: If the file format is not supported
         """
-        path = Path(file_path)
-        
+        template = self._read_template(Path(file_path))
+        self.register(template)
+        return template
+    
+    @staticmethod
+    def _read_template(path: Path) -> AnalysisTemplate:
+        """Read and parse a template file without registering it."""
         if not path.exists():
-            raise FileNotFoundError(f"Template file not found: {file_path}")
+            raise FileNotFoundError(f"Template file not found: {path}")
         
         content = path.read_text(encoding="utf-8")
         suffix = path.suffix.lower()
@@ -103,14 +117,15 @@ class TemplateRegistry:
             template = AnalysisTemplate.from_yaml(content)
         else:
             raise ValueError(f"Unsupported file format: {suffix}. Use .json, .yaml, or .yml")
-        
-        self.register(template)
         return template
     
     def load_from_directory(self, directory_path: str) -> List[AnalysisTemplate]:
         """
         Load all templates from a directory.
         
+        Files are read and parsed on a thread pool, then registered in
+        directory order, so a later file still wins on a name clash.
+        
         Args:
             directory_path: Path to the directory containing template files
             
@@ -128,18 +143,29 @@ class TemplateRegistry:
         if not path.is_dir():
             raise ValueError(f"Path is not a directory: {directory_path}")
         
-        loaded_templates = []
+        file_paths = [p for p in path.iterdir() if p.suffix.lower() in TEMPLATE_SUFFIXES]
+        if not file_paths:
+            return []
         
-        for file_path in path.iterdir():
-            if file_path.suffix.lower() in (".json", ".yaml", ".yml"):
-                try:
-                    template = self.load_from_file(str(file_path))
-                    loaded_templates.append(template)
-                except Exception:
-                    # Skip files that fail to load
-                    continue
+        with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(file_paths))) as pool:
+            templates = list(pool.map(self._try_read_template, file_paths))
+        
+        loaded_templates = []
+        for template in templates:
+            if template is not None:
+                self.register(template)
+                loaded_templates.append(template)
         
         return loaded_templates
+    
+    @classmethod
+    def _try_read_template(cls, path: Path) -> Optional[AnalysisTemplate]:
+        """Read a template file, or None if it fails to load."""
+        try:
+            return cls._read_template(path)
+        except Exception:
+            # Skip files that fail to load
+            return None
 
 
 # Global registry instance
@@ -167,12 +193,21 @@ def get_default_template() -> AnalysisTemplate:
     """
     Get the default general-purpose analysis template.
     
+    The file is read and validated once per process; each call returns a
+    copy, so callers may modify the result.
+    
     Returns:
         The default AnalysisTemplate
         
     Raises:
         FileNotFoundError: If the default template file is missing
     """
+    return _load_default_template().model_copy(deep=True)
+
+
+@lru_cache(maxsize=1)
+def _load_default_template() -> AnalysisTemplate:
+    """Parse the default template file (not cached if it is missing)."""
     if not DEFAULT_TEMPLATE_PATH.exists():
         raise FileNotFoundError(f"Default template not found: {DEFAULT_TEMPLATE_PATH}")
     
@@ -5,13 +5,14 @@ Contains built-in tools like document_search and web_search,
 as well as the ToolRegistry for managing callable tools.
 """
 
-from .registry import ToolRegistry, ToolNotFoundError
+from .registry import ToolRegistry, ToolNotFoundError, ToolArgumentError
 from .document_search import create_document_search_tool
 from .web_search import create_web_search_tool, WebSearchError
 
 __all__ = [
     "ToolRegistry",
     "ToolNotFoundError",
+    "ToolArgumentError",
     "create_document_search_tool",
     "create_web_search_tool",
     "WebSearchError",
@@ -14,6 +14,19 @@ from ...services.rag_service import RAGService
 logger = logging.getLogger("app.agent.tools.document_search")
 
 
+def _format_chunk(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a retrieved chunk for agent consumption."""
+    metadata = chunk.get("metadata") or {}
+    return {
+        "id": chunk.get("id"),
+        "text": chunk.get("text", ""),
+        "document_id": metadata.get("document_id", "unknown"),
+        "section": metadata.get("section_path", "unknown"),
+        "page": metadata.get("page_number"),
+        "relevance_score": 1.0 - chunk.get("distance", 0.0),  # Convert distance to score
+    }
+
+
 def create_document_search_tool(rag_service: RAGService) -> Tool:
     """Create a document_search tool instance.
     
@@ -60,16 +73,7 @@ def create_document_search_tool(rag_service: RAGService) -> Tool:
             )
             
             # Format results for agent consumption
-            results = []
-            for chunk in chunks:
-                results.append({
-                    "id": chunk.get("id"),
-                    "text": chunk.get("text", ""),
-                    "document_id": chunk.get("metadata", {}).get("document_id", "unknown"),
-                    "section": chunk.get("metadata", {}).get("section_path", "unknown"),
-                    "page": chunk.get("metadata", {}).get("page_number"),
-                    "relevance_score": 1.0 - chunk.get("distance", 0.0),  # Convert distance to score
-                })
+            results = [_format_chunk(chunk) for chunk in chunks]
             
             logger.info(f"Document search returned {len(results)} results")
             return results
@@ -4,8 +4,13 @@ Tool Registry for the Agent module.
 Manages registration, retrieval, and invocation of callable tools.
 """
 
+import asyncio
+import hashlib
+import inspect
+import itertools
+import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from ..types import Tool, ToolSchema
 
@@ -15,6 +20,67 @@ class ToolNotFoundError(ValueError):
     pass
 
 
+class ToolArgumentError(ValueError):
+    """Raised when tool arguments do not match the tool's parameter schema."""
+    pass
+
+
+# Python types accepted for each JSON Schema primitive type
+_JSON_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+}
+
+ArgumentValidator = Callable[[Dict[str, Any]], None]
+
+
+def _compile_validator(schema: ToolSchema) -> ArgumentValidator:
+    """Compile a tool schema into an argument validator.
+    
+    The schema is walked once, at registration, into a list of required
+    names and per-property type checks, so validating a call is a few dict
+    lookups. Only required parameters and primitive property types are
+    checked; other JSON Schema keywords are ignored.
+    
+    Args:
+        schema: The tool schema to compile
+        
+    Returns:
+        Callable raising ToolArgumentError for invalid arguments
+    """
+    required = tuple(schema.required)
+    properties = schema.parameters.get("properties")
+    type_checks: List[Tuple[str, str, Tuple[type, ...]]] = []
+    if isinstance(properties, dict):
+        for param, spec in properties.items():
+            if isinstance(spec, dict) and spec.get("type") in _JSON_TYPES:
+                type_checks.append((param, spec["type"], _JSON_TYPES[spec["type"]]))
+    
+    def validate(arguments: Dict[str, Any]) -> None:
+        missing = [param for param in required if param not in arguments]
+        if missing:
+            raise ToolArgumentError(
+                f"Missing required parameters for {schema.name}: {', '.join(missing)}"
+            )
+        for param, json_type, python_types in type_checks:
+            value = arguments.get(param)
+            if value is None:
+                continue
+            # bool is a subclass of int but not a JSON integer/number
+            if not isinstance(value, python_types) or (
+                isinstance(value, bool) and json_type != "boolean"
+            ):
+                raise ToolArgumentError(
+                    f"Parameter {param} of {schema.name} must be of type {json_type}"
+                )
+    
+    return validate
+
+
 class ToolRegistry:
     """Registry for managing callable tools.
     
@@ -25,6 +91,11 @@ class ToolRegistry:
     def __init__(self) -> None:
         """Initialize an empty tool registry."""
         self._tools: Dict[str, Tool] = {}
+        self._validators: Dict[str, ArgumentValidator] = {}
+        self._content_hash: Optional[str] = None
+        self._version = 0
+        self._detached: Dict[str, asyncio.Task] = {}
+        self._task_ids = itertools.count(1)
         self._logger = logging.getLogger("app.agent.tools.registry")
     
     def register(self, tool: Tool) -> None:
@@ -35,13 +106,43 @@ class ToolRegistry:
             
         Note:
             If a tool with the same name already exists, it will be overwritten.
+            The argument validator is compiled here rather than on every call.
         """
         name = tool.schema_.name
         if name in self._tools:
             self._logger.warning(f"Overwriting existing tool: {name}")
         self._tools[name] = tool
+        self._validators[name] = _compile_validator(tool.schema_)
+        self._content_hash = None
+        self._version += 1
         self._logger.debug(f"Registered tool: {name}")
     
+    def unregister(self, name: str) -> bool:
+        """Remove a tool from the registry.
+        
+        Args:
+            name: The unique name of the tool
+            
+        Returns:
+            True if the tool was registered, False otherwise
+        """
+        if self._tools.pop(name, None) is None:
+            return False
+        del self._validators[name]
+        self._content_hash = None
+        self._version += 1
+        self._logger.debug(f"Unregistered tool: {name}")
+        return True
+    
+    @property
+    def version(self) -> int:
+        """Counter incremented on every registration change.
+        
+        Consumers cache data derived from the tool set (e.g. the rendered
+        tools description) and rebuild it only when the version moves.
+        """
+        return self._version
+    
     def get(self, name: str) -> Optional[Tool]:
         """Get a tool by name.
         
@@ -57,10 +158,34 @@ class ToolRegistry:
         """List all registered tool schemas.
         
         Returns:
-            List of all registered tool schemas
+            List of all registered tool schemas, in registration order
         """
         return [tool.schema_ for tool in self._tools.values()]
     
+    def content_hash(self) -> str:
+        """Get a SHA-256 hash over the registered tool schemas.
+        
+        The hash is computed over the schemas sorted by name with parameter
+        specs serialized using sorted keys, so it is stable across restarts.
+        It is recomputed lazily after a registration.
+        
+        Returns:
+            Hex digest identifying the current tool set
+        """
+        if self._content_hash is None:
+            entries = sorted(
+                (
+                    schema.name,
+                    schema.description,
+                    json.dumps(schema.parameters, sort_keys=True),
+                    json.dumps(schema.required),
+                )
+                for schema in self.list_tools()
+            )
+            payload = json.dumps(entries, ensure_ascii=False)
+            self._content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return self._content_hash
+    
     def invoke(self, name: str, **kwargs: Any) -> Any:
         """Invoke a tool by name with given parameters.
         
@@ -73,11 +198,16 @@ class ToolRegistry:
             
         Raises:
             ToolNotFoundError: If the tool is not found
+            ToolArgumentError: If the parameters do not match the tool schema
+            TypeError: If the tool has a coroutine handler; use ``ainvoke``
         """
         tool = self._tools.get(name)
         if tool is None:
             self._logger.error(f"Tool not found: {name}")
             raise ToolNotFoundError(f"Tool not found: {name}")
+        if inspect.iscoroutinefunction(tool.handler):
+            raise TypeError(f"Tool {name} has an async handler; call ainvoke instead of invoke")
+        self._validators[name](kwargs)
         
         self._logger.debug(f"Invoking tool: {name} with params: {kwargs}")
         try:
@@ -88,6 +218,137 @@ class ToolRegistry:
             self._logger.error(f"Tool {name} failed: {e}")
             raise
     
+    async def ainvoke(self, name: str, **kwargs: Any) -> Any:
+        """Invoke a tool by name without blocking the event loop.
+        
+        Coroutine handlers are awaited directly; synchronous handlers run in
+        a worker thread so several tools can execute concurrently.
+        
+        Args:
+            name: The name of the tool to invoke
+            **kwargs: Parameters to pass to the tool
+            
+        Returns:
+            The result of the tool invocation
+            
+        Raises:
+            ToolNotFoundError: If the tool is not found
+            ToolArgumentError: If the parameters do not match the tool schema
+        """
+        tool = self._tools.get(name)
+        if tool is None:
+            self._logger.error(f"Tool not found: {name}")
+            raise ToolNotFoundError(f"Tool not found: {name}")
+        
+        if inspect.iscoroutinefunction(tool.handler):
+            self._validators[name](kwargs)
+            self._logger.debug(f"Invoking tool: {name} with params: {kwargs}")
+            try:
+                result = await tool.handler(**kwargs)
+                self._logger.debug(f"Tool {name} completed successfully")
+                return result
+            except Exception as e:
+                self._logger.error(f"Tool {name} failed: {e}")
+                raise
+        
+        return await asyncio.to_thread(self.invoke, name, **kwargs)
+    
+    async def ainvoke_detached(self, name: str, **kwargs: Any) -> str:
+        """Start a tool invocation in the background.
+        
+        The invocation runs as an ``asyncio.Task``; its result is collected
+        later with ``poll`` or ``await_any``.
+        
+        Args:
+            name: The name of the tool to invoke
+            **kwargs: Parameters to pass to the tool
+            
+        Returns:
+            The task_id of the background invocation
+            
+        Raises:
+            ToolNotFoundError: If the tool is not found
+        """
+        if name not in self._tools:
+            self._logger.error(f"Tool not found: {name}")
+            raise ToolNotFoundError(f"Tool not found: {name}")
+        
+        task_id = f"task-{next(self._task_ids)}"
+        self._detached[task_id] = asyncio.create_task(self.ainvoke(name, **kwargs), name=task_id)
+        self._logger.debug(f"Dispatched tool {name} as {task_id}")
+        return task_id
+    
+    async def poll(self, task_id: str) -> Optional[Any]:
+        """Get the result of a background invocation if it has finished.
+        
+        A finished task is removed from the registry once its result is returned.
+        
+        Args:
+            task_id: ID returned by ``ainvoke_detached``
+            
+        Returns:
+            The tool result (or the exception it raised), None if still running
+            
+        Raises:
+            ValueError: If the task_id is unknown
+        """
+        task = self._detached.get(task_id)
+        if task is None:
+            raise ValueError(f"Unknown task: {task_id}")
+        if not task.done():
+            return None
+        del self._detached[task_id]
+        return self._task_outcome(task)
+    
+    async def await_any(self, task_ids: Iterable[str]) -> Tuple[str, Any]:
+        """Wait until one of the given background invocations finishes.
+        
+        Exceptions raised by a tool are returned rather than raised (like
+        ``asyncio.gather(return_exceptions=True)``), so the caller always
+        learns which task failed.
+        
+        Args:
+            task_ids: IDs returned by ``ainvoke_detached``
+            
+        Returns:
+            Tuple of (task_id, result) for the first finished task
+            
+        Raises:
+            ValueError: If none of the task_ids is pending
+        """
+        pending = [task_id for task_id in task_ids if task_id in self._detached]
+        if not pending:
+            raise ValueError("No pending tasks to await")
+        
+        done, _ = await asyncio.wait(
+            [self._detached[task_id] for task_id in pending],
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        # Report in the caller's order when several tasks finished together
+        task_id = next(task_id for task_id in pending if self._detached[task_id] in done)
+        task = self._detached.pop(task_id)
+        return task_id, self._task_outcome(task)
+    
+    def cancel_detached(self, task_ids: Iterable[str]) -> None:
+        """Cancel background invocations and forget them.
+        
+        Args:
+            task_ids: IDs returned by ``ainvoke_detached``
+        """
+        for task_id in task_ids:
+            task = self._detached.pop(task_id, None)
+            if task is not None and not task.done():
+                task.cancel()
+                self._logger.debug(f"Cancelled background task {task_id}")
+    
+    @staticmethod
+    def _task_outcome(task: asyncio.Task) -> Any:
+        """Return a finished task's result, or the exception it raised."""
+        if task.cancelled():
+            return asyncio.CancelledError(f"Task {task.get_name()} was cancelled")
+        exception = task.exception()
+        return exception if exception is not None else task.result()
+    
     def __len__(self) -> int:
         """Return the number of registered tools."""
         return len(self._tools)
@@ -2,6 +2,8 @@
 Web Search Tool for the Agent.
 
 Provides web search functionality using Tavily API with fallback to SerpApi.
+The handler is a coroutine, so the registry awaits it on the event loop
+instead of occupying a worker thread for the duration of the HTTP call.
 """
 
 import logging
@@ -24,7 +26,7 @@ class WebSearchError(Exception):
     pass
 
 
-def _search_tavily(
+async def _search_tavily(
     query: str,
     api_key: str,
     max_results: int = 5,
@@ -40,8 +42,8 @@ def _search_tavily(
         List of search results with title, url, and content
     """
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.post(
                 TAVILY_API_URL,
                 json={
                     "api_key": api_key,
@@ -73,7 +75,7 @@ def _search_tavily(
         raise WebSearchError(f"Tavily search failed: {e}")
 
 
-def _search_serpapi(
+async def _search_serpapi(
     query: str,
     api_key: str,
     max_results: int = 5,
@@ -89,8 +91,8 @@ def _search_serpapi(
         List of search results with title, url, and content
     """
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.get(
                 SERPAPI_URL,
                 params={
                     "api_key": api_key,
@@ -138,7 +140,7 @@ def create_web_search_tool(
     _tavily_key = tavily_api_key or getattr(settings, "tavily_api_key", None)
     _serpapi_key = serpapi_key or getattr(settings, "serpapi_key", None)
     
-    def web_search(
+    async def web_search(
         query: str,
         max_results: int = 5,
         **kwargs: Any,
@@ -157,7 +159,7 @@ def create_web_search_tool(
         # Try Tavily first
         if _tavily_key:
             try:
-                results = _search_tavily(query, _tavily_key, max_results)
+                results = await _search_tavily(query, _tavily_key, max_results)
                 logger.info(f"Tavily search returned {len(results)} results")
                 return results
             except WebSearchError as e:
@@ -166,7 +168,7 @@ def create_web_search_tool(
         # Fallback to SerpApi
         if _serpapi_key:
             try:
-                results = _search_serpapi(query, _serpapi_key, max_results)
+                results = await _search_serpapi(query, _serpapi_key, max_results)
                 logger.info(f"SerpApi search returned {len(results)} results")
                 return results
             except WebSearchError as e:
@@ -10,11 +10,13 @@ Contains:
 from .tracer import (
     ExecutionTrace,
     ExecutionTracer,
+    Span,
     TraceSpan,
 )
 
 __all__ = [
     "ExecutionTrace",
     "ExecutionTracer",
+    "Span",
     "TraceSpan",
 ]
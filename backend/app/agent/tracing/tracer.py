@@ -8,9 +8,13 @@ supporting LangSmith/LangFuse compatible trace export and latency metrics.
 **Requirements: 8.1, 8.3**
 """
 
+import itertools
+import time
 import uuid
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -35,6 +39,45 @@ class ExecutionTrace(BaseModel):
     total_latency_ms: float = Field(default=0.0, description="Total execution time in milliseconds")
 
 
+class Span:
+    """
+    A live span, as returned by ``ExecutionTracer.start_span``.
+    
+    Kept deliberately small: timestamps are monotonic ``perf_counter_ns``
+    values and IDs come from a per-tracer counter. The ``TraceSpan`` models
+    are only built when the trace is read.
+    """
+    __slots__ = ("id", "name", "parent", "start_ns", "end_ns", "inputs", "outputs", "metadata")
+    
+    def __init__(
+        self,
+        span_id: int,
+        name: str,
+        parent: Optional["Span"],
+        inputs: Dict[str, Any],
+        metadata: Dict[str, Any],
+    ) -> None:
+        self.id = span_id
+        self.name = name
+        self.parent = parent
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.inputs = inputs
+        self.outputs: Optional[Dict[str, Any]] = None
+        self.metadata = metadata
+    
+    @property
+    def span_id(self) -> str:
+        """Get the span ID as used in exported traces."""
+        return str(self.id)
+    
+    def __str__(self) -> str:
+        return self.span_id
+
+
+SpanRef = Union[Span, str]
+
+
 class ExecutionTracer:
     """
     Records agent execution for observability and debugging.
@@ -44,11 +87,15 @@ class ExecutionTracer:
     - Latency metrics for each span
     - LangSmith/LangFuse compatible trace export
     
+    Spans opened with ``trace_span`` nest automatically: the innermost open
+    span is tracked in a ContextVar, so concurrent asyncio tasks each see
+    their own parent.
+    
     Usage:
         tracer = ExecutionTracer()
-        span_id = tracer.start_span("tool_call", {"tool": "search", "query": "test"})
-        # ... do work ...
-        tracer.end_span(span_id, {"results": ["item1", "item2"]})
+        with tracer.trace_span("tool_call", tool="search", query="test") as span:
+            # ... do work ...
+            span.outputs = {"results": ["item1", "item2"]}
         trace = tracer.get_trace()
     """
     
@@ -60,10 +107,16 @@ class ExecutionTracer:
             trace_id: Optional trace ID. If not provided, a UUID will be generated.
         """
         self._trace_id = trace_id or str(uuid.uuid4())
-        self._spans: Dict[str, TraceSpan] = {}
-        self._span_order: List[str] = []  # Maintain insertion order
-        self._start_time: Optional[datetime] = None
-        self._current_parent_id: Optional[str] = None
+        # Span IDs are 1-based positions in this list
+        self._spans: List[Span] = []
+        self._span_ids = itertools.count(1)
+        self._current_parent: Optional[Span] = None
+        self._active: ContextVar[Optional[Span]] = ContextVar(
+            f"active_span_{self._trace_id}", default=None
+        )
+        # Wall-clock anchor for converting monotonic timestamps
+        self._anchor_ns = time.perf_counter_ns()
+        self._anchor_time = datetime.now(timezone.utc)
     
     @property
     def trace_id(self) -> str:
@@ -74,75 +127,81 @@ class ExecutionTracer:
         self,
         name: str,
         inputs: Dict[str, Any],
-        parent_id: Optional[str] = None,
+        parent_id: Optional[SpanRef] = None,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> str:
+    ) -> Span:
         """
         Start a new trace span.
         
         Args:
             name: Name of the operation (e.g., "tool_call", "llm_call", "reasoning_step")
             inputs: Input data for this span
-            parent_id: Optional parent span ID for hierarchical tracing
+            parent_id: Optional parent span (or its ID) for hierarchical tracing;
+                defaults to the span set with ``set_parent``, then to the
+                innermost ``trace_span``
             metadata: Optional additional metadata
         
         Returns:
-            Unique span_id for this span
+            The started span; pass it (or its ``span_id``) to ``end_span``
         """
-        span_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc)
-        
-        # Record trace start time from first span
-        if self._start_time is None:
-            self._start_time = now
-        
-        span = TraceSpan(
-            span_id=span_id,
-            parent_id=parent_id or self._current_parent_id,
-            name=name,
-            start_time=now,
-            inputs=inputs,
-            metadata=metadata or {}
-        )
-        
-        self._spans[span_id] = span
-        self._span_order.append(span_id)
+        if parent_id is not None:
+            parent = self._resolve(parent_id)
+        else:
+            parent = self._current_parent or self._active.get()
         
-        return span_id
+        span = Span(next(self._span_ids), name, parent, inputs, metadata or {})
+        self._spans.append(span)
+        return span
     
-    def end_span(self, span_id: str, outputs: Dict[str, Any]) -> None:
+    def end_span(self, span_id: SpanRef, outputs: Dict[str, Any]) -> None:
         """
         End a trace span with outputs.
         
         Args:
-            span_id: The ID of the span to end
+            span_id: The span (or its ID) to end
             outputs: Output data from this span
         
         Raises:
             ValueError: If the span_id is not found
         """
-        if span_id not in self._spans:
-            raise ValueError(f"Span not found: {span_id}")
+        span = self._resolve(span_id)
+        span.end_ns = time.perf_counter_ns()
+        span.outputs = outputs
+    
+    @contextmanager
+    def trace_span(self, name: str, **inputs: Any) -> Iterator[Span]:
+        """
+        Trace a block of code as a span nested under the current span.
         
-        span = self._spans[span_id]
-        now = datetime.now(timezone.utc)
+        Outputs assigned to ``span.outputs`` inside the block are recorded;
+        an exception is recorded as ``{"error": ...}`` and re-raised.
         
-        span.end_time = now
-        span.outputs = outputs
+        Args:
+            name: Name of the operation
+            **inputs: Input data for this span
         
-        # Calculate latency in milliseconds
-        if span.start_time:
-            delta = now - span.start_time
-            span.latency_ms = delta.total_seconds() * 1000
+        Yields:
+            The started span
+        """
+        span = self.start_span(name, inputs)
+        token = self._active.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.outputs = {"error": str(e)}
+            raise
+        finally:
+            self._active.reset(token)
+            self.end_span(span, span.outputs or {})
     
-    def set_parent(self, parent_id: Optional[str]) -> None:
+    def set_parent(self, parent_id: Optional[SpanRef]) -> None:
         """
-        Set the current parent span ID for subsequent spans.
+        Set the current parent span for subsequent spans.
         
         Args:
-            parent_id: The parent span ID, or None to clear
+            parent_id: The parent span (or its ID), or None to clear
         """
-        self._current_parent_id = parent_id
+        self._current_parent = self._resolve(parent_id) if parent_id is not None else None
     
     def get_trace(self) -> ExecutionTrace:
         """
@@ -151,33 +210,52 @@ class ExecutionTracer:
         Returns:
             ExecutionTrace with all spans and total latency
         """
-        # Calculate total latency from first to last span
+        # Calculate total latency from first span start to latest span end
         total_latency_ms = 0.0
-        
-        if self._span_order:
-            first_span = self._spans[self._span_order[0]]
-            
-            # Find the latest end_time among all spans
-            latest_end: Optional[datetime] = None
-            for span_id in self._span_order:
-                span = self._spans[span_id]
-                if span.end_time:
-                    if latest_end is None or span.end_time > latest_end:
-                        latest_end = span.end_time
-            
-            if latest_end and first_span.start_time:
-                delta = latest_end - first_span.start_time
-                total_latency_ms = delta.total_seconds() * 1000
-        
-        # Return spans in order
-        ordered_spans = [self._spans[span_id] for span_id in self._span_order]
+        end_times = [span.end_ns for span in self._spans if span.end_ns is not None]
+        if end_times:
+            total_latency_ms = (max(end_times) - self._spans[0].start_ns) / 1e6
         
         return ExecutionTrace(
             trace_id=self._trace_id,
-            spans=ordered_spans,
+            spans=[self._to_trace_span(span) for span in self._spans],
             total_latency_ms=total_latency_ms
         )
     
+    def _resolve(self, span_id: SpanRef) -> Span:
+        """Find a span of this tracer by object or ID."""
+        if isinstance(span_id, Span):
+            index = span_id.id - 1
+        else:
+            try:
+                index = int(span_id) - 1
+            except (TypeError, ValueError):
+                index = -1
+        
+        if 0 <= index < len(self._spans) and (
+            not isinstance(span_id, Span) or self._spans[index] is span_id
+        ):
+            return self._spans[index]
+        raise ValueError(f"Span not found: {span_id}")
+    
+    def _wall_time(self, ns: int) -> datetime:
+        """Convert a perf_counter_ns timestamp to a UTC datetime."""
+        return self._anchor_time + timedelta(microseconds=(ns - self._anchor_ns) / 1000)
+    
+    def _to_trace_span(self, span: Span) -> TraceSpan:
+        """Materialize a live span as a TraceSpan model."""
+        return TraceSpan(
+            span_id=span.span_id,
+            parent_id=span.parent.span_id if span.parent else None,
+            name=span.name,
+            start_time=self._wall_time(span.start_ns),
+            end_time=self._wall_time(span.end_ns) if span.end_ns is not None else None,
+            inputs=span.inputs,
+            outputs=span.outputs,
+            metadata=span.metadata,
+            latency_ms=(span.end_ns - span.start_ns) / 1e6 if span.end_ns is not None else None,
+        )
+    
     def export_langsmith(self) -> Dict[str, Any]:
         """
         Export trace in LangSmith compatible format.
@@ -223,17 +301,26 @@ class ExecutionTracer:
                     if end_time is None or span.end_time.isoformat() > end_time:
                         end_time = span.end_time.isoformat()
         
-        # Convert spans to LangSmith run format
+        # Convert spans to LangSmith run format. Span IDs are only unique
+        # within this trace, so runs get UUIDs derived from the trace ID
+        try:
+            namespace = uuid.UUID(trace.trace_id)
+        except ValueError:
+            namespace = uuid.uuid5(uuid.NAMESPACE_OID, trace.trace_id)
+        
+        def run_id(span_id: Optional[str]) -> Optional[str]:
+            return str(uuid.uuid5(namespace, span_id)) if span_id is not None else None
+        
         runs = []
         for span in trace.spans:
             run = {
-                "id": span.span_id,
+                "id": run_id(span.span_id),
                 "name": span.name,
                 "start_time": span.start_time.isoformat(),
                 "end_time": span.end_time.isoformat() if span.end_time else None,
                 "inputs": span.inputs,
                 "outputs": span.outputs,
-                "parent_run_id": span.parent_id,
+                "parent_run_id": run_id(span.parent_id),
                 "run_type": self._infer_run_type(span.name),
                 "extra": {
                     "metadata": span.metadata,
@@ -279,6 +366,5 @@ class ExecutionTracer:
     def clear(self) -> None:
         """Clear all spans and reset the tracer."""
         self._spans.clear()
-        self._span_order.clear()
-        self._start_time = None
-        self._current_parent_id = None
+        self._span_ids = itertools.count(1)
+        self._current_parent = None
@@ -7,7 +7,7 @@ including intent classification, tool schemas, and agent responses.
 
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class IntentType(Enum):
@@ -20,6 +20,9 @@ class IntentType(Enum):
 
 class IntentClassification(BaseModel):
     """Result of intent classification by the Router."""
+    # Immutable: the router hands out shared and cached instances
+    model_config = ConfigDict(frozen=True)
+    
     intent: IntentType
     confidence: float = Field(ge=0.0, le=1.0, description="Confidence score between 0 and 1")
     reasoning: str = Field(description="Explanation for the classification")
@@ -38,6 +41,10 @@ class ToolSchema(BaseModel):
         description="List of required parameter names"
     )
 
+    def __hash__(self) -> int:
+        # Allows schemas to be used in memoization keys (see prompts.py)
+        return hash((self.name, self.description))
+
 
 class Tool(BaseModel):
     """A callable tool with its schema and handler function."""
@@ -72,6 +79,43 @@ class ThoughtStep(BaseModel):
     )
 
 
+class ReActAction(BaseModel):
+    """A tool call requested by the LLM in one ReAct step."""
+    name: str = Field(description="Name of the tool to invoke")
+    input: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Parameters to pass to the tool"
+    )
+
+
+class ReActStepSchema(BaseModel):
+    """Structured output of one ReAct reasoning step.
+
+    Passed to the LLM provider as a JSON Schema (constrained decoding), so
+    the response always parses without a repair pass.
+    """
+    thought: str = Field(description="Step-by-step reasoning for this step")
+    actions: Optional[List[ReActAction]] = Field(
+        default=None,
+        description="Tools to run now; independent actions run in parallel (null if ready to answer)"
+    )
+    dispatch_async: Optional[List[ReActAction]] = Field(
+        default=None,
+        description="Slow tools to start in the background; each returns a task id"
+    )
+    await_: Optional[List[str]] = Field(
+        default=None,
+        alias="await",
+        description="Background task ids to wait for before the next step"
+    )
+    final_answer: Optional[str] = Field(
+        default=None,
+        description="Comprehensive answer with citations (null if using a tool)"
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class AgentResponse(BaseModel):
     """Complete response from an agent execution."""
     answer: str = Field(description="The final answer to the user's query")
@@ -93,7 +137,7 @@ class AgentResponse(BaseModel):
 class AgentStreamEvent(BaseModel):
     """An event emitted during streaming agent execution."""
     event_type: str = Field(
-        description="Type of event: 'thinking', 'tool_call', 'tool_result', 'answer'"
+        description="Type of event: 'thinking', 'tool_call', 'tool_result', 'answer_delta', 'answer'"
     )
     content: str = Field(description="The content of the event")
     metadata: Optional[Dict[str, Any]] = Field(
@@ -12,7 +12,6 @@ Requirements:
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Optional
 
@@ -23,6 +22,7 @@ from pydantic import BaseModel, Field
 from ...core.security import UserContext, get_current_user
 from ...services.subscription_service import SubscriptionService, get_subscription_service
 from ...services.agent_service import AgentService, get_agent_service
+from ...agent.streaming import SSE_DONE_FRAME, encode_sse_event, encode_sse_frame
 from ...agent.types import AgentResponse, ThoughtStep
 
 
@@ -185,23 +185,12 @@ async def chat_stream(
                 user_id=current_user.id,
                 trace_enabled=trace,
             ):
-                # Format as SSE event
-                event_data = {
-                    "event_type": event.event_type,
-                    "content": event.content,
-                }
-                
-                # Include metadata if trace is enabled or for certain event types
-                if trace and event.metadata:
-                    event_data["metadata"] = event.metadata
-                elif event.event_type == "answer" and event.metadata:
-                    # Always include latency in answer event
-                    event_data["metadata"] = event.metadata
-                
-                yield f"data: {json.dumps(event_data, ensure_ascii=False)}\n\n"
+                # Pre-encoded SSE frame; metadata only in trace mode
+                # (the answer event always carries its latency metadata)
+                yield encode_sse_event(event, include_metadata=trace)
             
             # Send done event
-            yield f"data: {json.dumps({'event_type': 'done'})}\n\n"
+            yield SSE_DONE_FRAME
             
         except Exception as exc:
             logger.error(f"Agent stream failed: {exc}", exc_info=True)
@@ -212,7 +201,7 @@ async def chat_stream(
                 "event_type": "error",
                 "content": str(exc),
             }
-            yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+            yield encode_sse_frame(error_data)
     
     return StreamingResponse(
         event_generator(),
@@ -76,10 +76,19 @@ class Settings(BaseSettings):
     vector_weight: float = 0.7  # Weight for vector search in hybrid retrieval
     bm25_weight: float = 0.3  # Weight for BM25 search in hybrid retrieval
     agent_max_steps: int = 10  # Maximum reasoning steps for agent
+    agent_history_window: int = 3  # Recent steps whose observations are resent in full
     router_confidence_threshold: float = 0.8  # Confidence threshold for intent classification
+    router_max_concurrency: int = 8  # Max concurrent LLM calls in IntentRouter.classify_batch
+    router_max_llm_chars: int = 2000  # Longer queries are routed to document search without the LLM
+    router_semantic_cache: bool = False  # Reuse LLM intent classifications for paraphrased queries (embeds each query)
+    router_semantic_cache_threshold: float = 0.92  # Minimum cosine similarity for a paraphrase hit
     retrieval_top_k: int = 5  # Number of chunks to retrieve for document search
     tavily_api_key: Optional[str] = None  # API key for Tavily web search
     serpapi_key: Optional[str] = None  # API key for SerpApi web search
+    llm_cache_enabled: bool = False  # Cache agent LLM responses in Redis
+    llm_cache_ttl: int = 60 * 60  # Lifetime of cached LLM responses in seconds
+    llm_cache_semantic: bool = False  # Also serve near-duplicate prompts (embeds each user turn)
+    llm_cache_similarity_threshold: float = 0.95  # Minimum cosine similarity for a semantic hit
 
     model_config = SettingsConfigDict(
         env_file=".env",
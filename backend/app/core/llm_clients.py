@@ -0,0 +1,91 @@
+"""
+Process-wide LLM clients.
+
+Each client owns an HTTP connection pool. Building one per agent or router
+instance would pay a TCP/TLS handshake on the first call of every request,
+so clients are created once and shared. HTTP/2 is enabled when the ``h2``
+package is installed, letting concurrent requests share one connection.
+"""
+
+import importlib.util
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+try:
+    from google import genai  # type: ignore
+except ImportError:  # pragma: no cover
+    genai = None
+
+from .config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Connection pool shared by all requests of a client
+LLM_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+# Request timeout of LLM calls, in seconds
+LLM_HTTP_TIMEOUT = 60.0
+
+
+@lru_cache(maxsize=1)
+def get_async_openai_client() -> Optional[AsyncOpenAI]:
+    """Get the shared async OpenAI client, or None without an API key."""
+    settings = get_settings()
+    if not settings.openai_api_key:
+        return None
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        http_client=DefaultAsyncHttpxClient(
+            http2=HTTP2_AVAILABLE,
+            limits=LLM_HTTP_LIMITS,
+            timeout=LLM_HTTP_TIMEOUT,
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> Optional[OpenAI]:
+    """Get the shared sync OpenAI client, or None without an API key."""
+    settings = get_settings()
+    if not settings.openai_api_key:
+        return None
+    return OpenAI(
+        api_key=settings.openai_api_key,
+        http_client=DefaultHttpxClient(
+            http2=HTTP2_AVAILABLE,
+            limits=LLM_HTTP_LIMITS,
+            timeout=LLM_HTTP_TIMEOUT,
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_gemini_client() -> Optional[Any]:
+    """Get the shared Gemini client, or None without the SDK or an API key."""
+    settings = get_settings()
+    if genai is None or not settings.google_api_key:
+        return None
+    return genai.Client(api_key=settings.google_api_key)
+
+
+async def close_llm_clients() -> None:
+    """Close the connection pools of the shared clients (app shutdown)."""
+    if get_async_openai_client.cache_info().currsize:
+        client = get_async_openai_client()
+        if client is not None:
+            await client.close()
+        get_async_openai_client.cache_clear()
+    if get_openai_client.cache_info().currsize:
+        client = get_openai_client()
+        if client is not None:
+            client.close()
+        get_openai_client.cache_clear()
+    get_gemini_client.cache_clear()
@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
@@ -10,12 +13,23 @@ except ImportError:  # pragma: no cover
     sentry_init = None
     FastApiIntegration = None
 
+from .agent.retrieval.tokenizer import warm_up as warm_up_tokenizer
 from .api.routes import auth, documents, subscription, qa, agent, admin
 from .core.config import get_settings
+from .core.llm_clients import close_llm_clients
 from .logging_utils import setup_logging
 from .middleware.logging_middleware import RequestLoggingMiddleware
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the BM25 tokenizer's dictionary before serving the first query
+    await asyncio.to_thread(warm_up_tokenizer)
+    yield
+    # Shared LLM clients hold connection pools for the life of the process
+    await close_llm_clients()
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
     setup_logging(settings)
@@ -27,7 +41,7 @@ def create_app() -> FastAPI:
             traces_sample_rate=0.2,
         )
 
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
     # Add SessionMiddleware for OAuth (must be added before other middleware)
     app.add_middleware(SessionMiddleware, secret_key=settings.jwt_secret_key)
@@ -15,6 +15,7 @@ Requirements:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from typing import Any, AsyncIterator, Dict, List, Optional
@@ -22,6 +23,7 @@ from typing import Any, AsyncIterator, Dict, List, Optional
 import chromadb
 
 from ..core.config import get_settings, Settings
+from ..agent.llm_cache import LLMResponseCache
 from ..agent.react_agent import ReActAgent
 from ..agent.router import IntentRouter
 from ..agent.tools.registry import ToolRegistry
@@ -99,6 +101,11 @@ class AgentService:
         # Initialize intent router
         self._router = router or IntentRouter(
             confidence_threshold=self._settings.router_confidence_threshold,
+            # The question embedding is memoized, so document retrieval reuses it
+            query_embedder=(
+                self._rag_service._embed_question if self._settings.router_semantic_cache else None
+            ),
+            semantic_cache_threshold=self._settings.router_semantic_cache_threshold,
         )
         
         # Initialize tool registry with built-in tools
@@ -109,6 +116,8 @@ class AgentService:
             tool_registry=self._tool_registry,
             router=self._router,
             max_steps=self._settings.agent_max_steps,
+            history_window=self._settings.agent_history_window,
+            response_cache=self._create_response_cache(),
         )
         
         logger.info(
@@ -245,6 +254,28 @@ class AgentService:
         """
         return tracer.get_trace()
     
+    def _create_response_cache(self) -> Optional[LLMResponseCache]:
+        """Create the LLM response cache if enabled in settings."""
+        if not self._settings.llm_cache_enabled:
+            return None
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError:  # pragma: no cover
+            logger.warning("redis package not installed; LLM response cache disabled")
+            return None
+        
+        embedder = None
+        if self._settings.llm_cache_semantic:
+            async def embedder(text: str) -> List[float]:
+                return await asyncio.to_thread(self._rag_service._embed_question, text)
+        
+        return LLMResponseCache(
+            redis_client=redis_asyncio.from_url(self._settings.redis_url),
+            embedder=embedder,
+            ttl=self._settings.llm_cache_ttl,
+            similarity_threshold=self._settings.llm_cache_similarity_threshold,
+        )
+    
     def _create_chroma_client(self) -> chromadb.Client:
         """Create a ChromaDB client based on settings."""
         if self._settings.chroma_server_host:
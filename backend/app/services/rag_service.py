@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import logging
 import time
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 import chromadb
@@ -26,6 +27,7 @@ class RAGService:
         "turbo": 0.3,
     }
     CACHE_TTL = 60 * 60  # 1 hour
+    EMBEDDING_CACHE_SIZE = 1024  # Memoized query embeddings per service instance
     FALLBACK_ANSWER = "抱歉，我在文档中没有找到足够的信息来回答这个问题。"
 
     def __init__(
@@ -80,6 +82,7 @@ class RAGService:
             }
         self.cache = cache or CacheService(redis_client=redis_client)
         self.logger = logging.getLogger("app.services.rag")
+        self._embed_normalized = lru_cache(maxsize=self.EMBEDDING_CACHE_SIZE)(self._compute_embedding)
 
     # --- Public API -----------------------------------------------------
 
@@ -350,6 +353,10 @@ class RAGService:
         return {"answer": content, "model_used": model_name}
 
     def _embed_question(self, question: str) -> List[float]:
+        # Memoized on whitespace-normalized text: repeated questions skip the embedding API
+        return self._embed_normalized(" ".join(question.split()))
+
+    def _compute_embedding(self, question: str) -> List[float]:
         start = time.perf_counter()
         if self.embedding_provider == "gemini":
             if self._gemini_client is None:  # pragma: no cover
@@ -0,0 +1,56 @@
+"""Script to benchmark quantized candidate scans against a float32 scan."""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add 'backend' to sys.path so we can import 'app'
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.agent.retrieval.quantization import QuantizedIndex
+
+
+def time_per_query(fn, queries: np.ndarray, repeats: int) -> float:
+    """Return the mean milliseconds per query of fn over all queries."""
+    fn(queries)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(queries)
+    return (time.perf_counter() - start) * 1000 / (repeats * len(queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized candidate scans")
+    parser.add_argument("--rows", type=int, default=50000, help="Number of indexed chunks")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=1, help="Queries scanned together")
+    parser.add_argument("--candidates", type=int, default=50, help="Candidates per query")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed repetitions")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.rows, args.dim)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    norms = (embeddings ** 2).sum(axis=1)
+    ids = [str(i) for i in range(args.rows)]
+
+    def fp32_scan(batch: np.ndarray):
+        distances = norms[:, None] - 2.0 * (embeddings @ batch.T)
+        return [np.argpartition(column, args.candidates - 1)[:args.candidates] for column in distances.T]
+
+    print(f"{args.rows} x {args.dim}, {args.queries} queries per scan")
+    print(f"fp32    {time_per_query(fp32_scan, queries, args.repeats):8.2f} ms/query  "
+          f"{embeddings.nbytes / 2 ** 20:8.1f} MiB")
+    for mode in ("int8", "binary"):
+        index = QuantizedIndex.build(mode, ids, ids, [{} for _ in ids], embeddings)
+        scan = lambda batch: index.candidates_batch(batch, args.candidates)
+        print(f"{mode:<7} {time_per_query(scan, queries, args.repeats):8.2f} ms/query  "
+              f"{index.codes.nbytes / 2 ** 20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -78,7 +78,7 @@ class MockLLMResponder:
         self.responses = responses
         self.call_count = 0
     
-    def __call__(self, messages: List[Dict[str, str]]) -> str:
+    def __call__(self, messages: List[Dict[str, str]], **kwargs) -> str:
         if self.call_count < len(self.responses):
             response = self.responses[self.call_count]
             self.call_count += 1
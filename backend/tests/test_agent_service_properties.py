@@ -84,7 +84,7 @@ class MockLLMResponder:
         self.responses = responses
         self.call_count = 0
     
-    def __call__(self, messages: List[Dict[str, str]]) -> str:
+    def __call__(self, messages: List[Dict[str, str]], **kwargs) -> str:
         if self.call_count < len(self.responses):
             response = self.responses[self.call_count]
             self.call_count += 1
@@ -624,7 +624,7 @@ def test_complex_query_maintains_context_across_steps(
     # Track conversation history growth
     history_lengths = []
     
-    def tracking_call_llm(messages):
+    def tracking_call_llm(messages, **kwargs):
         history_lengths.append(len(messages))
         return mock_responder(messages)
     
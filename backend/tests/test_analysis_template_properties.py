@@ -213,3 +213,46 @@ def test_template_registry_unregister(template: AnalysisTemplate):
     
     # Verify it's no longer retrievable
     assert registry.get(template.name) is None, f"Template '{template.name}' still found after unregistration"
+
+
+def test_default_template_parsed_once():
+    """
+    get_default_template SHALL parse the default file once and return
+    independent copies of it.
+    """
+    from unittest.mock import patch
+    from app.agent.templates.registry import _load_default_template, get_default_template
+
+    _load_default_template.cache_clear()
+    with patch.object(AnalysisTemplate, "from_yaml", wraps=AnalysisTemplate.from_yaml) as from_yaml:
+        first = get_default_template()
+        first.dimensions.append("extra")
+        second = get_default_template()
+
+    assert from_yaml.call_count == 1
+    assert "extra" not in second.dimensions
+
+
+def test_load_from_directory_skips_invalid_files(tmp_path):
+    """
+    load_from_directory SHALL register every valid template file of the
+    directory and skip files that fail to load or have other suffixes.
+    """
+    templates = [
+        AnalysisTemplate(name=f"template_{i}", description=f"Template {i}", dimensions=["summary"])
+        for i in range(20)
+    ]
+    for i, template in enumerate(templates):
+        if i % 2:
+            (tmp_path / f"{template.name}.json").write_text(template.to_json(), encoding="utf-8")
+        else:
+            (tmp_path / f"{template.name}.yaml").write_text(template.to_yaml(), encoding="utf-8")
+    (tmp_path / "broken.yaml").write_text("name: [unclosed", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not a template", encoding="utf-8")
+
+    registry = TemplateRegistry()
+    loaded = registry.load_from_directory(str(tmp_path))
+
+    assert sorted(t.name for t in loaded) == sorted(t.name for t in templates)
+    for template in templates:
+        assert registry.get(template.name) == template
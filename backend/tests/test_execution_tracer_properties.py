@@ -207,6 +207,32 @@ def test_trace_format_compliance_multiple_spans(
         assert exported["runs"][i]["parent_run_id"] is not None, f"Run {i} should have parent"
 
 
+def test_langsmith_run_ids_are_uuids_unique_across_traces():
+    """
+    Exported run IDs and parent_run_ids SHALL be UUIDs that link parents to
+    children and never repeat between traces.
+    """
+    import uuid
+
+    exports = []
+    for _ in range(2):
+        tracer = ExecutionTracer()
+        parent = tracer.start_span("agent_run", {"query": "q"})
+        child = tracer.start_span("llm_call", {}, parent_id=parent)
+        tracer.end_span(child, {})
+        tracer.end_span(parent, {})
+        exports.append(tracer.export_langsmith())
+
+    for exported in exports:
+        root, child_run = exported["runs"]
+        assert uuid.UUID(root["id"]) and uuid.UUID(child_run["id"])
+        assert root["parent_run_id"] is None
+        assert child_run["parent_run_id"] == root["id"]
+
+    first_ids = {run["id"] for run in exports[0]["runs"]}
+    assert first_ids.isdisjoint(run["id"] for run in exports[1]["runs"])
+
+
 @settings(max_examples=100)
 @given(
     span_name=valid_span_name,
@@ -381,3 +407,47 @@ def test_latency_in_exported_trace(
     assert "extra" in exported, "Exported trace must have 'extra' field"
     assert "total_latency_ms" in exported["extra"], "Trace extra must have 'total_latency_ms'"
     assert exported["extra"]["total_latency_ms"] > 0, "total_latency_ms must be greater than 0"
+
+
+# =============================================================================
+# Context-Managed Spans
+# =============================================================================
+
+@settings(max_examples=50)
+@given(branch_names=st.lists(valid_span_name, min_size=1, max_size=4, unique=True))
+def test_trace_span_nesting_follows_context(branch_names: List[str]):
+    """
+    Spans opened with trace_span SHALL be parented to the enclosing span,
+    and concurrent asyncio tasks SHALL each nest under their own span.
+    """
+    import asyncio
+
+    tracer = ExecutionTracer()
+
+    async def branch(name: str) -> None:
+        with tracer.trace_span(name, branch=name) as span:
+            await asyncio.sleep(0)
+            with tracer.trace_span(f"{name}_tool_call"):
+                await asyncio.sleep(0)
+            span.outputs = {"done": name}
+
+    async def scenario() -> None:
+        with tracer.trace_span("agent_chat", query="q"):
+            await asyncio.gather(*[branch(name) for name in branch_names])
+
+    asyncio.run(scenario())
+
+    trace = tracer.get_trace()
+    by_id = {span.span_id: span for span in trace.spans}
+    root = trace.spans[0]
+
+    assert len(trace.spans) == 1 + 2 * len(branch_names)
+    assert root.name == "agent_chat" and root.parent_id is None
+    for span in trace.spans[1:]:
+        parent = by_id[span.parent_id]
+        if span.name.endswith("_tool_call"):
+            assert parent.name + "_tool_call" == span.name
+        else:
+            assert parent.span_id == root.span_id
+            assert span.outputs == {"done": span.name}
+        assert span.end_time is not None
@@ -10,6 +10,7 @@ Property-based tests for Hybrid Retriever.
 """
 
 from typing import Any, Dict, List
+import pytest
 from hypothesis import given, strategies as st, settings, assume
 import tempfile
 from pathlib import Path
@@ -553,3 +554,468 @@ def test_weight_setter_rejects_invalid_values(invalid_weight: float):
         assert False, f"Should have raised ValueError for weight {invalid_weight}"
     except ValueError:
         pass  # Expected
+
+
+# =============================================================================
+# BM25 Index Cache
+# =============================================================================
+
+def test_bm25_index_cached_until_store_changes():
+    """
+    The retriever SHALL load a document's BM25 index once and reuse it
+    across queries, reloading it when the stored index changes.
+    """
+    import os
+    import chromadb
+    from unittest.mock import patch
+    from app.agent.retrieval.bm25_store import BM25IndexStore
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BM25IndexStore(storage_path=Path(tmp_dir))
+        service = BM25Service()
+        service.build_index([
+            ChunkData(chunk_id="c1", text="bitcoin whitepaper peer to peer"),
+            ChunkData(chunk_id="c2", text="ethereum smart contracts"),
+            ChunkData(chunk_id="c3", text="proof of stake consensus"),
+            ChunkData(chunk_id="c4", text="layer two rollups"),
+        ])
+        store.save("doc1", service)
+
+        retriever = HybridRetriever(chroma_client=chromadb.Client(), bm25_store=store)
+
+        with patch.object(store, "load", wraps=store.load) as load_spy:
+            first = retriever._bm25_search("bitcoin", "doc1", k=5)
+            second = retriever._bm25_search("smart contracts", "doc1", k=5)
+            assert load_spy.call_count == 1
+            assert first[0].chunk_id == "c1"
+            assert second[0].chunk_id == "c2"
+
+            # Re-indexing the document changes the stored signature
+            service.build_index([
+                ChunkData(chunk_id="c5", text="bitcoin mining difficulty"),
+                ChunkData(chunk_id="c6", text="stablecoin reserves"),
+                ChunkData(chunk_id="c7", text="validator rewards"),
+            ])
+            store.save("doc1", service)
+            stat = os.stat(store.storage_path / "doc1.pkl")
+            os.utime(store.storage_path / "doc1.pkl", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+            third = retriever._bm25_search("bitcoin", "doc1", k=5)
+            assert load_spy.call_count == 2
+            assert [r.chunk_id for r in third] == ["c5"]
+
+        store.delete("doc1")
+        assert retriever._bm25_search("bitcoin", "doc1", k=5) == []
+
+
+def test_search_falls_back_to_bm25_when_vector_search_times_out():
+    """
+    The vector search SHALL run concurrently with the BM25 search, and a
+    vector search exceeding the timeout SHALL leave the BM25 results only.
+    """
+    import threading
+    import chromadb
+    from unittest.mock import patch
+    from app.agent.retrieval.bm25_store import BM25IndexStore
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BM25IndexStore(storage_path=Path(tmp_dir))
+        service = BM25Service()
+        service.build_index([
+            ChunkData(chunk_id="c1", text="bitcoin whitepaper peer to peer"),
+            ChunkData(chunk_id="c2", text="ethereum smart contracts"),
+            ChunkData(chunk_id="c3", text="proof of stake consensus"),
+        ])
+        store.save("doc1", service)
+
+        retriever = HybridRetriever(chroma_client=chromadb.Client(), bm25_store=store)
+        release = threading.Event()
+        vector_thread = []
+
+        def slow_vector_search(**kwargs):
+            vector_thread.append(threading.current_thread())
+            release.wait(5)
+            return [create_retrieval_result("v1", "vector only", {}, vector_score=0.9)]
+
+        with patch.object(retriever, "_vector_search", side_effect=slow_vector_search):
+            results = retriever.search("bitcoin", "doc1", "user1", [0.1, 0.2], k=5, timeout=0.05)
+            release.set()
+
+        assert [r.chunk_id for r in results] == ["c1"]
+        assert results[0].vector_score is None
+        assert vector_thread[0] is not threading.current_thread()
+
+
+def test_asearch_runs_off_the_event_loop():
+    """
+    Async searches SHALL run on worker threads and return the same results
+    as search().
+    """
+    import asyncio
+    import threading
+    import chromadb
+    from unittest.mock import patch
+    from app.agent.retrieval.bm25_store import BM25IndexStore
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BM25IndexStore(storage_path=Path(tmp_dir))
+        service = BM25Service()
+        service.build_index([
+            ChunkData(chunk_id="c1", text="bitcoin whitepaper peer to peer"),
+            ChunkData(chunk_id="c2", text="ethereum smart contracts"),
+            ChunkData(chunk_id="c3", text="proof of stake consensus"),
+        ])
+        store.save("doc1", service)
+
+        retriever = HybridRetriever(chroma_client=chromadb.Client(), bm25_store=store)
+        search_threads = []
+        search = retriever.search
+
+        def recording_search(*args, **kwargs):
+            search_threads.append(threading.current_thread())
+            return search(*args, **kwargs)
+
+        async def scenario():
+            with patch.object(retriever, "search", side_effect=recording_search):
+                return await asyncio.gather(
+                    retriever.asearch("bitcoin", "doc1", "user1", [0.1, 0.2], k=5),
+                    retriever.asearch("ethereum", "doc1", "user1", [0.1, 0.2], k=5),
+                )
+
+        bitcoin, ethereum = asyncio.run(scenario())
+
+        assert [r.chunk_id for r in bitcoin] == ["c1"]
+        assert [r.chunk_id for r in ethereum] == ["c2"]
+        assert threading.main_thread() not in search_threads
+
+
+def test_search_without_bm25_index_fetches_only_k_vector_results():
+    """
+    For a document without a BM25 index, the retriever SHALL skip BM25 and
+    fusion and fetch only k vector results.
+    """
+    import chromadb
+    from unittest.mock import patch
+    from app.agent.retrieval.bm25_store import BM25IndexStore
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        retriever = HybridRetriever(
+            chroma_client=chromadb.Client(),
+            bm25_store=BM25IndexStore(storage_path=Path(tmp_dir)),
+        )
+        vector_results = [create_retrieval_result("v1", "vector only", {}, vector_score=0.9)]
+
+        with patch.object(retriever, "_vector_search", return_value=vector_results) as vector_search, \
+                patch.object(retriever, "_bm25_search") as bm25_search:
+            results = retriever.search("bitcoin", "doc1", "user1", [0.1, 0.2], k=5)
+
+        assert results == vector_results
+        assert vector_search.call_args.kwargs["k"] == 5
+        bm25_search.assert_not_called()
+
+
+# =============================================================================
+# Batch Search
+# =============================================================================
+
+corpus_words = st.sampled_from(["bitcoin", "ledger", "proof", "work", "node", "block", "hash", "chain"])
+
+
+@settings(max_examples=100)
+@given(
+    texts=st.lists(st.lists(corpus_words, min_size=1, max_size=8).map(" ".join), min_size=1, max_size=12),
+    queries=st.lists(st.lists(corpus_words, min_size=0, max_size=4).map(" ".join), min_size=1, max_size=5),
+    k=st.integers(min_value=1, max_value=10),
+)
+def test_bm25_search_batch_matches_single_search(texts: List[str], queries: List[str], k: int):
+    """
+    Batch BM25 scoring SHALL return, for every query, the same ranking and
+    scores as scoring the query on its own.
+    """
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id=f"c{i}", text=text) for i, text in enumerate(texts)])
+
+    batch_results = service.search_batch(queries, k=k)
+
+    assert len(batch_results) == len(queries)
+    for query, batch in zip(queries, batch_results):
+        single = service.search(query, k=k)
+        assert [r.chunk_id for r in batch] == [r.chunk_id for r in single]
+        for batch_result, single_result in zip(batch, single):
+            assert batch_result.score == single_result.score
+
+
+# =============================================================================
+# Quantized Vector Search
+# =============================================================================
+
+@settings(max_examples=100)
+@given(
+    vectors=st.lists(
+        st.lists(st.floats(min_value=-1.0, max_value=1.0, allow_nan=False), min_size=8, max_size=8),
+        min_size=1,
+        max_size=10,
+    ),
+)
+def test_int8_quantization_error_is_bounded(vectors: List[List[float]]):
+    """
+    Int8 quantization SHALL reconstruct every component to within half a
+    quantization step of its original value.
+    """
+    import numpy as np
+    from app.agent.retrieval.quantization import quantize_int8
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    codes, scales = quantize_int8(matrix)
+
+    reconstructed = codes.astype(np.float32) * scales[:, None]
+    assert np.all(np.abs(reconstructed - matrix) <= scales[:, None] / 2 + 1e-6)
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_blocked_candidate_scan_matches_reference(mode: str):
+    """
+    Batched, blocked candidate selection SHALL return the same rows as a
+    direct scan of the dequantized (int8) or sign (binary) vectors.
+    """
+    import numpy as np
+    from app.agent.retrieval import quantization
+    from app.agent.retrieval.quantization import QuantizedIndex
+
+    rng = np.random.default_rng(3)
+    embeddings = rng.standard_normal((2 * quantization.SCAN_BLOCK_ROWS + 37, 24)).astype(np.float32)
+    queries = rng.standard_normal((3, 24)).astype(np.float32)
+    ids = [f"c{i}" for i in range(len(embeddings))]
+    index = QuantizedIndex.build(mode, ids, ids, [{} for _ in ids], embeddings)
+
+    batched = index.candidates_batch(queries, 10)
+
+    for query, rows in zip(queries, batched):
+        if mode == "int8":
+            dequantized = index.codes.astype(np.float64) * index.scales[:, None]
+            reference = ((dequantized - query) ** 2).sum(axis=1)
+        else:
+            reference = ((embeddings > 0) != (query > 0)).sum(axis=1)
+        assert np.allclose(reference[rows], np.sort(reference)[:10], rtol=1e-4)
+        assert np.array_equal(index.candidates(query, 10), rows)
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_vector_search_reranks_to_fp32_order(mode: str):
+    """
+    With enough re-rank candidates, quantized vector search SHALL return the
+    same chunks and scores as the float32 ChromaDB search.
+    """
+    import uuid
+    import random
+    import chromadb
+    from app.agent.retrieval.bm25_store import BM25IndexStore
+
+    rng = random.Random(7)
+    embeddings = [[rng.uniform(-1, 1) for _ in range(16)] for _ in range(30)]
+    query = [rng.uniform(-1, 1) for _ in range(16)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BM25IndexStore(storage_path=Path(tmp_dir))
+        service = BM25Service()
+        service.build_index([ChunkData(chunk_id=f"c{i}", text=f"chunk {i}") for i in range(30)])
+        store.save("doc1", service)
+
+        client = chromadb.Client()
+        collection_name = f"quant-{uuid.uuid4().hex[:8]}"
+        collection = client.get_or_create_collection(collection_name)
+        collection.add(
+            ids=[f"c{i}" for i in range(30)],
+            embeddings=embeddings,
+            documents=[f"chunk {i}" for i in range(30)],
+            metadatas=[{"user_id": "u1", "document_id": "doc1"} for _ in range(30)],
+        )
+
+        retriever = HybridRetriever(
+            chroma_client=client,
+            bm25_store=store,
+            collection_name=collection_name,
+            rerank_candidates=30,
+        )
+
+        exact = retriever._vector_search(query, "doc1", "u1", k=5)
+        quantized = retriever._vector_search(query, "doc1", "u1", k=5, quantization=mode)
+
+        assert [r.chunk_id for r in quantized] == [r.chunk_id for r in exact]
+        for q, e in zip(quantized, exact):
+            assert abs(q.vector_score - e.vector_score) < 1e-4
+
+
+@settings(max_examples=100)
+@given(
+    texts=st.lists(st.lists(corpus_words, min_size=1, max_size=8).map(" ".join), min_size=1, max_size=12),
+    query=st.lists(st.sampled_from(["bitcoin", "ledger", "proof", "unknown"]), min_size=1, max_size=5).map(" ".join),
+)
+def test_bm25_posting_scores_match_bm25okapi(texts: List[str], query: str):
+    """
+    Posting-based BM25 scoring SHALL produce the same scores as
+    BM25Okapi.get_scores for every chunk.
+    """
+    import numpy as np
+    from app.agent.retrieval.tokenizer import tokenize
+
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id=f"c{i}", text=text) for i, text in enumerate(texts)])
+    query_tokens = tokenize(query)
+
+    expected = service.get_index().get_scores(query_tokens)
+
+    assert np.array_equal(service._score(query_tokens), expected)
+
+
+@settings(max_examples=100)
+@given(
+    texts=st.lists(st.lists(corpus_words, min_size=1, max_size=8).map(" ".join), min_size=1, max_size=20),
+    query=st.lists(corpus_words, min_size=1, max_size=4).map(" ".join),
+    k=st.integers(min_value=1, max_value=25),
+)
+def test_bm25_search_returns_stable_top_k(texts: List[str], query: str, k: int):
+    """
+    BM25 search SHALL return the k best-scoring chunks above the threshold,
+    in the order of a stable descending sort of all scores.
+    """
+    from app.agent.retrieval.tokenizer import tokenize
+
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id=f"c{i}", text=text) for i, text in enumerate(texts)])
+    scores = service.get_index().get_scores(tokenize(query))
+
+    expected = sorted(
+        (i for i, score in enumerate(scores) if score > 0.0),
+        key=lambda i: scores[i],
+        reverse=True,
+    )[:k]
+
+    assert [r.chunk_id for r in service.search(query, k=k)] == [f"c{i}" for i in expected]
+
+
+@settings(max_examples=100, deadline=None)
+@given(
+    rare=st.lists(st.sampled_from(["satoshi", "nakamoto", "timestamp"]), min_size=1, max_size=6),
+    query=st.lists(st.sampled_from(["satoshi", "nakamoto", "bitcoin", "w5", "w6"]), min_size=2, max_size=5).map(" ".join),
+    k=st.integers(min_value=1, max_value=5),
+)
+def test_bm25_max_score_pruning_keeps_exact_top_k(rare: List[str], query: str, k: int):
+    """
+    MaxScore pruning SHALL return the same chunks, order and scores as
+    scoring every chunk.
+    """
+    from unittest.mock import patch
+    from app.agent.retrieval import bm25_service as bm25_module
+
+    texts = [f"w{i} w{i + 1} bitcoin" for i in range(40)] + [f"{word} bitcoin" for word in rare]
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id=f"c{i}", text=text) for i, text in enumerate(texts)])
+    expected = service.search(query, k=k)
+
+    with patch.object(bm25_module, "MAX_SCORE_MIN_CHUNKS", 0):
+        pruned = service.search(query, k=k)
+
+    assert [(r.chunk_id, r.score) for r in pruned] == [(r.chunk_id, r.score) for r in expected]
+
+
+def test_bm25_max_score_pruning_skips_unreachable_chunks():
+    """
+    With rare query terms, MaxScore pruning SHALL score only the chunks
+    that can still reach the top k.
+    """
+    from unittest.mock import patch
+    import numpy as np
+    from app.agent.retrieval import bm25_service as bm25_module
+
+    texts = [f"w{i} w{i + 1} bitcoin" for i in range(40)] + ["satoshi bitcoin", "nakamoto bitcoin"]
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id=f"c{i}", text=text) for i, text in enumerate(texts)])
+
+    with patch.object(bm25_module, "MAX_SCORE_MIN_CHUNKS", 0):
+        scores = service._score_top_k(["satoshi", "nakamoto", "bitcoin", "w5"], k=1)
+
+    assert np.isfinite(scores).sum() == 2
+    assert service.search("satoshi nakamoto bitcoin w5", k=1)[0].chunk_id == "c40"
+
+
+def test_bm25_repeated_queries_reuse_tokenizer_cache():
+    """
+    Repeated queries SHALL reuse the tokenizer's memo, and clear() SHALL
+    leave an empty service that can be rebuilt.
+    """
+    from app.agent.retrieval.tokenizer import _tokenize_cached
+
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id="c0", text="bitcoin proof of work")])
+
+    first = service.search("bitcoin work", k=1)
+    hits = _tokenize_cached.cache_info().hits
+    service.get_top_n("bitcoin work", n=1)
+    assert _tokenize_cached.cache_info().hits == hits + 1
+    assert service.search("bitcoin work", k=1) == first
+
+    service.clear()
+    assert not service.is_indexed
+    service.build_index([
+        ChunkData(chunk_id="c1", text="bitcoin proof of work"),
+        ChunkData(chunk_id="c2", text="ethereum proof of stake"),
+        ChunkData(chunk_id="c3", text="solana proof of history"),
+    ])
+    assert service.search("bitcoin work", k=1)[0].chunk_id == "c1"
+
+
+def test_bm25_corpus_getters_copy_on_request():
+    """
+    Corpus getters SHALL return the service's own lists unless a copy is
+    requested.
+    """
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id="c0", text="bitcoin proof of work")])
+
+    assert service.get_chunks() is service.get_chunks()
+    assert service.get_tokenized_corpus() is service.get_tokenized_corpus()
+
+    chunks = service.get_chunks(copy=True)
+    chunks.clear()
+    tokens = service.get_tokenized_corpus(copy=True)
+    tokens.clear()
+    assert service.chunk_count == 1
+    assert service.get_tokenized_corpus() == [["bitcoin", "proof", "of", "work"]]
+
+
+@settings(max_examples=50)
+@given(texts=st.lists(st.lists(corpus_words, min_size=0, max_size=8).map(" ".join), min_size=1, max_size=12))
+def test_bm25_corpus_kept_as_term_ids(texts: List[str]):
+    """
+    The BM25 index SHALL keep its corpus as int32 term ids that decode to
+    the tokenizer's output.
+    """
+    import numpy as np
+    from app.agent.retrieval.tokenizer import tokenize
+
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id=f"c{i}", text=text) for i, text in enumerate(texts)])
+
+    assert service._token_ids.dtype == np.int32
+    assert service._tokenized_corpus == []
+    assert service.get_tokenized_corpus() == [tokenize(text) for text in texts]
+
+
+@settings(max_examples=100, deadline=None)
+@given(
+    texts=st.lists(st.lists(corpus_words, min_size=1, max_size=8).map(" ".join), min_size=1, max_size=20),
+    term=corpus_words,
+    k=st.integers(min_value=1, max_value=10),
+)
+def test_bm25_single_term_search_matches_full_scoring(texts: List[str], term: str, k: int):
+    """
+    Single-term queries, answered from the term's postings alone, SHALL
+    return the same chunks, order and scores as full scoring.
+    """
+    service = BM25Service()
+    service.build_index([ChunkData(chunk_id=f"c{i}", text=text) for i, text in enumerate(texts)])
+
+    expected = service._build_results(service._score([term]), k, 0.0)
+
+    assert service.search(term, k=k) == expected
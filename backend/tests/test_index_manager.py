@@ -52,13 +52,16 @@ class MockVectorCollection:
                 "metadata": metadatas[i],
             }
     
-    def delete(self, where: Dict[str, Any]) -> None:
+    def delete(self, ids: List[str] = None, where: Dict[str, Any] = None) -> None:
         self.delete_called = True
         if self.fail_on_delete:
             raise RuntimeError("Simulated vector store delete failure")
         
+        for doc_id in ids or []:
+            self.documents.pop(doc_id, None)
+        
         # Extract document_id from where clause
-        if "$and" in where:
+        if where and "$and" in where:
             for condition in where["$and"]:
                 if "document_id" in condition:
                     doc_id_prefix = condition["document_id"]["$eq"]
@@ -202,6 +205,53 @@ class TestIndexDocument:
         
         # Vector store should have been rolled back (delete called)
         assert mock_vector_collection.delete_called
+        assert "chunk1" not in mock_vector_collection.documents
+    
+    def test_rollback_keeps_previously_indexed_chunks(self, mock_vector_collection, temp_bm25_dir):
+        """Rollback deletes only the chunks added by the failed request."""
+        bm25_store = BM25IndexStore(storage_path=temp_bm25_dir)
+        manager = IndexManager(
+            vector_collection=mock_vector_collection,
+            bm25_store=bm25_store,
+        )
+        mock_vector_collection.documents["old_chunk"] = {
+            "document": "Earlier text",
+            "embedding": [0.5, 0.5],
+            "metadata": {"document_id": "doc123", "user_id": "user456"},
+        }
+        
+        request = IndexDocumentRequest(
+            document_id="doc123",
+            user_id="user456",
+            chunk_ids=["chunk1"],
+            texts=["Hello world"],
+            embeddings=[[0.1, 0.2]],
+        )
+        with patch.object(bm25_store, 'save', side_effect=RuntimeError("BM25 save failed")):
+            result = manager.index_document(request)
+        
+        assert result.success is False
+        assert list(mock_vector_collection.documents) == ["old_chunk"]
+    
+    def test_embeddings_stored_as_float32_array(self, index_manager, mock_vector_collection):
+        """List embeddings become one float32 array passed to the store as is."""
+        import numpy as np
+        
+        request = IndexDocumentRequest(
+            document_id="doc123",
+            user_id="user456",
+            chunk_ids=["chunk1", "chunk2"],
+            texts=["Hello world", "Goodbye world"],
+            embeddings=[[0.1, 0.2], [0.3, 0.4]],
+        )
+        assert request.embeddings.dtype == np.float32
+        assert request.embeddings.shape == (2, 2)
+        
+        with patch.object(
+            mock_vector_collection, "add", wraps=mock_vector_collection.add
+        ) as add:
+            assert index_manager.index_document(request).success is True
+        assert add.call_args.kwargs["embeddings"] is request.embeddings
     
     def test_metadata_preparation(self, index_manager, mock_vector_collection):
         """Test that metadata is properly prepared with user_id and document_id."""
@@ -223,6 +273,219 @@ class TestIndexDocument:
         assert stored_doc["metadata"]["user_id"] == "user456"
         assert stored_doc["metadata"]["document_id"] == "doc123"
         assert stored_doc["metadata"]["custom_field"] == "value"
+    
+    def test_metadata_copied_unless_handed_over(self, index_manager, mock_vector_collection):
+        """Caller metadata is left alone by default and updated in place on opt-out."""
+        for copy_metadata in (True, False):
+            metadata = {"custom_field": "value"}
+            request = IndexDocumentRequest(
+                document_id=f"doc_{copy_metadata}",
+                user_id="user456",
+                chunk_ids=[f"chunk_{copy_metadata}_1", f"chunk_{copy_metadata}_2"],
+                texts=["Hello world", "Goodbye world"],
+                embeddings=[[0.1, 0.2], [0.3, 0.4]],
+                metadatas=[metadata],
+                copy_metadata=copy_metadata,
+            )
+            
+            assert index_manager.index_document(request).success is True
+            
+            stored = mock_vector_collection.documents[f"chunk_{copy_metadata}_2"]["metadata"]
+            assert stored == {"user_id": "user456", "document_id": f"doc_{copy_metadata}"}
+            if copy_metadata:
+                assert metadata == {"custom_field": "value"}
+            else:
+                assert metadata["document_id"] == "doc_False"
+
+
+class TestIndexDocumentsBatched:
+    """Tests for index_documents_batched method."""
+    
+    def _requests(self, count: int, chunks_per_doc: int = 3) -> List[IndexDocumentRequest]:
+        return [
+            IndexDocumentRequest(
+                document_id=f"doc{d}",
+                user_id="user456",
+                chunk_ids=[f"doc{d}_chunk{c}" for c in range(chunks_per_doc)],
+                texts=[f"document {d} chunk {c} text" for c in range(chunks_per_doc)],
+                embeddings=[[0.1 * d, 0.1 * c] for c in range(chunks_per_doc)],
+            )
+            for d in range(count)
+        ]
+    
+    def test_chunks_added_in_batches(self, index_manager, mock_vector_collection, bm25_store):
+        """Chunks from all documents are added batch_size at a time."""
+        with patch.object(
+            mock_vector_collection, "add", wraps=mock_vector_collection.add
+        ) as add:
+            results = index_manager.index_documents_batched(self._requests(5), batch_size=4)
+        
+        assert [len(call.kwargs["ids"]) for call in add.call_args_list] == [4, 4, 4, 3]
+        assert all(r.success and r.vector_indexed and r.bm25_indexed for r in results)
+        assert [r.document_id for r in results] == [f"doc{d}" for d in range(5)]
+        assert len(mock_vector_collection.documents) == 15
+        assert all(bm25_store.exists(f"doc{d}") for d in range(5))
+        assert mock_vector_collection.documents["doc2_chunk1"]["metadata"]["document_id"] == "doc2"
+    
+    def test_failed_batch_rolls_back_its_documents(self, index_manager, mock_vector_collection, bm25_store):
+        """Documents with chunks in a failed batch are rolled back; others succeed."""
+        real_add = mock_vector_collection.add
+        calls = []
+        
+        def add(**kwargs):
+            calls.append(kwargs["ids"])
+            if len(calls) == 2:
+                raise RuntimeError("Simulated batch failure")
+            real_add(**kwargs)
+        
+        with patch.object(mock_vector_collection, "add", side_effect=add):
+            results = index_manager.index_documents_batched(self._requests(4), batch_size=4)
+        
+        # Batches: doc0+doc1[0], doc1[1:]+doc2[:2] (fails), doc2[2]+doc3
+        assert [r.success for r in results] == [True, False, False, True]
+        assert "Vector store indexing failed" in results[1].error
+        assert not results[2].vector_indexed
+        assert not bm25_store.exists("doc1")
+        assert not any(
+            v["metadata"]["document_id"] in ("doc1", "doc2")
+            for v in mock_vector_collection.documents.values()
+        )
+        assert bm25_store.exists("doc3")
+    
+    def test_empty_request_reported_without_blocking_others(self, index_manager):
+        """A request with no texts fails on its own."""
+        requests = self._requests(1)
+        requests.append(IndexDocumentRequest(
+            document_id="empty",
+            user_id="user456",
+            chunk_ids=[],
+            texts=[],
+            embeddings=[],
+        ))
+        
+        results = index_manager.index_documents_batched(requests)
+        
+        assert results[0].success is True
+        assert results[1].success is False
+        assert results[1].error == "No texts provided for indexing"
+    
+    def test_mismatched_request_fails_without_shifting_others(
+        self, index_manager, mock_vector_collection, bm25_store
+    ):
+        """A request whose ids, texts and embeddings disagree fails on its own."""
+        requests = [
+            IndexDocumentRequest(
+                document_id="a",
+                user_id="user456",
+                chunk_ids=["a1", "a2"],
+                texts=["alpha one", "alpha two"],
+                embeddings=[[1.0, 0.0]],
+            ),
+            IndexDocumentRequest(
+                document_id="b",
+                user_id="user456",
+                chunk_ids=["b1"],
+                texts=["beta one"],
+                embeddings=[[0.0, 1.0], [0.5, 0.5]],
+            ),
+            IndexDocumentRequest(
+                document_id="c",
+                user_id="user456",
+                chunk_ids=["c1"],
+                texts=["gamma one"],
+                embeddings=[[0.3, 0.7]],
+            ),
+        ]
+        
+        results = index_manager.index_documents_batched(requests)
+        
+        assert [r.success for r in results] == [False, False, True]
+        assert "Mismatched chunk counts" in results[0].error
+        assert "Mismatched chunk counts" in results[1].error
+        assert set(mock_vector_collection.documents) == {"c1"}
+        assert list(mock_vector_collection.documents["c1"]["embedding"]) == pytest.approx([0.3, 0.7])
+        assert not bm25_store.exists("a") and not bm25_store.exists("b")
+
+
+class TestIndexDocuments:
+    """Tests for index_documents method."""
+    
+    def test_indexes_each_document_in_order(self, index_manager, mock_vector_collection, bm25_store):
+        """Results come back in request order, one per document."""
+        requests = [
+            IndexDocumentRequest(
+                document_id=f"doc{d}",
+                user_id="user456",
+                chunk_ids=[f"doc{d}_chunk0"],
+                texts=[f"document number {d}"],
+                embeddings=[[0.1, 0.2]],
+            )
+            for d in range(6)
+        ]
+        requests[3].texts = []
+        
+        results = index_manager.index_documents(requests, max_workers=3)
+        
+        assert [r.document_id for r in results] == [f"doc{d}" for d in range(6)]
+        assert [r.success for r in results] == [True, True, True, False, True, True]
+        assert results[3].error == "No texts provided for indexing"
+        assert all(bm25_store.exists(f"doc{d}") for d in (0, 1, 2, 4, 5))
+        assert len(mock_vector_collection.documents) == 5
+
+
+class TestIndexWithExecutor:
+    """Tests for building BM25 indexes in a process pool."""
+    
+    def test_process_pool_builds_same_index(self, mock_vector_collection, temp_bm25_dir):
+        """Indexes built in worker processes score like ones built in-process."""
+        from concurrent.futures import ProcessPoolExecutor
+        
+        texts = [
+            "Bitcoin uses proof of work",
+            "Ethereum moved to proof of stake",
+            "比特币使用工作量证明",
+            "Merkle trees summarize transactions",
+        ]
+        requests = [
+            IndexDocumentRequest(
+                document_id=document_id,
+                user_id="user456",
+                chunk_ids=[f"{document_id}_{i}" for i in range(len(texts))],
+                texts=texts,
+                embeddings=[[0.1, 0.2]] * len(texts),
+            )
+            for document_id in ("pooled", "pooled_batch")
+        ]
+        
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            manager = IndexManager(
+                vector_collection=mock_vector_collection,
+                bm25_store=BM25IndexStore(storage_path=temp_bm25_dir),
+                executor=executor,
+            )
+            assert manager.index_document(requests[0]).success is True
+            assert manager.index_documents_batched(requests[1:])[0].success is True
+        
+        reference = IndexManager(
+            vector_collection=MockVectorCollection(),
+            bm25_store=BM25IndexStore(storage_path=temp_bm25_dir),
+        )
+        reference.index_document(IndexDocumentRequest(
+            document_id="local",
+            user_id="user456",
+            chunk_ids=[f"local_{i}" for i in range(len(texts))],
+            texts=texts,
+            embeddings=[[0.1, 0.2]] * len(texts),
+        ))
+        
+        store = BM25IndexStore(storage_path=temp_bm25_dir)
+        expected = [
+            (r.chunk_id.split("_")[-1], r.score)
+            for r in store.load("local").search("proof of work")
+        ]
+        for document_id in ("pooled", "pooled_batch"):
+            results = store.load(document_id).search("proof of work")
+            assert [(r.chunk_id.split("_")[-1], r.score) for r in results] == expected
 
 
 class TestDeleteDocument:
@@ -308,3 +571,166 @@ class TestCheckConsistency:
         result = index_manager.check_consistency("nonexistent")
         
         assert result["bm25_exists"] is False
+
+
+class TestBM25Persistence:
+    """Tests for the memory-mapped BM25 postings file."""
+    
+    def _build_service(self):
+        from app.agent.retrieval import BM25Service, ChunkData
+        
+        service = BM25Service()
+        service.build_index([
+            ChunkData(chunk_id=f"c{i}", text=text)
+            for i, text in enumerate([
+                "Bitcoin uses proof of work",
+                "Ethereum moved to proof of stake",
+                "Bitcoin blocks are mined every ten minutes",
+            ])
+        ])
+        return service
+    
+    def test_round_trip_scores_from_mapped_postings(self, bm25_store, temp_bm25_dir):
+        """A loaded index scores identically without rebuilding BM25Okapi."""
+        service = self._build_service()
+        bm25_store.save("doc123", service)
+        
+        assert (Path(temp_bm25_dir) / "doc123.postings").exists()
+        
+        loaded = bm25_store.load("doc123")
+        
+        assert loaded._index is None
+        assert loaded.is_indexed
+        for query in ["bitcoin proof", "stake", "unknown"]:
+            expected = [(r.chunk_id, r.score) for r in service.search(query, k=3)]
+            assert [(r.chunk_id, r.score) for r in loaded.search(query, k=3)] == expected
+        assert loaded.get_tokenized_corpus() == service.get_tokenized_corpus()
+    
+    def test_stale_postings_fall_back_to_rebuild(self, bm25_store, temp_bm25_dir):
+        """Postings written for other index data are ignored."""
+        service = self._build_service()
+        bm25_store.save("doc123", service)
+        stale = (Path(temp_bm25_dir) / "doc123.postings").read_bytes()
+        bm25_store.save("doc123", service)
+        (Path(temp_bm25_dir) / "doc123.postings").write_bytes(stale)
+        
+        loaded = bm25_store.load("doc123")
+        
+        # Rebuilt postings are ordinary arrays, not views of the mapped file
+        assert loaded.get_postings().weights.flags.writeable
+        expected = [(r.chunk_id, r.score) for r in service.search("bitcoin", k=3)]
+        assert [(r.chunk_id, r.score) for r in loaded.search("bitcoin", k=3)] == expected
+    
+    def test_delete_removes_postings(self, bm25_store, temp_bm25_dir):
+        """Deleting an index also deletes its postings file."""
+        bm25_store.save("doc123", self._build_service())
+        
+        assert bm25_store.delete("doc123") is True
+        assert not (Path(temp_bm25_dir) / "doc123.postings").exists()
+    
+    def test_loads_chunks_pickled_without_slots(self):
+        """Chunks pickled before ChunkData had slots still load."""
+        import pickle
+        from app.agent.retrieval import ChunkData
+        
+        class _DictStateChunk:
+            def __reduce__(self):
+                state = {"chunk_id": "c0", "text": "hello", "metadata": {"page": 1}}
+                return ChunkData.__new__, (ChunkData,), state
+        
+        chunk = pickle.loads(pickle.dumps(_DictStateChunk()))
+        
+        assert chunk == ChunkData(chunk_id="c0", text="hello", metadata={"page": 1})
+    
+    def test_save_replaces_files_atomically(self, bm25_store, temp_bm25_dir):
+        """Saving writes through temporary files and leaves none behind."""
+        bm25_store.save("doc123", self._build_service())
+        bm25_store.save("doc123", self._build_service())
+        
+        assert sorted(p.name for p in Path(temp_bm25_dir).iterdir()) == ["doc123.pkl", "doc123.postings"]
+        assert bm25_store.list_indexes() == ["doc123"]
+    
+    def test_load_many(self, bm25_store):
+        """Several indexes load in one call; missing documents map to None."""
+        service = self._build_service()
+        bm25_store.save("doc1", service)
+        bm25_store.save("doc2", service)
+        
+        loaded = bm25_store.load_many(["doc1", "missing", "doc2", "doc1"])
+        
+        assert list(loaded) == ["doc1", "missing", "doc2"]
+        assert loaded["missing"] is None
+        for document_id in ("doc1", "doc2"):
+            assert [r.chunk_id for r in loaded[document_id].search("bitcoin", k=3)] == \
+                [r.chunk_id for r in service.search("bitcoin", k=3)]
+    
+    def test_index_file_is_versioned_json(self, bm25_store, temp_bm25_dir):
+        """Index files start with the format version and hold no pickle."""
+        from app.agent.retrieval.bm25_store import INDEX_FORMAT_VERSION
+        
+        bm25_store.save("doc123", self._build_service())
+        raw = (Path(temp_bm25_dir) / "doc123.pkl").read_bytes()
+        
+        assert raw[0] == INDEX_FORMAT_VERSION
+        assert b"Bitcoin uses proof of work" in raw
+    
+    def test_loads_pickled_index_files(self, bm25_store, temp_bm25_dir):
+        """Index files written as pickles (format version 1) still load."""
+        import pickle
+        from app.agent.retrieval.bm25_store import BM25IndexData
+        
+        service = self._build_service()
+        
+        class _LegacyIndexData:
+            # Dict state of the pre-slots class, which had no postings_token
+            def __reduce__(self):
+                state = {
+                    "document_id": "doc123",
+                    "chunks": service.get_chunks(),
+                    "tokenized_corpus": service.get_tokenized_corpus(),
+                }
+                return BM25IndexData.__new__, (BM25IndexData,), state
+        
+        with open(Path(temp_bm25_dir) / "doc123.pkl", "wb") as f:
+            pickle.dump(_LegacyIndexData(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        loaded = bm25_store.load("doc123")
+        
+        expected = [(r.chunk_id, r.score) for r in service.search("bitcoin proof", k=3)]
+        assert [(r.chunk_id, r.score) for r in loaded.search("bitcoin proof", k=3)] == expected
+    
+    def test_save_async_writes_latest_index_on_flush(self, bm25_store):
+        """Queued indexes are written once, with their latest version."""
+        from unittest.mock import patch
+        from app.agent.retrieval import BM25Service, ChunkData
+        
+        first = self._build_service()
+        latest = BM25Service()
+        latest.build_index([
+            ChunkData(chunk_id="n1", text="bitcoin halving schedule"),
+            ChunkData(chunk_id="n2", text="ethereum gas fees"),
+            ChunkData(chunk_id="n3", text="stablecoin reserves"),
+        ])
+        
+        with patch.object(bm25_store, "save", wraps=bm25_store.save) as save_spy:
+            bm25_store.save_async("doc123", first)
+            bm25_store.save_async("doc123", latest)
+            bm25_store.save_async("doc456", first)
+            bm25_store.flush()
+            
+            assert save_spy.call_count == 2
+        
+        assert [r.chunk_id for r in bm25_store.load("doc123").search("bitcoin", k=3)] == ["n1"]
+        assert bm25_store.exists("doc456")
+        
+        bm25_store.close()
+        with pytest.raises(RuntimeError):
+            bm25_store.save_async("doc789", first)
+    
+    def test_delete_drops_queued_save(self, bm25_store):
+        """Deleting a document cancels its pending asynchronous save."""
+        bm25_store.save_async("doc123", self._build_service())
+        bm25_store.delete("doc123")
+        bm25_store.close()
+        
+        assert not bm25_store.exists("doc123")
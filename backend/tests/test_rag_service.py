@@ -2,14 +2,18 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
 from app.services.cache_service import CacheService
 from app.services.rag_service import RAGService
 from .test_cache_service import FakeRedis  # reuse stub
 
 
-def test_query_returns_fallback_and_caches(monkeypatch):
+def test_query_returns_fallback_and_caches(monkeypatch, tmp_path):
     cache = CacheService(redis_client=FakeRedis())
-    service = RAGService(cache=cache)
+    chroma = chromadb.PersistentClient(path=str(tmp_path), settings=ChromaSettings(anonymized_telemetry=False))
+    service = RAGService(chroma_client=chroma, cache=cache)
 
     def fake_get_relevant_chunks(*args, **kwargs):
         return []
@@ -13,12 +13,12 @@ Property-based tests for ReAct Agent.
 import asyncio
 import json
 from typing import Any, Dict, List
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from hypothesis import given, strategies as st, settings, assume, HealthCheck
 
-from app.agent.types import Tool, ToolSchema, ThoughtStep
+from app.agent.types import AgentStreamEvent, Tool, ToolSchema, ThoughtStep
 from app.agent.tools.registry import ToolRegistry
 from app.agent.react_agent import ReActAgent, DEFAULT_MAX_STEPS
 
@@ -94,7 +94,7 @@ class MockLLMResponder:
         self.responses = responses
         self.call_count = 0
     
-    def __call__(self, messages: List[Dict[str, str]]) -> str:
+    def __call__(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Return the next response in sequence."""
         if self.call_count < len(self.responses):
             response = self.responses[self.call_count]
@@ -311,7 +311,7 @@ def test_state_preservation_across_steps(
     conversation_histories = []
     original_call_llm = agent._call_llm
     
-    def tracking_call_llm(messages):
+    def tracking_call_llm(messages, **kwargs):
         conversation_histories.append(messages.copy())
         return mock_responder(messages)
     
@@ -507,10 +507,10 @@ def test_final_answer_synthesis_on_step_limit(
     synthesis_called = False
     original_synthesize = agent._synthesize_final_answer
     
-    def tracking_synthesize(*args, **kwargs):
+    async def tracking_synthesize(*args, **kwargs):
         nonlocal synthesis_called
         synthesis_called = True
-        return original_synthesize(*args, **kwargs)
+        return await original_synthesize(*args, **kwargs)
     
     with patch.object(agent, '_call_llm', side_effect=mock_responder):
         with patch.object(agent, '_synthesize_final_answer', side_effect=tracking_synthesize):
@@ -842,3 +842,734 @@ def test_agent_handles_immediate_final_answer(
     assert len(response.intermediate_steps) == 1
     assert response.intermediate_steps[0].action is None
     assert response.answer == "Direct answer without tool use."
+
+
+def test_agent_runs_independent_actions_concurrently():
+    """
+    Test that actions listed together in one step run concurrently and that
+    their observations are recorded in action order.
+    """
+    import threading
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    def make_tool(name: str) -> Tool:
+        def handler(**kwargs: Any) -> Any:
+            # Both handlers must be running at the same time to pass the barrier
+            barrier.wait()
+            return f"result from {name}"
+
+        return Tool(
+            schema=ToolSchema(name=name, description=f"{name} tool"),
+            handler=handler,
+        )
+
+    registry = ToolRegistry()
+    registry.register(make_tool("search_a"))
+    registry.register(make_tool("search_b"))
+
+    responses = [
+        json.dumps({
+            "thought": "Search both sources",
+            "actions": [
+                {"name": "search_a", "input": {"query": "a"}},
+                {"name": "search_b", "input": {"query": "b"}},
+            ],
+            "final_answer": None,
+        }),
+        create_llm_response(thought="Done", final_answer="Combined answer."),
+    ]
+
+    agent = ReActAgent(tool_registry=registry, router=None, max_steps=5)
+
+    with patch.object(agent, '_call_llm', side_effect=MockLLMResponder(responses)):
+        response = asyncio.run(agent.run(query="compare a and b", user_id="user"))
+
+    tool_steps = [step for step in response.intermediate_steps if step.action]
+    assert [step.action for step in tool_steps] == ["search_a", "search_b"]
+    assert [step.observation for step in tool_steps] == [
+        "result from search_a",
+        "result from search_b",
+    ]
+    assert response.answer == "Combined answer."
+
+
+def test_concurrent_runs_overlap_llm_calls():
+    """
+    Test that LLM calls are awaited without blocking the event loop, so
+    concurrent agent runs overlap their LLM round trips.
+    """
+    import time
+
+    registry = create_registry_with_tools()
+
+    async def slow_llm(messages: List[Dict[str, str]], structured: bool = True, user_id=None) -> str:
+        await asyncio.sleep(0.2)
+        return create_llm_response(thought="Answer directly", final_answer="done")
+
+    async def scenario() -> float:
+        agents = [ReActAgent(tool_registry=registry, router=None, max_steps=3) for _ in range(3)]
+        started = time.perf_counter()
+        with patch.object(ReActAgent, '_call_llm', side_effect=slow_llm):
+            responses = await asyncio.gather(*[agent.run(query="q", user_id="user") for agent in agents])
+        assert all(response.answer == "done" for response in responses)
+        return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) < 0.5
+
+def test_stream_reports_detached_tool_progress():
+    """
+    Test that tools dispatched in the background are reported when dispatched
+    and when their awaited result arrives.
+    """
+    registry = create_registry_with_tools()
+
+    async def collect_events() -> List[Any]:
+        agent = ReActAgent(tool_registry=registry, router=None, max_steps=5)
+        responses = [
+            json.dumps({
+                "thought": "Start a background search",
+                "dispatch_async": [{"name": "document_search", "input": {"query": "q", "document_id": "doc"}}],
+            }),
+        ]
+        responder = MockLLMResponder(responses)
+
+        def call_llm(messages: List[Dict[str, str]], **kwargs) -> str:
+            if responder.call_count == 1:
+                # The dispatch observation tells the model which task id to await
+                task_id = messages[-1]["content"].split("task '")[1].split("'")[0]
+                responder.responses.append(json.dumps({"thought": "Collect it", "await": [task_id]}))
+            return responder(messages)
+
+        with patch.object(agent, '_call_llm', side_effect=call_llm):
+            return [event async for event in agent.stream(query="q", user_id="user")]
+
+    events = asyncio.run(collect_events())
+
+    dispatched = [e for e in events if e.event_type == "tool_call" and "task_id" in (e.metadata or {})]
+    completed = [e for e in events if e.event_type == "tool_result" and "task_id" in (e.metadata or {})]
+    assert len(dispatched) == 1
+    assert len(completed) == 1
+    assert completed[0].metadata["task_id"] == dispatched[0].metadata["task_id"]
+    assert "Test content" in completed[0].content
+    assert events[-1].event_type == "answer"
+    assert len(registry._detached) == 0
+
+
+
+def test_stream_bytes_encodes_stream_events_as_sse_frames():
+    """
+    Test that stream_bytes yields one SSE frame per stream event, carrying
+    the same payload, followed by the done frame.
+    """
+    registry = create_registry_with_tools()
+    responses = [
+        create_llm_response(
+            thought="Search the document",
+            action="document_search",
+            action_input={"query": "q", "document_id": "doc"},
+        ),
+        create_llm_response(thought="Done", final_answer="答案 with {braces}"),
+    ]
+
+    async def collect(method: str) -> List[Any]:
+        agent = ReActAgent(tool_registry=registry, router=None, max_steps=5)
+        with patch.object(agent, '_call_llm', side_effect=MockLLMResponder(list(responses))):
+            if method == "stream":
+                return [event async for event in agent.stream(query="q", user_id="user")]
+            return [frame async for frame in agent.stream_bytes(query="q", user_id="user", include_metadata=True)]
+
+    events = asyncio.run(collect("stream"))
+    frames = asyncio.run(collect("stream_bytes"))
+
+    assert all(isinstance(frame, bytes) and frame.startswith(b"data: ") and frame.endswith(b"\n\n") for frame in frames)
+    payloads = [json.loads(frame[len(b"data: "):].decode("utf-8")) for frame in frames]
+    assert payloads[-1] == {"event_type": "done"}
+    assert [(p["event_type"], p["content"]) for p in payloads[:-1]] == [(e.event_type, e.content) for e in events]
+    assert payloads[-2]["content"] == "答案 with {braces}"
+
+
+def test_sse_frames_encode_values_orjson_rejects():
+    """
+    Test that metadata orjson cannot serialize (numpy scalars, integers
+    beyond 64 bits) still encodes instead of ending the stream.
+    """
+    import numpy as np
+    from app.agent.streaming import encode_sse_event
+
+    event = AgentStreamEvent(
+        event_type="answer",
+        content="done",
+        metadata={"score": np.float64(0.25), "big": 2 ** 70},
+    )
+
+    frame = encode_sse_event(event)
+
+    payload = json.loads(frame[len(b"data: "):].decode("utf-8"))
+    assert payload["metadata"] == {"score": 0.25, "big": 2 ** 70}
+
+# =============================================================================
+# Prompt Prefix Stability
+# =============================================================================
+
+@settings(max_examples=50, suppress_health_check=[HealthCheck.too_slow])
+@given(
+    query=valid_query,
+    user_id=valid_id,
+)
+def test_system_prompt_is_independent_of_date_and_query(
+    query: str,
+    user_id: str,
+):
+    """
+    Test that the system message is byte-identical across dates and queries,
+    with the current date carried by the trailing user message.
+    """
+    from app.agent import react_agent as react_agent_module
+
+    registry = create_registry_with_tools()
+    agent = ReActAgent(tool_registry=registry, router=None)
+    tools_description = agent._build_tools_description()
+
+    with patch.object(react_agent_module, "_today_str", side_effect=["2024-01-01", "2024-01-02"]):
+        first = agent._build_initial_history(query, tools_description, user_id)
+        second = agent._build_initial_history("another question", tools_description, user_id)
+
+    assert first[0]["role"] == "system"
+    assert first[0]["content"] == second[0]["content"]
+    assert "2024-01-01" not in first[0]["content"]
+    assert first[-1]["role"] == "user"
+    assert first[-1]["content"].startswith("<context><current_date>2024-01-01</current_date></context>")
+    assert query in first[-1]["content"]
+
+
+
+@settings(max_examples=100)
+@given(
+    tools_description=st.text(max_size=200),
+    current_date=st.dates().map(lambda d: d.isoformat()),
+    user_query=st.text(max_size=200),
+)
+def test_prompt_rendering_matches_format(tools_description: str, current_date: str, user_query: str):
+    """
+    Test that the pre-split prompt templates render exactly what str.format
+    renders, including braces inside the substituted values.
+    """
+    from app.agent.prompts import (
+        REACT_AGENT_STATIC_PREFIX,
+        REACT_AGENT_USER_CONTEXT,
+        INTENT_BATCH_USER_HEAD,
+        INTENT_DYNAMIC_USER,
+        build_react_messages,
+        render_intent_batch_user,
+        render_intent_user,
+    )
+
+    messages = build_react_messages(tools_description, current_date, user_query)
+
+    assert messages[0]["content"] == REACT_AGENT_STATIC_PREFIX.format(tools_description=tools_description)
+    assert messages[1]["content"] == REACT_AGENT_USER_CONTEXT.format(current_date=current_date) + user_query
+    assert render_intent_user(user_query) == INTENT_DYNAMIC_USER.format(query=user_query)
+    assert render_intent_batch_user([user_query, user_query]) == (
+        INTENT_BATCH_USER_HEAD.format(count=2) + f"[1] {user_query}\n[2] {user_query}"
+    )
+
+# =============================================================================
+# Structured Output
+# =============================================================================
+
+def test_reasoning_calls_request_react_step_schema():
+    """
+    Test that reasoning steps constrain the LLM output to ReActStepSchema,
+    while free-text calls (answer synthesis) do not.
+    """
+    from app.agent.types import ReActStepSchema
+
+    registry = create_registry_with_tools()
+    agent = ReActAgent(tool_registry=registry, router=None)
+    agent.provider = "openai"
+    agent.openai = MagicMock()
+    agent.openai.chat.completions.create = AsyncMock()
+    agent.openai.chat.completions.create.return_value.choices = [
+        MagicMock(message=MagicMock(content=create_llm_response(
+            thought="Search first",
+            action="document_search",
+            action_input={"query": "q"},
+        )))
+    ]
+    messages = [{"role": "user", "content": "question"}]
+
+    asyncio.run(agent._call_llm(messages))
+    kwargs = agent.openai.chat.completions.create.call_args.kwargs
+    assert kwargs["response_format"]["type"] == "json_schema"
+    assert kwargs["response_format"]["json_schema"]["schema"] == ReActStepSchema.model_json_schema(by_alias=True)
+
+    asyncio.run(agent._call_llm(messages, structured=False))
+    kwargs = agent.openai.chat.completions.create.call_args.kwargs
+    assert "response_format" not in kwargs
+
+    step = ReActStepSchema.model_validate({
+        "thought": "t",
+        "actions": [{"name": "document_search", "input": {"query": "q"}}],
+        "await": ["task-1"],
+    })
+    assert step.await_ == ["task-1"]
+    assert agent._extract_actions(step.model_dump(by_alias=True)) == [("document_search", {"query": "q"})]
+
+
+def test_response_cache_serves_exact_and_semantic_hits():
+    """
+    Test that cached LLM calls skip the provider: exact repeats always hit,
+    near-duplicate user turns hit the semantic tier, and error fallbacks
+    are never cached.
+    """
+    from app.agent.llm_cache import LLMResponseCache
+
+    vectors = {
+        "What is the token supply?": [1.0, 0.0, 0.0],
+        "what is the token supply": [0.99, 0.05, 0.0],
+        "Who founded the project?": [0.0, 1.0, 0.0],
+    }
+
+    async def embedder(text: str) -> List[float]:
+        return vectors[text]
+
+    registry = create_registry_with_tools()
+    agent = ReActAgent(
+        tool_registry=registry,
+        router=None,
+        response_cache=LLMResponseCache(embedder=embedder),
+    )
+    agent.provider = "openai"
+    agent.openai = MagicMock()
+    agent.openai.chat.completions.create = AsyncMock()
+    agent.openai.chat.completions.create.return_value.choices = [
+        MagicMock(message=MagicMock(content=create_llm_response(thought="t", final_answer="42")))
+    ]
+
+    def messages(user: str) -> List[Dict[str, str]]:
+        return [{"role": "system", "content": "sys"}, {"role": "user", "content": user}]
+
+    async def scenario() -> List[str]:
+        return [
+            await agent._call_llm(messages("What is the token supply?")),
+            await agent._call_llm(messages("What is the token supply?")),
+            await agent._call_llm(messages("what is the token supply")),
+            await agent._call_llm(messages("Who founded the project?")),
+        ]
+
+    responses = asyncio.run(scenario())
+    assert len(set(responses)) == 1
+    assert agent.openai.chat.completions.create.await_count == 2
+    assert agent.response_cache.metrics["exact"]["hit"] == 1
+    assert agent.response_cache.metrics["semantic"]["hit"] == 1
+
+    agent.openai.chat.completions.create.side_effect = RuntimeError("boom")
+    asyncio.run(agent._call_llm(messages("Unseen question"), structured=False))
+    vectors["Unseen question"] = [0.0, 0.0, 1.0]
+    agent.openai.chat.completions.create.side_effect = None
+    asyncio.run(agent._call_llm(messages("Unseen question"), structured=False))
+    assert agent.openai.chat.completions.create.await_count == 4
+
+
+def test_semantic_cache_never_crosses_conversations_or_users():
+    """
+    Test that calls sharing only their last turn (such as the loop's
+    continuation prompt) never share a semantic hit, whether the earlier
+    turns or the user differ.
+    """
+    from app.agent.llm_cache import LLMResponseCache
+
+    cont = "Please continue your reasoning or provide a final answer."
+
+    async def embedder(text: str) -> List[float]:
+        return [1.0, 0.0]
+
+    def conversation(question: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": "{}"},
+            {"role": "user", "content": cont},
+        ]
+
+    cache = LLMResponseCache(embedder=embedder)
+    alice = conversation("User ID: alice\nQuestion: What is my balance?")
+    bob = conversation("User ID: bob\nQuestion: Summarize the roadmap")
+
+    paraphrased = alice[:-1] + [{"role": "user", "content": "Go on."}]
+
+    async def scenario():
+        await cache.set("scope", alice, '{"final_answer":"Alice secret answer"}', user_id="alice")
+        return (
+            await cache.get("scope", bob, user_id="bob"),
+            await cache.get("scope", bob, user_id="alice"),
+            await cache.get("scope", paraphrased, user_id="bob"),
+            await cache.get("scope", paraphrased, user_id="alice"),
+        )
+
+    cross_conversation, same_user, cross_user, paraphrase = asyncio.run(scenario())
+    assert cross_conversation is None
+    assert same_user is None
+    assert cross_user is None
+    assert paraphrase == '{"final_answer":"Alice secret answer"}'
+
+
+def test_openai_calls_share_prompt_cache_key_across_queries():
+    """
+    Test that requests for different questions and users send the same
+    static system prompt and prompt_cache_key.
+    """
+    registry = create_registry_with_tools()
+    agent = ReActAgent(tool_registry=registry, router=None)
+    agent.provider = "openai"
+    agent.openai = MagicMock()
+    agent.openai.chat.completions.create = AsyncMock()
+    agent.openai.chat.completions.create.return_value.choices = [
+        MagicMock(message=MagicMock(content=create_llm_response(thought="t", final_answer="a")))
+    ]
+    tools_description = agent._build_tools_description()
+
+    sent = []
+    for query, user_id in [("first question", "user-1"), ("second question", "user-2")]:
+        messages = agent._build_initial_history(query, tools_description, user_id)
+        asyncio.run(agent._call_llm(messages))
+        sent.append(agent.openai.chat.completions.create.call_args.kwargs)
+
+    assert sent[0]["messages"][0] == sent[1]["messages"][0]
+    assert "user-1" not in sent[0]["messages"][0]["content"]
+    assert sent[0]["prompt_cache_key"] == sent[1]["prompt_cache_key"]
+
+
+def test_native_parallel_tool_calls_become_step_actions():
+    """
+    Test that OpenAI native tool calls are requested with the registry's
+    function specs and normalized into one multi-action step.
+    """
+    registry = create_registry_with_tools()
+    agent = ReActAgent(tool_registry=registry, router=None)
+    agent.provider = "openai"
+    agent.openai = MagicMock()
+    agent.openai.chat.completions.create = AsyncMock()
+
+    def tool_call(name: str, arguments: Dict[str, Any]) -> MagicMock:
+        call = MagicMock()
+        call.function.name = name
+        call.function.arguments = json.dumps(arguments)
+        return call
+
+    agent.openai.chat.completions.create.return_value.choices = [
+        MagicMock(message=MagicMock(content=None, tool_calls=[
+            tool_call("document_search", {"query": "a", "document_id": "d", "user_id": "u"}),
+            tool_call("web_search", {"query": "b"}),
+        ]))
+    ]
+
+    response = asyncio.run(agent._call_llm([{"role": "user", "content": "question"}]))
+    kwargs = agent.openai.chat.completions.create.call_args.kwargs
+    assert [spec["function"]["name"] for spec in kwargs["tools"]] == [
+        schema.name for schema in registry.list_tools()
+    ]
+    assert kwargs["parallel_tool_calls"] is True
+    assert agent._extract_actions(agent._parse_llm_response(response)) == [
+        ("document_search", {"query": "a", "document_id": "d", "user_id": "u"}),
+        ("web_search", {"query": "b"}),
+    ]
+
+
+@settings(max_examples=50, deadline=None)
+@given(
+    thought=st.text(max_size=50),
+    action_input=st.dictionaries(
+        st.text(min_size=1, max_size=10),
+        st.one_of(st.text(max_size=20), st.integers(), st.dictionaries(st.text(max_size=5), st.integers(), max_size=3)),
+        max_size=4,
+    ),
+    fenced=st.booleans(),
+)
+def test_parse_llm_response_round_trips_nested_json(thought: str, action_input: Dict[str, Any], fenced: bool):
+    """
+    Test that step JSON (including nested tool inputs) parses to the
+    original object, with or without a markdown fence.
+    """
+    agent = ReActAgent(tool_registry=create_registry_with_tools(), router=None)
+    step = {"thought": thought, "actions": [{"name": "document_search", "input": action_input}]}
+    response = json.dumps(step, ensure_ascii=False)
+    if fenced:
+        response = f"```json\n{response}\n```"
+
+    assert agent._parse_llm_response(response) == step
+
+
+@settings(max_examples=100, deadline=None)
+@given(query=st.text(alphabet=list("heloiywarun 你好吗您嗨HX"), max_size=20))
+def test_direct_answer_picks_highest_priority_greeting(query: str):
+    """
+    Test that the one-pass greeting matcher returns the reply of the first
+    greeting (in priority order) contained in the query.
+    """
+    from app.agent.react_agent import GREETING_RESPONSES
+
+    agent = ReActAgent(tool_registry=create_registry_with_tools(), router=None)
+    query_lower = query.lower().strip()
+    expected = next(
+        (reply for greeting, reply in GREETING_RESPONSES.items() if greeting in query_lower),
+        None,
+    )
+
+    answer = agent._generate_direct_answer(query)
+    if expected is not None:
+        assert answer == expected
+    else:
+        assert answer not in GREETING_RESPONSES.values()
+
+
+def test_tool_results_are_compact_json_observations():
+    """
+    Test that structured tool results become compact JSON observations
+    that round-trip, including non-ASCII text and non-string keys.
+    """
+    agent = ReActAgent(tool_registry=create_registry_with_tools(), router=None)
+    result = [{"id": "chunk1", "text": "白皮书 summary", "scores": {1: 0.5}}]
+
+    observation = agent._format_tool_result("document_search", result)
+
+    assert "\n" not in observation
+    assert "白皮书" in observation
+    assert json.loads(observation) == [{"id": "chunk1", "text": "白皮书 summary", "scores": {"1": 0.5}}]
+
+
+def test_stream_emits_answer_deltas_for_synthesized_answer():
+    """
+    Test that the synthesized answer is streamed as answer_delta events
+    whose concatenation equals the final answer event.
+    """
+    registry = create_registry_with_tools()
+    agent = ReActAgent(tool_registry=registry, router=None, max_steps=1)
+    agent.provider = "openai"
+    agent.openai = MagicMock()
+
+    async def completion_chunks():
+        for text in ["The supply ", "is 21M", None]:
+            yield MagicMock(choices=[MagicMock(delta=MagicMock(content=text))])
+
+    agent.openai.chat.completions.create = AsyncMock(return_value=completion_chunks())
+    step = create_llm_response(
+        thought="Search",
+        action="document_search",
+        action_input={"query": "supply", "document_id": "doc", "user_id": "u"},
+    )
+
+    async def collect() -> List[Any]:
+        return [event async for event in agent.stream(query="What is the supply?", user_id="u")]
+
+    with patch.object(agent, "_call_llm", side_effect=lambda *args, **kwargs: step):
+        events = asyncio.run(collect())
+
+    deltas = [event.content for event in events if event.event_type == "answer_delta"]
+    answers = [event.content for event in events if event.event_type == "answer"]
+    assert deltas == ["The supply ", "is 21M"]
+    assert answers == ["The supply is 21M"]
+    assert agent.openai.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+def test_observations_outside_history_window_are_compacted():
+    """
+    Test that only observations older than the history window are
+    shortened, each exactly once, while the message count is preserved.
+    """
+    from app.agent.react_agent import COMPACTED_OBSERVATION_CHARS
+
+    registry = create_registry_with_tools()
+    registry.register(create_mock_tool("document_search", "Search", "x" * 3000))
+    agent = ReActAgent(tool_registry=registry, router=None, max_steps=5, history_window=2)
+    step = create_llm_response(
+        thought="Search",
+        action="document_search",
+        action_input={"query": "q", "document_id": "doc", "user_id": "u"},
+    )
+    sent: List[List[Dict[str, str]]] = []
+
+    def tracking_call_llm(messages, structured=True, user_id=None):
+        if structured:
+            sent.append(list(messages))
+        return step
+
+    with patch.object(agent, "_call_llm", side_effect=tracking_call_llm):
+        asyncio.run(agent.run(query="q", user_id="u"))
+
+    last = sent[-1]
+    observation_sizes = [len(message["content"]) for message in last[3::2]]
+    assert len(observation_sizes) == 4
+    assert all(size < COMPACTED_OBSERVATION_CHARS + 100 for size in observation_sizes[:2])
+    assert all(size > 3000 for size in observation_sizes[2:])
+    # Compacted messages are never rewritten again, so prefixes stay stable
+    assert sent[-1][:5] == sent[-2][:5]
+
+
+def test_long_observations_are_truncated_and_deduplicated():
+    """
+    Test that observations over the cap are truncated when first sent and
+    replaced by a back-reference when repeated in a later step.
+    """
+    from app.agent.react_agent import MAX_OBSERVATION_CHARS
+
+    registry = create_registry_with_tools()
+    registry.register(create_mock_tool("document_search", "Search", "y" * 20000))
+    agent = ReActAgent(tool_registry=registry, router=None, max_steps=3, history_window=None)
+    step = create_llm_response(
+        thought="Search",
+        action="document_search",
+        action_input={"query": "q", "document_id": "doc", "user_id": "u"},
+    )
+    sent: List[List[Dict[str, str]]] = []
+
+    def tracking_call_llm(messages, structured=True, user_id=None):
+        if structured:
+            sent.append(list(messages))
+        return step
+
+    with patch.object(agent, "_call_llm", side_effect=tracking_call_llm):
+        response = asyncio.run(agent.run(query="q", user_id="u"))
+
+    first, repeated = sent[-1][3]["content"], sent[-1][5]["content"]
+    assert len(first) < MAX_OBSERVATION_CHARS + 500
+    assert "[truncated" in first
+    assert "[Observation repeated, see step 1]" in repeated
+    # Intermediate steps keep the full observation
+    assert len(response.intermediate_steps[0].observation) == 20000
+
+
+def test_today_str_is_formatted_once_per_day():
+    """
+    Test that the date string is reused within a day and refreshed after
+    the next midnight.
+    """
+    from datetime import datetime
+    from app.agent import react_agent as react_agent_module
+
+    react_agent_module._DATE_CACHE[:] = [0.0, ""]
+    today = react_agent_module._today_str()
+    assert today == datetime.now().strftime("%Y-%m-%d")
+
+    with patch.object(react_agent_module, "datetime") as mock_datetime:
+        assert react_agent_module._today_str() is today
+        mock_datetime.now.assert_not_called()
+
+        mock_datetime.now.return_value.strftime.return_value = "2099-01-01"
+        mock_datetime.now.return_value.replace.return_value = datetime(2099, 1, 1)
+        with patch.object(react_agent_module.time, "time", return_value=react_agent_module._DATE_CACHE[0]):
+            assert react_agent_module._today_str() == "2099-01-01"
+
+    react_agent_module._DATE_CACHE[:] = [0.0, ""]
+
+
+def test_agents_share_one_pooled_openai_client():
+    """
+    Test that agents built without an explicit client reuse the
+    process-wide client (and so its connection pool).
+    """
+    from app.agent import react_agent as react_agent_module
+    from app.core import llm_clients
+
+    settings = MagicMock(openai_api_key="sk-test", llm_provider="openai")
+    llm_clients.get_async_openai_client.cache_clear()
+    try:
+        with patch.object(llm_clients, "get_settings", return_value=settings), \
+                patch.object(react_agent_module, "get_settings", return_value=settings):
+            first = ReActAgent(tool_registry=create_registry_with_tools(), router=None)
+            second = ReActAgent(tool_registry=create_registry_with_tools(), router=None)
+        assert first.openai is not None
+        assert first.openai is second.openai
+    finally:
+        asyncio.run(llm_clients.close_llm_clients())
+
+
+def test_stream_sources_continue_numbering_and_tolerate_nulls():
+    """
+    Test that sources collected from several observations are numbered
+    consecutively and that null fields fall back instead of dropping results.
+    """
+    agent = ReActAgent(tool_registry=create_registry_with_tools(), router=None)
+    sources: List[Dict[str, Any]] = []
+
+    agent._collect_stream_sources(
+        "document_search",
+        [{"text": None, "content": "c" * 300, "section": "Intro", "page": 2}, "noise"],
+        sources,
+    )
+    agent._collect_stream_sources("web_search", [{"title": "T", "url": "u", "content": None}], sources)
+    agent._collect_stream_sources("calculator", [{"result": 1}], sources)
+
+    assert [s["documentId"] for s in sources] == ["1", "2"]
+    assert sources[0]["title"] == "Intro"
+    assert sources[0]["textSnippet"] == "c" * 200
+    assert sources[0]["page"] == 2
+    assert sources[1]["textSnippet"] == ""
+    assert sources[1]["sourceType"] == "web"
+
+
+def test_run_and_stream_collect_sources_from_the_same_tools():
+    """
+    Test that run() and stream() report sources for the same tool results,
+    including web search results.
+    """
+    registry = create_registry_with_tools()
+    registry.register(create_mock_tool(
+        "web_search",
+        "Search the web",
+        [{"title": "News", "url": "https://example.com", "content": "Fresh"}],
+    ))
+    agent = ReActAgent(tool_registry=registry, router=None)
+    responses = [
+        json.dumps({
+            "thought": "Search both",
+            "actions": [
+                {"action": "document_search", "action_input": {"query": "q", "document_id": "d"}},
+                {"action": "web_search", "action_input": {"query": "q", "document_id": "d"}},
+            ],
+        }),
+        create_llm_response(thought="Done", final_answer="Answer"),
+    ]
+
+    async def collect() -> List[Any]:
+        return [event async for event in agent.stream(query="q", user_id="u")]
+
+    with patch.object(agent, "_call_llm", side_effect=MockLLMResponder(list(responses))):
+        response = asyncio.run(agent.run(query="q", user_id="u"))
+    with patch.object(agent, "_call_llm", side_effect=MockLLMResponder(list(responses))):
+        events = asyncio.run(collect())
+
+    assert response.answer == "Answer"
+    assert [source.get("url") for source in response.sources] == [None, "https://example.com"]
+    assert [step.action for step in response.intermediate_steps] == ["document_search", "web_search", None]
+    streamed = events[-1].metadata["sources"]
+    assert [source["sourceType"] for source in streamed] == ["pdf", "web"]
+
+
+def test_synthesis_skips_llm_when_all_observations_are_errors():
+    """
+    Test that hitting the step limit with only tool errors answers without
+    a synthesis call, and that synthesis input stays within its budget.
+    """
+    from app.agent.react_agent import MAX_SYNTHESIS_CHARS, NO_OBSERVATIONS_ANSWER
+
+    agent = ReActAgent(tool_registry=create_registry_with_tools(), router=None, max_steps=2)
+    step = create_llm_response(thought="Try", action="missing_tool", action_input={"query": "q"})
+    calls: List[bool] = []
+
+    def fake_llm(messages: List[Dict[str, str]], structured: bool = True, user_id=None) -> str:
+        calls.append(structured)
+        return step
+
+    with patch.object(agent, "_call_llm", side_effect=fake_llm):
+        response = asyncio.run(agent.run(query="q", user_id="u"))
+
+    assert response.answer == NO_OBSERVATIONS_ANSWER
+    assert calls == [True, True]
+
+    selected = agent._select_synthesis_observations(
+        ["a" * MAX_SYNTHESIS_CHARS, "Error executing tool 'x': boom", "b" * 10]
+    )
+    assert selected == ["b" * 10]
+    assert agent._select_synthesis_observations(["c" * (MAX_SYNTHESIS_CHARS + 5)]) == ["c" * MAX_SYNTHESIS_CHARS]
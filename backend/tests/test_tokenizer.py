@@ -19,6 +19,10 @@ from app.agent.retrieval.tokenizer import (
     is_chinese_text,
     _is_cjk_char,
     _calculate_cjk_ratio,
+    warm_up,
+    tokenize_document,
+    TOKEN_CACHE_MAX_TEXT_LENGTH,
+    _tokenize_cached,
 )
 
 
@@ -37,6 +41,17 @@ class TestLanguageDetection:
         assert _is_cjk_char('Z') is False
         assert _is_cjk_char('1') is False
 
+    def test_is_cjk_char_range_boundaries(self):
+        """Range edges in both the BMP and supplementary planes are CJK."""
+        assert _is_cjk_char('\u4e00') is True
+        assert _is_cjk_char('\u9fff') is True
+        assert _is_cjk_char('\u3400') is True
+        assert _is_cjk_char('\ufaff') is True
+        assert _is_cjk_char('\U00020000') is True
+        assert _is_cjk_char('\U0002fa1f') is True
+        assert _is_cjk_char('\u4dc0') is False
+        assert _is_cjk_char('\U0002a6e0') is False
+
     def test_calculate_cjk_ratio_pure_chinese(self):
         """Pure Chinese text should have ratio close to 1.0."""
         ratio = _calculate_cjk_ratio('你好世界')
@@ -52,6 +67,22 @@ class TestLanguageDetection:
         assert _calculate_cjk_ratio('') == 0.0
         assert _calculate_cjk_ratio('   ') == 0.0
 
+    def test_calculate_cjk_ratio_skips_whitespace_and_punctuation(self):
+        """Unicode whitespace and ASCII punctuation are not counted."""
+        assert _calculate_cjk_ratio('你\u3000好!\t\u00a0') == 1.0
+        assert _calculate_cjk_ratio('...\n') == 0.0
+
+    def test_calculate_cjk_ratio_counts_supplementary_cjk(self):
+        """Extension B characters count as CJK; emoji do not."""
+        assert _calculate_cjk_ratio('\U00020000a') == 0.5
+        assert _calculate_cjk_ratio('\U0001f600') == 0.0
+
+    def test_calculate_cjk_ratio_long_text(self):
+        """Long texts give the same ratios as short ones."""
+        assert _calculate_cjk_ratio('你好 world! ' * 100) == 0.2857142857142857
+        assert _calculate_cjk_ratio('a' * 200 + '\U00020000' * 200) == 0.5
+        assert _calculate_cjk_ratio('\uffff' * 100 + '\U0001f600' * 100) == 0.0
+
 
     def test_is_chinese_text_with_chinese(self):
         """Chinese text should be detected as Chinese."""
@@ -91,6 +122,11 @@ class TestEnglishTokenization:
         tokens = tokenize('HELLO World')
         assert tokens == ['hello', 'world']
 
+    def test_ascii_matches_non_ascii_segmentation(self):
+        """ASCII text splits on underscores like text with non-ASCII characters."""
+        assert tokenize('snake_case v2') == ['snake', 'case', 'v2']
+        assert tokenize('snake_case v2 café') == ['snake', 'case', 'v2', 'café']
+
 
 class TestChineseTokenization:
     """Tests for Chinese text tokenization."""
@@ -121,6 +157,11 @@ class TestMixedTokenization:
         assert '你好' in tokens
         assert 'world' in tokens
 
+    def test_mixed_text_splits_on_script_change_and_punctuation(self):
+        """Segments break where the script changes and at punctuation."""
+        tokens = tokenize('The GPU显卡, the CPU（处理器）and RAM.')
+        assert tokens == ['the', 'gpu', '显卡', 'the', 'cpu', '处理器', 'and', 'ram']
+
 
 class TestEdgeCases:
     """Tests for edge cases."""
@@ -144,3 +185,76 @@ class TestEdgeCases:
         tokens = tokenize('test123 456')
         assert 'test123' in tokens
         assert '456' in tokens
+
+
+class TestTokenCache:
+    """Tests for memoized tokenization."""
+
+    def test_repeated_text_hits_cache(self):
+        """Tokenizing the same text again is served from the cache."""
+        _tokenize_cached.cache_clear()
+        assert tokenize('Cache me twice') == ['cache', 'me', 'twice']
+        assert tokenize('Cache me twice') == ['cache', 'me', 'twice']
+        info = _tokenize_cached.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_returned_list_is_independent_of_cache(self):
+        """Mutating a result does not change later results."""
+        tokens = tokenize('Mutable result')
+        tokens.append('extra')
+        assert tokenize('Mutable result') == ['mutable', 'result']
+
+    def test_long_text_bypasses_cache(self):
+        """Texts over the length cutoff are not cached."""
+        _tokenize_cached.cache_clear()
+        text = 'word ' * (TOKEN_CACHE_MAX_TEXT_LENGTH // 5 + 1)
+        assert tokenize(text) == ['word'] * (TOKEN_CACHE_MAX_TEXT_LENGTH // 5 + 1)
+        assert _tokenize_cached.cache_info().currsize == 0
+
+
+class TestTokenizeDocument:
+    """Tests for tokenizing a document's chunks together."""
+
+    def test_matches_tokenize(self):
+        """Each chunk gets the same tokens as tokenize() would give it."""
+        texts = [
+            'Hello world',
+            '比特币是一种电子现金系统',
+            '',
+            'The 比特币 network, the 比特币 ledger',
+            'Hello world',
+            '   ',
+        ]
+        assert tokenize_document(texts) == [tokenize(text) for text in texts]
+
+    def test_repeated_segments_segmented_once(self, monkeypatch):
+        """Identical texts and recurring Chinese segments reach jieba once."""
+        from app.agent.retrieval import tokenizer
+
+        calls = []
+        original = tokenizer._tokenize_chinese
+
+        def counting(text):
+            calls.append(text)
+            return original(text)
+
+        monkeypatch.setattr(tokenizer, '_tokenize_chinese', counting)
+        tokens = tokenize_document(['Page 1 页眉 alpha', 'Page 2 页眉 beta', 'Page 2 页眉 beta'])
+
+        assert calls == ['页眉']
+        assert tokens[1] == tokens[2]
+        assert tokens[1] is not tokens[2]
+
+
+class TestWarmUp:
+    """Tests for tokenizer warm-up."""
+
+    def test_warm_up_loads_jieba_dictionary(self):
+        """Warm-up should leave jieba initialized for the first query."""
+        import jieba
+
+        warm_up()
+
+        assert jieba.dt.initialized is True
+        assert tokenize("你好世界") == ['你好', '世界']
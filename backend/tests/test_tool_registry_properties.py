@@ -9,12 +9,15 @@ Property-based tests for Tool Registry.
 **Feature: generic-agentic-rag, Property 5: Tool Failure Resilience**
 """
 
+import asyncio
 from typing import Any, Dict, List
+
+import pytest
 from hypothesis import given, strategies as st, settings, assume
 from pydantic import BaseModel
 
 from app.agent.types import Tool, ToolSchema
-from app.agent.tools.registry import ToolRegistry, ToolNotFoundError
+from app.agent.tools.registry import ToolRegistry, ToolNotFoundError, ToolArgumentError
 
 
 # Custom strategies for generating valid tool data
@@ -373,3 +376,179 @@ def test_multiple_failures_dont_corrupt_registry(
     schemas = registry.list_tools()
     assert len(schemas) == 1
     assert schemas[0].name == tool_name
+
+
+# =============================================================================
+# Content Hash Stability
+# =============================================================================
+
+@settings(max_examples=100)
+@given(
+    tool_names=st.lists(valid_tool_name, min_size=1, max_size=5, unique=True),
+    description=valid_description,
+)
+def test_content_hash_independent_of_registration_order(
+    tool_names: List[str],
+    description: str,
+):
+    """
+    The registry content hash SHALL only depend on the registered schemas,
+    not on registration order, and SHALL change when a schema changes.
+    """
+    forward = ToolRegistry()
+    for name in tool_names:
+        forward.register(create_successful_tool(name, description, "ok"))
+
+    backward = ToolRegistry()
+    for name in reversed(tool_names):
+        backward.register(create_successful_tool(name, description, "ok"))
+
+    assert forward.content_hash() == backward.content_hash()
+
+    before = forward.content_hash()
+    forward.register(create_successful_tool(tool_names[0], description + " (updated)", "ok"))
+    assert forward.content_hash() != before
+
+
+def test_version_tracks_registration_changes():
+    """
+    The registry version SHALL move on every register/unregister, and
+    unregistered tools SHALL no longer be listed or hashed.
+    """
+    registry = ToolRegistry()
+    assert registry.version == 0
+
+    registry.register(create_successful_tool("alpha", "first", "ok"))
+    registry.register(create_successful_tool("beta", "second", "ok"))
+    assert registry.version == 2
+    with_beta = registry.content_hash()
+
+    assert registry.unregister("beta") is True
+    assert registry.unregister("beta") is False
+    assert registry.version == 3
+    assert [schema.name for schema in registry.list_tools()] == ["alpha"]
+    assert registry.content_hash() != with_beta
+
+
+
+# =============================================================================
+# Detached Invocation
+# =============================================================================
+
+def test_detached_invocations_complete_in_background():
+    """
+    Detached invocations SHALL run in the background and be collected in
+    completion order; a failing tool SHALL surface its exception as the result.
+    """
+    async def slow_handler(**kwargs: Any) -> str:
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    async def scenario() -> None:
+        registry = ToolRegistry()
+        registry.register(Tool(
+            schema=ToolSchema(name="slow", description="slow tool"),
+            handler=slow_handler,
+        ))
+        registry.register(create_successful_tool("fast", "fast tool", "fast"))
+        registry.register(create_failing_tool("broken", "broken tool", "boom"))
+
+        slow_id = await registry.ainvoke_detached("slow")
+        fast_id = await registry.ainvoke_detached("fast")
+        broken_id = await registry.ainvoke_detached("broken")
+
+        assert await registry.poll(slow_id) is None
+
+        results = {}
+        pending = [slow_id, fast_id, broken_id]
+        while pending:
+            task_id, result = await registry.await_any(pending)
+            pending.remove(task_id)
+            results[task_id] = result
+
+        assert results[fast_id] == "fast"
+        assert results[slow_id] == "slow"
+        assert isinstance(results[broken_id], RuntimeError)
+
+        with pytest.raises(ToolNotFoundError):
+            await registry.ainvoke_detached("missing")
+
+    asyncio.run(scenario())
+
+
+# =============================================================================
+# Argument Validation
+# =============================================================================
+
+@settings(max_examples=100)
+@given(
+    query=st.one_of(st.none(), st.text(max_size=20), st.integers(), st.booleans()),
+    k=st.one_of(st.none(), st.integers(), st.text(max_size=5), st.booleans()),
+)
+def test_invoke_validates_arguments_against_schema(query: Any, k: Any):
+    """
+    Invoking a tool SHALL reject arguments that miss a required parameter or
+    have the wrong primitive type, without calling the handler.
+    """
+    calls: List[Dict[str, Any]] = []
+
+    def handler(**kwargs: Any) -> str:
+        calls.append(kwargs)
+        return "ok"
+
+    registry = ToolRegistry()
+    registry.register(Tool(
+        schema=ToolSchema(
+            name="search",
+            description="search tool",
+            parameters={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string"},
+                    "k": {"type": "integer"},
+                },
+            },
+            required=["query"],
+        ),
+        handler=handler,
+    ))
+
+    arguments = {"query": query, "k": k}
+    arguments = {name: value for name, value in arguments.items() if value is not None}
+    valid = isinstance(query, str) and (k is None or (isinstance(k, int) and not isinstance(k, bool)))
+
+    if valid:
+        assert registry.invoke("search", **arguments) == "ok"
+        assert calls == [arguments]
+    else:
+        with pytest.raises(ToolArgumentError):
+            registry.invoke("search", **arguments)
+        assert calls == []
+
+
+def test_invoke_rejects_async_handlers():
+    """
+    invoke SHALL refuse a coroutine handler instead of returning an
+    un-awaited coroutine, while ainvoke awaits it.
+    """
+    calls: List[str] = []
+
+    async def handler(query: str) -> str:
+        calls.append(query)
+        return f"found {query}"
+
+    registry = ToolRegistry()
+    registry.register(Tool(
+        schema=ToolSchema(
+            name="web_search",
+            description="Search the web",
+            parameters={"type": "object", "properties": {"query": {"type": "string"}}},
+            required=["query"],
+        ),
+        handler=handler,
+    ))
+
+    with pytest.raises(TypeError, match="ainvoke"):
+        registry.invoke("web_search", query="bitcoin")
+    assert calls == []
+    assert asyncio.run(registry.ainvoke("web_search", query="bitcoin")) == "found bitcoin"